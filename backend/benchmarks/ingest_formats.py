@@ -0,0 +1,152 @@
+"""
+Compares the JSON and binary ingestion formats per reading.
+
+For a single reading and for batches, reports the payload size and the time
+to turn the request body into what the service receives. "json (declared
+body)" is how the endpoint used to parse: json.loads followed by building
+the DTO, which is what FastAPI does for a declared body parameter. "json" is
+model_validate_json (TypeAdapter for batches), and "binary" is
+decode_readings(). Readings carry every metric, a zone, measured_at and seq,
+like the ESP32 firmware sends them.
+
+Usage (from backend/):
+    PYTHONPATH=src python benchmarks/ingest_formats.py
+    PYTHONPATH=src python benchmarks/ingest_formats.py --batch-size 500 --repeat 20
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+
+from application.services.sensor_activity.binary_format import (
+    decode_readings,
+    encode_reading,
+)
+from domain.dtos.sensor_activity.dtos import SensorActivityCreate
+from domain.models.sensor_activity import SENSOR_METRICS
+
+activity_list_adapter = TypeAdapter(List[SensorActivityCreate])
+
+
+def make_readings(count: int) -> List[dict]:
+    """Readings as the firmware reports them, rounded to hundredths."""
+    now = datetime.now(timezone.utc)
+    readings = []
+    for i in range(count):
+        values = {metric: round(random.uniform(10, 90), 2) for metric in SENSOR_METRICS}
+        readings.append(
+            {
+                "mac_address": "24:0A:C4:%02X:%02X:%02X"
+                % (i % 256, (i // 256) % 256, 7),
+                "zone": "Zona A",
+                **values,
+                "measured_at": now - timedelta(seconds=count - i),
+                "seq": i,
+            }
+        )
+    return readings
+
+
+def as_json(reading: dict) -> dict:
+    return {**reading, "measured_at": reading["measured_at"].isoformat()}
+
+
+def as_binary(reading: dict) -> bytes:
+    return encode_reading(
+        reading["mac_address"],
+        reading,
+        zone=reading["zone"],
+        measured_at=reading["measured_at"],
+        seq=reading["seq"],
+    )
+
+
+def measure(parse: Callable[[], object], repeat: int) -> float:
+    """Best of repeat runs in seconds, which filters out scheduler noise."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, size: int, seconds: float, readings: int) -> None:
+    print(
+        f"{name:<24} {size / readings:8.1f} bytes/reading"
+        f"   {seconds / readings * 1e6:8.2f} us/reading"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--singles", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    singles = make_readings(args.singles)
+    json_singles = [json.dumps(as_json(reading)).encode() for reading in singles]
+    binary_singles = [as_binary(reading) for reading in singles]
+
+    print(f"Single readings ({args.singles} requests)")
+    report(
+        "json (declared body)",
+        sum(map(len, json_singles)),
+        measure(
+            lambda: [SensorActivityCreate(**json.loads(b)) for b in json_singles],
+            args.repeat,
+        ),
+        args.singles,
+    )
+    report(
+        "json",
+        sum(map(len, json_singles)),
+        measure(
+            lambda: [SensorActivityCreate.model_validate_json(b) for b in json_singles],
+            args.repeat,
+        ),
+        args.singles,
+    )
+    report(
+        "binary",
+        sum(map(len, binary_singles)),
+        measure(lambda: [decode_readings(b, 1) for b in binary_singles], args.repeat),
+        args.singles,
+    )
+
+    batch = make_readings(args.batch_size)
+    json_batch = json.dumps([as_json(reading) for reading in batch]).encode()
+    binary_batch = b"".join(as_binary(reading) for reading in batch)
+
+    print(f"\nBatch of {args.batch_size} readings")
+    report(
+        "json (declared body)",
+        len(json_batch),
+        measure(
+            lambda: [SensorActivityCreate(**r) for r in json.loads(json_batch)],
+            args.repeat,
+        ),
+        args.batch_size,
+    )
+    report(
+        "json",
+        len(json_batch),
+        measure(lambda: activity_list_adapter.validate_json(json_batch), args.repeat),
+        args.batch_size,
+    )
+    report(
+        "binary",
+        len(binary_batch),
+        measure(lambda: decode_readings(binary_batch, args.batch_size), args.repeat),
+        args.batch_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
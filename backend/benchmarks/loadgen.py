@@ -0,0 +1,333 @@
+"""
+Simulates a fleet of ESP32 devices posting readings to the ingestion API.
+
+Every device is an asyncio task with its own MAC address, zone and reporting
+interval. It sends one SensorActivityCreate payload per interval and waits
+for the response before scheduling the next one, like the firmware does.
+The schedule is kept even when the server falls behind, and the delay
+between a reading being due and being sent is reported as "lag": when lag
+grows, the server is no longer keeping up with the offered load. All
+devices share one HTTP client with a bounded pool of keep-alive connections.
+
+Pass several fleet sizes to --devices to run stages back to back and find
+the largest fleet that still meets the error and latency limits. Run the
+server with SERVER_WORKERS=1 to get a per-worker figure.
+
+Rows written come from counting sensor_activities with --database-url
+(PostgreSQL or SQLite), or from sensor_ingest_rows_total on /v1/metrics
+otherwise.
+
+Usage (from backend/):
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/loadgen.py --devices 200 --interval 5 --duration 60
+    python benchmarks/loadgen.py --devices 100,200,400,800 --rate 200 \\
+        --database-url sqlite:///./agro.db --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+# Espressif OUIs, so simulated MACs look like the boards deployed in the field
+ESPRESSIF_OUIS = ("24:0A:C4", "30:AE:A4", "7C:9E:BD", "A4:CF:12", "EC:FA:BC")
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return math.nan
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class Device:
+    """A simulated sensor node whose readings drift like real ones."""
+
+    def __init__(self, index: int, zone: str, rng: random.Random):
+        oui = ESPRESSIF_OUIS[index % len(ESPRESSIF_OUIS)]
+        suffix = index // len(ESPRESSIF_OUIS)
+        self.mac_address = "%s:%02X:%02X:%02X" % (
+            oui,
+            (suffix >> 16) & 0xFF,
+            (suffix >> 8) & 0xFF,
+            suffix & 0xFF,
+        )
+        self.zone = zone
+        self.rng = rng
+        self.humidity = rng.uniform(45, 75)
+        self.temperature = rng.uniform(15, 28)
+        # Soil moisture in percent, within the anomaly detector's limits
+        self.ground = [rng.uniform(25, 60) for _ in range(6)]
+
+    def reading(self) -> Dict[str, object]:
+        rng = self.rng
+        self.humidity = min(max(self.humidity + rng.gauss(0, 0.5), 0), 100)
+        self.temperature += rng.gauss(0, 0.1)
+        self.ground = [
+            min(max(value + rng.gauss(0, 0.3), 0), 100) for value in self.ground
+        ]
+        payload = {
+            "mac_address": self.mac_address,
+            "zone": self.zone,
+            "env_humidity": round(self.humidity, 1),
+            "env_temperature": round(self.temperature, 1),
+        }
+        for i, value in enumerate(self.ground, start=1):
+            payload[f"ground_sensor_{i}"] = round(value, 1)
+        return payload
+
+
+class StageResult:
+    """Measurements for one fleet size."""
+
+    def __init__(self, devices: int, interval: float):
+        self.devices = devices
+        self.interval = interval
+        self.latencies: List[float] = []
+        self.lags: List[float] = []
+        self.errors: Dict[str, int] = {}
+        # 429s come from admission control or the rate limiter shedding load
+        self.throttled = 0
+        self.elapsed = 0.0
+        self.rows_written: Optional[int] = None
+
+    def record_error(self, kind: str) -> None:
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    @property
+    def sent(self) -> int:
+        return len(self.latencies) + self.throttled + sum(self.errors.values())
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self.errors.values()) / self.sent if self.sent else 0.0
+
+    @property
+    def throttled_rate(self) -> float:
+        return self.throttled / self.sent if self.sent else 0.0
+
+    def summary(self) -> Dict[str, object]:
+        latencies = sorted(self.latencies)
+        lags = sorted(self.lags)
+        return {
+            "devices": self.devices,
+            "interval_seconds": self.interval,
+            "offered_rps": self.devices / self.interval,
+            "achieved_rps": len(latencies) / self.elapsed if self.elapsed else 0.0,
+            "sent": self.sent,
+            "ok": len(latencies),
+            "errors": dict(self.errors),
+            "error_rate": self.error_rate,
+            "throttled": self.throttled,
+            "throttled_rate": self.throttled_rate,
+            "latency_ms": {
+                f"p{pct:g}": percentile(latencies, pct) * 1000 for pct in PERCENTILES
+            },
+            "latency_max_ms": latencies[-1] * 1000 if latencies else math.nan,
+            "lag_p99_ms": percentile(lags, 99) * 1000,
+            "rows_written": self.rows_written,
+        }
+
+
+async def run_device(
+    client: httpx.AsyncClient,
+    url: str,
+    device: Device,
+    result: StageResult,
+    deadline: float,
+    jitter: float,
+) -> None:
+    loop = asyncio.get_running_loop()
+    rng = device.rng
+    due = loop.time() + rng.uniform(0, result.interval)
+    while True:
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        now = loop.time()
+        if now >= deadline:
+            return
+        result.lags.append(now - due)
+        payload = device.reading()
+        started = time.perf_counter()
+        try:
+            response = await client.post(url, json=payload)
+        except httpx.HTTPError as e:
+            result.record_error(type(e).__name__)
+        else:
+            # 200 answers a retry and 202 a reading the server chose not to store
+            if response.is_success:
+                result.latencies.append(time.perf_counter() - started)
+            elif response.status_code == 429:
+                result.throttled += 1
+            else:
+                result.record_error(f"HTTP {response.status_code}")
+        due += result.interval * (1 + rng.uniform(-jitter, jitter))
+
+
+def count_rows(database_url: str) -> int:
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            return connection.execute(
+                text("SELECT count(*) FROM sensor_activities")
+            ).scalar()
+    finally:
+        engine.dispose()
+
+
+async def ingested_rows_metric(client: httpx.AsyncClient, base_url: str) -> int:
+    response = await client.get(f"{base_url}/metrics")
+    response.raise_for_status()
+    return int(
+        sum(
+            float(line.rsplit(" ", 1)[1])
+            for line in response.text.splitlines()
+            if line.startswith("sensor_ingest_rows_total")
+        )
+    )
+
+
+async def rows_so_far(client, args) -> Optional[int]:
+    try:
+        if args.database_url:
+            return await asyncio.to_thread(count_rows, args.database_url)
+        return await ingested_rows_metric(client, args.base_url)
+    except Exception as e:
+        print(f"  could not count rows: {e}")
+        return None
+
+
+async def run_stage(
+    client: httpx.AsyncClient, args, devices: int, rng: random.Random
+) -> StageResult:
+    interval = devices / args.rate if args.rate else args.interval
+    result = StageResult(devices, interval)
+    fleet = [
+        Device(i, args.zones[i % len(args.zones)], random.Random(rng.random()))
+        for i in range(devices)
+    ]
+    url = f"{args.base_url}/sensor-activities"
+    rows_before = await rows_so_far(client, args)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + args.duration
+    await asyncio.gather(
+        *(
+            run_device(client, url, device, result, deadline, args.jitter)
+            for device in fleet
+        )
+    )
+    result.elapsed = loop.time() - started
+
+    rows_after = await rows_so_far(client, args)
+    if rows_before is not None and rows_after is not None:
+        result.rows_written = rows_after - rows_before
+    return result
+
+
+def print_stage(summary: Dict[str, object]) -> None:
+    latency = summary["latency_ms"]
+    print(
+        f"{summary['devices']:>7} devices  "
+        f"{summary['offered_rps']:8.1f} offered/s  "
+        f"{summary['achieved_rps']:8.1f} ok/s  "
+        + "  ".join(f"{name} {value:7.1f}ms" for name, value in latency.items())
+        + f"  lag p99 {summary['lag_p99_ms']:8.1f}ms"
+        f"  errors {summary['error_rate']:.2%}"
+        f"  429 {summary['throttled_rate']:.2%}"
+        f"  rows {summary['rows_written']}"
+    )
+    if summary["errors"]:
+        print(f"{'':>9}{summary['errors']}")
+
+
+def is_sustainable(summary: Dict[str, object], args) -> bool:
+    return (
+        summary["error_rate"] + summary["throttled_rate"] <= args.max_error_rate
+        and summary["latency_ms"]["p99"] <= args.max_p99_ms
+        # Devices that keep falling behind their schedule never catch up
+        and summary["lag_p99_ms"] <= summary["interval_seconds"] * 1000
+    )
+
+
+async def main_async(args) -> None:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(
+        max_connections=args.connections, max_keepalive_connections=args.connections
+    )
+    timeout = httpx.Timeout(args.timeout, pool=None)
+    summaries = []
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        for devices in args.devices:
+            summary = (await run_stage(client, args, devices, rng)).summary()
+            summary["sustainable"] = is_sustainable(summary, args)
+            summaries.append(summary)
+            print_stage(summary)
+
+    sustainable = [s["devices"] for s in summaries if s["sustainable"]]
+    print(
+        f"\nLargest sustainable fleet: {max(sustainable) if sustainable else 'none'} "
+        f"devices (errors + 429s <= {args.max_error_rate:.2%}, "
+        f"p99 <= {args.max_p99_ms:g}ms, lag p99 <= interval)"
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"arguments": vars(args), "stages": summaries}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--base-url", default="http://localhost:8080/agro-sensor-hub/api/v1"
+    )
+    parser.add_argument(
+        "--devices",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[100],
+        help="Fleet size, or comma-separated sizes to run as stages",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=10.0, help="Seconds between readings"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Target requests per second for the whole fleet; overrides --interval",
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.1, help="Interval jitter as a fraction"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=30.0, help="Seconds per stage"
+    )
+    parser.add_argument(
+        "--zones",
+        type=lambda value: value.split(","),
+        default=["Zone A", "Zone B", "Zone C", "Zone D"],
+    )
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--database-url", help="Count rows written in this database")
+    parser.add_argument("--max-error-rate", type=float, default=0.001)
+    parser.add_argument("--max-p99-ms", type=float, default=500.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    print(f"Stages {args.devices}, {args.duration:g}s each, against {args.base_url}\n")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Measures the logging cost a request pays on the calling thread.
+
+Each simulated request logs what POST /sensor-activities does: the "recording"
+line, the "recorded" line and the access line from the request middleware.
+The "legacy" configuration reproduces the old behaviour: a new Formatter per
+record, f-strings and the full response repr. Output goes to os.devnull so
+terminal speed doesn't skew the numbers; --sink-latency-us adds a blocking
+delay to every write to mimic a slow stdout pipe (e.g. a busy log driver),
+which is where the queue pays off since the caller never waits on I/O.
+
+Usage (from backend/):
+    PYTHONPATH=src python benchmarks/logging_overhead.py --requests 20000
+    PYTHONPATH=src python benchmarks/logging_overhead.py --sink-latency-us 50
+"""
+
+import argparse
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueListener
+
+from infrastructure.logging_config import (
+    LOG_FORMAT,
+    ColorFormatter,
+    DeferredQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+)
+
+
+class LegacyColorFormatter(logging.Formatter):
+    """The formatter as it was: builds a new Formatter for every record."""
+
+    def __init__(self, fmt: str):
+        super().__init__()
+        self.fmt = fmt
+
+    def format(self, record):
+        return logging.Formatter(self.fmt).format(record)
+
+
+class SlowStream:
+    """Writes to os.devnull after blocking for a fixed time."""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.stream = open(os.devnull, "w")
+
+    def write(self, text):
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+
+
+class FakeResponse:
+    """Stand-in for a SensorActivityResponse with a realistic repr."""
+
+    def __init__(self):
+        self.id = 123456
+        self.mac_address = "AA:BB:CC:DD:EE:FF"
+        self.fields = {f"ground_sensor_{i}": 41.5 + i for i in range(1, 7)}
+
+    def __repr__(self):
+        fields = " ".join(f"{key}={value!r}" for key, value in self.fields.items())
+        return (
+            f"id={self.id} mac_address={self.mac_address!r} zone='north' "
+            f"env_humidity=55.2 env_temperature=21.7 {fields} "
+            f"created_at=datetime.datetime(2026, 10, 19, 12, 0)"
+        )
+
+
+def make_logger(handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger("benchmark")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def legacy_request(logger, access_logger, response):
+    logger.info(f"Recording new sensor activity for device: {response.mac_address}")
+    logger.info(f"Sensor activity recorded successfully: {response}")
+    access_logger.info(
+        f"Method: POST Path: /agro-sensor-hub/api/v1/sensor-activities "
+        f"Status: 201 Process Time: {1.2345:.2f}ms"
+    )
+
+
+def current_request(logger, access_logger, response):
+    logger.info("Recording new sensor activity for device: %s", response.mac_address)
+    logger.info("Sensor activity recorded successfully: id=%s", response.id)
+    access_logger.info(
+        "Method: %s Path: %s Status: %s Process Time: %.2fms",
+        "POST",
+        "/agro-sensor-hub/api/v1/sensor-activities",
+        201,
+        1.2345,
+    )
+
+
+def run(
+    name,
+    formatter,
+    request,
+    requests,
+    sink_latency_us=0.0,
+    use_queue=False,
+    sampling=None,
+):
+    stream = SlowStream(sink_latency_us / 1e6)
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(formatter)
+    handler = stream_handler
+    listener = None
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, stream_handler)
+        listener.start()
+        handler = DeferredQueueHandler(log_queue)
+    if sampling:
+        handler.addFilter(SamplingFilter(sampling))
+    logger = make_logger(handler)
+    access_logger = logger.getChild("access")
+    response = FakeResponse()
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        request(logger, access_logger, response)
+    caller_seconds = time.perf_counter() - start
+    if listener is not None:
+        listener.stop()
+    total_seconds = time.perf_counter() - start
+    stream.close()
+
+    print(
+        f"{name:<28} {caller_seconds / requests * 1e6:8.1f} us/request on caller"
+        f"   {total_seconds / requests * 1e6:8.1f} us/request until flushed"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sink-latency-us", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.requests} simulated requests, 3 log records each, "
+        f"{args.sink_latency_us:g} us per write\n"
+    )
+    common = (args.requests, args.sink_latency_us)
+    run("legacy", LegacyColorFormatter(LOG_FORMAT), legacy_request, *common)
+    run("color", ColorFormatter(LOG_FORMAT), current_request, *common)
+    run("json", JsonFormatter(), current_request, *common)
+    run(
+        "color + queue",
+        ColorFormatter(LOG_FORMAT),
+        current_request,
+        *common,
+        use_queue=True,
+    )
+    run("json + queue", JsonFormatter(), current_request, *common, use_queue=True)
+    run(
+        "json + queue + 10% access",
+        JsonFormatter(),
+        current_request,
+        *common,
+        use_queue=True,
+        sampling={"benchmark.access": 0.1},
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,14 @@ from infrastructure.database.base import Base
 from infrastructure.logging_config import setup_logging
 import infrastructure.database.models  # Import all models to register them with SQLAlchemy
 
-# Initialize our custom logging
-setup_logging()
-
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
+# Initialize our custom logging, unless the application already did
+if config.attributes.get("configure_logging", True):
+    setup_logging()
+
 # Get the database URL from settings
 settings = get_settings()
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
@@ -62,6 +63,15 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # Reuse the connection handed over by an in-process upgrade
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -0,0 +1,43 @@
+"""Notification retention archive table and index
+
+Revision ID: 3f1c9a7d2b4e
+Revises: 8b27751de36d
+Create Date: 2026-10-19 09:12:31.418206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b4e'
+down_revision: Union[str, None] = '8b27751de36d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notifications_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('device_id', sa.String(length=17), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notifications_archive_device_id'), 'notifications_archive', ['device_id'], unique=False)
+    op.create_index('ix_notifications_is_read_created_at', 'notifications', ['is_read', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_is_read_created_at', table_name='notifications')
+    op.drop_index(op.f('ix_notifications_archive_device_id'), table_name='notifications_archive')
+    op.drop_table('notifications_archive')
@@ -0,0 +1,30 @@
+"""Add per-device sequence numbers to sensor activities
+
+Revision ID: 5a0c3e9f7b12
+Revises: e4b71c05d9a3
+Create Date: 2026-10-19 18:02:13.640271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a0c3e9f7b12'
+down_revision: Union[str, None] = 'e4b71c05d9a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sensor_activities', sa.Column('seq', sa.BigInteger(), nullable=True))
+    op.create_index('uq_sensor_activities_device_id_seq', 'sensor_activities', ['device_id', 'seq'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_sensor_activities_device_id_seq', table_name='sensor_activities')
+    op.drop_column('sensor_activities', 'seq')
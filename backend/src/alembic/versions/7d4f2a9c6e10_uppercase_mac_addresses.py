@@ -0,0 +1,124 @@
+"""Store device MAC addresses in upper case
+
+Revision ID: 7d4f2a9c6e10
+Revises: 5a0c3e9f7b12
+Create Date: 2026-10-19 21:34:52.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d4f2a9c6e10'
+down_revision: Union[str, None] = '5a0c3e9f7b12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRICS = (
+    'env_humidity',
+    'env_temperature',
+    'ground_sensor_1',
+    'ground_sensor_2',
+    'ground_sensor_3',
+    'ground_sensor_4',
+    'ground_sensor_5',
+    'ground_sensor_6',
+)
+
+
+def _merge_hour(upper, lower):
+    """Combine the rollups of one hour stored under both spellings of a MAC."""
+    total = upper['sample_count'] + lower['sample_count']
+    merged = {'sample_count': total}
+    for metric in METRICS:
+        a, b = upper[metric], lower[metric]
+        if a is None or b is None:
+            merged[metric] = b if a is None else a
+        else:
+            merged[metric] = (
+                a * upper['sample_count'] + b * lower['sample_count']
+            ) / total
+        for suffix, pick in (('_min', min), ('_max', max)):
+            values = [
+                value
+                for value in (upper[metric + suffix], lower[metric + suffix])
+                if value is not None
+            ]
+            merged[metric + suffix] = pick(values) if values else None
+    return merged
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # The upper case devices must exist before their rows are moved to them
+    op.execute(
+        'INSERT INTO devices (mac_address, name, created_at, updated_at) '
+        'SELECT UPPER(mac_address), MIN(name), MIN(created_at), MAX(updated_at) '
+        'FROM devices WHERE mac_address <> UPPER(mac_address) '
+        'AND UPPER(mac_address) NOT IN (SELECT mac_address FROM devices) '
+        'GROUP BY UPPER(mac_address)'
+    )
+
+    # Retried readings stored under both spellings keep their seq only once
+    op.execute(
+        'UPDATE sensor_activities SET seq = NULL '
+        'WHERE device_id <> UPPER(device_id) AND seq IS NOT NULL AND EXISTS ('
+        'SELECT 1 FROM sensor_activities AS stored '
+        'WHERE stored.device_id = UPPER(sensor_activities.device_id) '
+        'AND stored.seq = sensor_activities.seq)'
+    )
+    op.execute(
+        'UPDATE sensor_activities SET device_id = UPPER(device_id) '
+        'WHERE device_id <> UPPER(device_id)'
+    )
+
+    # Hours compacted under both spellings are merged into one rollup
+    columns = ['sample_count', *METRICS]
+    columns += [metric + suffix for metric in METRICS for suffix in ('_min', '_max')]
+    selected = ', '.join(
+        f'{table}.{column} AS {table}_{column}'
+        for table in ('upper_hour', 'lower_hour')
+        for column in ['id', *columns]
+    )
+    conflicts = bind.execute(sa.text(
+        f'SELECT {selected} FROM sensor_activity_hourly AS lower_hour '
+        'JOIN sensor_activity_hourly AS upper_hour '
+        'ON upper_hour.device_id = UPPER(lower_hour.device_id) '
+        'AND upper_hour.bucket_start = lower_hour.bucket_start '
+        'WHERE lower_hour.device_id <> UPPER(lower_hour.device_id)'
+    )).mappings().all()
+    assignments = ', '.join(f'{column} = :{column}' for column in columns)
+    for row in conflicts:
+        upper = {column: row[f'upper_hour_{column}'] for column in columns}
+        lower = {column: row[f'lower_hour_{column}'] for column in columns}
+        bind.execute(
+            sa.text(f'UPDATE sensor_activity_hourly SET {assignments} WHERE id = :id'),
+            {**_merge_hour(upper, lower), 'id': row['upper_hour_id']},
+        )
+        bind.execute(
+            sa.text('DELETE FROM sensor_activity_hourly WHERE id = :id'),
+            {'id': row['lower_hour_id']},
+        )
+    op.execute(
+        'UPDATE sensor_activity_hourly SET device_id = UPPER(device_id) '
+        'WHERE device_id <> UPPER(device_id)'
+    )
+
+    for table in ('notifications', 'notifications_archive'):
+        op.execute(
+            f'UPDATE {table} SET device_id = UPPER(device_id) '
+            'WHERE device_id <> UPPER(device_id)'
+        )
+
+    # Nothing references the lower case devices any more
+    op.execute('DELETE FROM devices WHERE mac_address <> UPPER(mac_address)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The original spelling of each MAC address isn't kept
+    pass
@@ -0,0 +1,74 @@
+"""Sensor activity hourly rollups and retention watermarks
+
+Revision ID: a6d2e8c41f57
+Revises: 3f1c9a7d2b4e
+Create Date: 2026-10-19 11:47:05.203114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2e8c41f57'
+down_revision: Union[str, None] = '3f1c9a7d2b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sensor_activity_hourly',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('device_id', sa.String(length=17), nullable=False),
+    sa.Column('zone', sa.String(length=100), nullable=True),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('env_humidity', sa.Float(), nullable=True),
+    sa.Column('env_humidity_min', sa.Float(), nullable=True),
+    sa.Column('env_humidity_max', sa.Float(), nullable=True),
+    sa.Column('env_temperature', sa.Float(), nullable=True),
+    sa.Column('env_temperature_min', sa.Float(), nullable=True),
+    sa.Column('env_temperature_max', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_1', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_1_min', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_1_max', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_2', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_2_min', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_2_max', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_3', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_3_min', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_3_max', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_4', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_4_min', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_4_max', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_5', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_5_min', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_5_max', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_6', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_6_min', sa.Float(), nullable=True),
+    sa.Column('ground_sensor_6_max', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['device_id'], ['devices.mac_address'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('device_id', 'bucket_start', name='uq_sensor_activity_hourly_device_bucket')
+    )
+    op.create_index(op.f('ix_sensor_activity_hourly_bucket_start'), 'sensor_activity_hourly', ['bucket_start'], unique=False)
+    op.create_table('retention_watermarks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_index(op.f('ix_sensor_activities_created_at'), 'sensor_activities', ['created_at'], unique=False)
+    op.create_index('ix_sensor_activities_device_id_created_at', 'sensor_activities', ['device_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sensor_activities_device_id_created_at', table_name='sensor_activities')
+    op.drop_index(op.f('ix_sensor_activities_created_at'), table_name='sensor_activities')
+    op.drop_table('retention_watermarks')
+    op.drop_index(op.f('ix_sensor_activity_hourly_bucket_start'), table_name='sensor_activity_hourly')
+    op.drop_table('sensor_activity_hourly')
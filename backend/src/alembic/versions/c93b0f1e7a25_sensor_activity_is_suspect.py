@@ -0,0 +1,28 @@
+"""Add is_suspect flag to sensor activities
+
+Revision ID: c93b0f1e7a25
+Revises: a6d2e8c41f57
+Create Date: 2026-10-19 14:03:52.771940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c93b0f1e7a25'
+down_revision: Union[str, None] = 'a6d2e8c41f57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sensor_activities', sa.Column('is_suspect', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('sensor_activities', 'is_suspect')
@@ -0,0 +1,36 @@
+"""Add device-side measured_at to sensor activities
+
+Revision ID: e4b71c05d9a3
+Revises: c93b0f1e7a25
+Create Date: 2026-10-19 16:21:44.905318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b71c05d9a3'
+down_revision: Union[str, None] = 'c93b0f1e7a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sensor_activities', sa.Column('measured_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    # Existing readings were stamped on arrival
+    op.execute('UPDATE sensor_activities SET measured_at = created_at')
+    op.create_index(op.f('ix_sensor_activities_measured_at'), 'sensor_activities', ['measured_at'], unique=False)
+    op.create_index('ix_sensor_activities_device_id_measured_at', 'sensor_activities', ['device_id', 'measured_at'], unique=False)
+    op.drop_index('ix_sensor_activities_device_id_created_at', table_name='sensor_activities')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_sensor_activities_device_id_created_at', 'sensor_activities', ['device_id', 'created_at'], unique=False)
+    op.drop_index('ix_sensor_activities_device_id_measured_at', table_name='sensor_activities')
+    op.drop_index(op.f('ix_sensor_activities_measured_at'), table_name='sensor_activities')
+    op.drop_column('sensor_activities', 'measured_at')
@@ -0,0 +1,68 @@
+import asyncio
+import os
+
+from fastapi import HTTPException
+
+from infrastructure.config.settings import get_settings
+from infrastructure.logging_config import get_logger
+from infrastructure.profiling import ProfilingSession, SamplingProfiler
+
+logger = get_logger(__name__)
+
+
+class ProfilingService:
+    """Service class for time-boxed profiling of the current worker."""
+
+    def __init__(self):
+        self.settings = get_settings()
+
+    async def profile_worker(self, seconds: float, interval_ms: float) -> str:
+        """
+        Sample every thread of this worker for a while.
+
+        The sampler runs in its own thread, so the worker keeps serving
+        requests during the session. Only the worker that received the
+        request is profiled.
+
+        Args:
+            seconds: Duration of the session
+            interval_ms: Time between samples in milliseconds
+
+        Returns:
+            Collapsed stacks, one "frames count" line per distinct stack
+
+        Raises:
+            HTTPException: If the duration is too long or a session is already running
+        """
+        if seconds > self.settings.PROFILING_MAX_SECONDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Profiling sessions are limited to {self.settings.PROFILING_MAX_SECONDS} seconds",
+            )
+        if not ProfilingSession.try_acquire():
+            raise HTTPException(
+                status_code=409,
+                detail="A profiling session is already running on this worker",
+            )
+        try:
+            logger.info(
+                "Sampling worker %s for %ss every %sms",
+                os.getpid(),
+                seconds,
+                interval_ms,
+            )
+            sampler = SamplingProfiler(interval_ms / 1000)
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                # Joining the sampler thread can take one interval
+                collapsed = await asyncio.to_thread(sampler.stop)
+            logger.info(
+                "Profiling session on worker %s took %s samples",
+                os.getpid(),
+                sampler.samples,
+            )
+            return collapsed
+        finally:
+            ProfilingSession.release()
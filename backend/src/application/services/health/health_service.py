@@ -1,3 +1,5 @@
+from infrastructure.database.base import engine
+from infrastructure.database.pool import get_pool_stats
 from infrastructure.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -16,5 +18,14 @@ class HealthService:
         """
         logger.debug("Checking system health")
         health_status = {"status": "ok"}
-        logger.debug(f"System health status: {health_status}")
+        logger.debug("System health status: %s", health_status)
         return health_status
+
+    def get_database_pool_stats(self):
+        """
+        Get the state of this worker's database connection pool.
+
+        Returns:
+            dict: Pool occupancy and checkout wait statistics
+        """
+        return get_pool_stats(engine)
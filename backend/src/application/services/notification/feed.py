@@ -0,0 +1,87 @@
+import asyncio
+from typing import Optional
+
+from infrastructure.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class NotificationFeed:
+    """
+    In-process broadcaster used by the long-poll notification feed.
+
+    Parked requests are plain coroutines waiting on a single asyncio.Condition,
+    so thousands of waiters cost a small object each and no threads. Publishes
+    only wake waiters in the current worker process; waiters in other workers
+    pick up new notifications when their timeout expires and they re-query.
+    """
+
+    def __init__(self):
+        self._latest_id = 0
+        self._waiters = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def latest_id(self) -> int:
+        """Highest notification ID published in this process."""
+        return self._latest_id
+
+    @property
+    def waiters(self) -> int:
+        """Number of requests currently parked on the feed."""
+        return self._waiters
+
+    def publish(self, notification_id: int) -> None:
+        """
+        Record a new notification and wake every parked waiter.
+
+        Safe to call from the event loop thread or from worker threads.
+
+        Args:
+            notification_id: ID of the notification that was just created
+        """
+        if notification_id > self._latest_id:
+            self._latest_id = notification_id
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._notify_all(), loop)
+
+    async def _notify_all(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+    async def wait_for_newer(self, since_id: int, timeout: float) -> bool:
+        """
+        Park until a notification newer than since_id is published.
+
+        Args:
+            since_id: Cursor; only notifications with a greater ID wake the waiter
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            True if a newer notification was published, False on timeout
+        """
+        if self._condition is None:
+            self._loop = asyncio.get_running_loop()
+            self._condition = asyncio.Condition()
+        if self._latest_id > since_id:
+            return True
+
+        self._waiters += 1
+        try:
+            async with self._condition:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self._latest_id > since_id),
+                    timeout,
+                )
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters -= 1
+
+
+# Shared feed for the whole worker process
+notification_feed = NotificationFeed()
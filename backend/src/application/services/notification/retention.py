@@ -0,0 +1,174 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from domain.dtos.notification.dtos import NotificationRetentionReport
+from domain.repositories.notification.crud import NotificationRepository
+from infrastructure.config.settings import Settings, get_settings
+from infrastructure.database.base import SessionLocal
+from infrastructure.logging_config import get_logger
+from infrastructure.metrics import registry
+
+logger = get_logger(__name__)
+
+rows_removed_total = registry.counter(
+    "notification_retention_rows_total",
+    "Notifications removed by retention, by action",
+    ("action",),
+)
+last_run_rows = registry.gauge(
+    "notification_retention_last_run_rows",
+    "Notifications removed (or eligible, in dry-run mode) by the last retention run",
+    ("action",),
+)
+last_run_duration = registry.gauge(
+    "notification_retention_last_run_duration_ms",
+    "Duration of the last notification retention run in milliseconds",
+)
+
+
+class NotificationRetentionService:
+    """
+    Applies the notification retention policy from Settings.
+
+    Read notifications past NOTIFICATION_READ_RETENTION_DAYS are deleted and
+    unread ones past NOTIFICATION_UNREAD_ARCHIVE_DAYS are moved to
+    notifications_archive. Work is done in small committed batches with a
+    pause in between so no statement holds locks or WAL for long.
+    """
+
+    last_report: Optional[NotificationRetentionReport] = None
+
+    def __init__(
+        self,
+        notification_repository: NotificationRepository,
+        settings: Optional[Settings] = None,
+    ):
+        self.repository = notification_repository
+        self.settings = settings or get_settings()
+
+    def _run_batches(self, db: Session, batch: Callable[[], int]) -> tuple:
+        total = 0
+        batches = 0
+        while True:
+            removed = batch()
+            db.commit()
+            if removed == 0:
+                break
+            total += removed
+            batches += 1
+            if removed < self.settings.NOTIFICATION_RETENTION_BATCH_SIZE:
+                break
+            time.sleep(self.settings.NOTIFICATION_RETENTION_BATCH_PAUSE_SECONDS)
+        return total, batches
+
+    def run(
+        self, db: Session, dry_run: Optional[bool] = None
+    ) -> NotificationRetentionReport:
+        """
+        Run the retention policy once.
+
+        Args:
+            db: Database session
+            dry_run: Only count eligible rows; defaults to NOTIFICATION_RETENTION_DRY_RUN
+
+        Returns:
+            NotificationRetentionReport with the number of rows removed
+
+        Raises:
+            HTTPException: If there's an error applying the retention policy
+        """
+        try:
+            return self._run(db, dry_run)
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error applying notification retention: {str(e)}",
+            )
+
+    def get_last_report(self) -> NotificationRetentionReport:
+        """
+        Get the report of the last retention run in this worker.
+
+        Returns:
+            The last NotificationRetentionReport
+
+        Raises:
+            HTTPException: If retention has not run yet
+        """
+        if NotificationRetentionService.last_report is None:
+            raise HTTPException(
+                status_code=404, detail="Notification retention has not run yet"
+            )
+        return NotificationRetentionService.last_report
+
+    def _run(self, db: Session, dry_run: Optional[bool]) -> NotificationRetentionReport:
+        if dry_run is None:
+            dry_run = self.settings.NOTIFICATION_RETENTION_DRY_RUN
+        started_at = datetime.now(timezone.utc)
+        start_time = time.perf_counter()
+        read_cutoff = started_at - timedelta(
+            days=self.settings.NOTIFICATION_READ_RETENTION_DAYS
+        )
+        unread_cutoff = started_at - timedelta(
+            days=self.settings.NOTIFICATION_UNREAD_ARCHIVE_DAYS
+        )
+        batch_size = self.settings.NOTIFICATION_RETENTION_BATCH_SIZE
+
+        if dry_run:
+            deleted = self.repository.count_older_than(db, read_cutoff, is_read=True)
+            archived = self.repository.count_older_than(
+                db, unread_cutoff, is_read=False
+            )
+            batches = 0
+        else:
+            deleted, delete_batches = self._run_batches(
+                db,
+                lambda: self.repository.delete_read_batch(db, read_cutoff, batch_size),
+            )
+            archived, archive_batches = self._run_batches(
+                db,
+                lambda: self.repository.archive_unread_batch(
+                    db, unread_cutoff, batch_size
+                ),
+            )
+            batches = delete_batches + archive_batches
+            rows_removed_total.inc(deleted, action="deleted")
+            rows_removed_total.inc(archived, action="archived")
+
+        report = NotificationRetentionReport(
+            dry_run=dry_run,
+            started_at=started_at,
+            read_cutoff=read_cutoff,
+            unread_cutoff=unread_cutoff,
+            deleted=deleted,
+            archived=archived,
+            batches=batches,
+            duration_ms=(time.perf_counter() - start_time) * 1000,
+        )
+        last_run_rows.set(deleted, action="deleted")
+        last_run_rows.set(archived, action="archived")
+        last_run_duration.set(report.duration_ms)
+        NotificationRetentionService.last_report = report
+        logger.info(
+            "Notification retention %sfinished: deleted=%s archived=%s batches=%s duration=%.2fms",
+            "dry run " if dry_run else "",
+            deleted,
+            archived,
+            batches,
+            report.duration_ms,
+        )
+        return report
+
+
+def run_notification_retention() -> None:
+    """Entry point for the background scheduler."""
+    db = SessionLocal()
+    try:
+        NotificationRetentionService(NotificationRepository()).run(db)
+    finally:
+        db.close()
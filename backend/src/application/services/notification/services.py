@@ -1,22 +1,31 @@
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from domain.repositories.notification.crud import NotificationRepository
 from domain.dtos.notification.dtos import NotificationCreate, NotificationResponse
+from application.services.notification.feed import (
+    NotificationFeed,
+    notification_feed,
+)
 
 
 class NotificationService:
     """Service class for handling notification operations."""
 
-    def __init__(self, notification_repository: NotificationRepository):
+    def __init__(
+        self,
+        notification_repository: NotificationRepository,
+        feed: Optional[NotificationFeed] = None,
+    ):
         self.repository = notification_repository
+        self.feed = feed or notification_feed
 
     def create(
         self, db: Session, notification_create: NotificationCreate
     ) -> NotificationResponse:
         """
-        Create a new notification.
+        Create a new notification and wake any long-poll feed waiters.
 
         Args:
             db: Database session
@@ -29,11 +38,13 @@ class NotificationService:
             HTTPException: If there's an error creating the notification
         """
         try:
-            return self.repository.create(db, notification_create)
+            notification = self.repository.create(db, notification_create)
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Error creating notification: {str(e)}"
             )
+        self.feed.publish(notification.id)
+        return notification
 
     def get_latest_unread(
         self, db: Session, limit: int = 20
@@ -164,3 +175,73 @@ class NotificationService:
             raise HTTPException(
                 status_code=500, detail=f"Error retrieving notifications: {str(e)}"
             )
+
+    def has_unread(self, db: Session, mac_address: str, type: str) -> bool:
+        """
+        Check whether a device has an unread notification of the given type.
+
+        Args:
+            db: Database session
+            mac_address: The MAC address of the device
+            type: Notification type to match
+
+        Returns:
+            True if such a notification exists
+
+        Raises:
+            HTTPException: If there's an error checking the notifications
+        """
+        try:
+            return self.repository.has_unread(db, mac_address, type)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error retrieving notifications: {str(e)}"
+            )
+
+    async def wait_for_feed(
+        self,
+        db: Session,
+        since_id: Optional[int] = None,
+        timeout: float = 30,
+        limit: int = 20,
+    ) -> List[NotificationResponse]:
+        """
+        Long-poll for notifications newer than a cursor.
+
+        Returns immediately when newer notifications exist. Otherwise the
+        database connection is released and the request is parked on the
+        in-process feed until a notification is published or the timeout
+        expires, after which the database is checked once more. Notifications
+        published before the first check and not found by it were deleted, so
+        they don't end the wait.
+
+        Args:
+            db: Database session
+            since_id: Cursor; when omitted, only notifications created after
+                the call are returned
+            timeout: Maximum number of seconds to wait
+            limit: Maximum number of records to return
+
+        Returns:
+            List of Notification records ordered by ID, empty on timeout
+
+        Raises:
+            HTTPException: If there's an error retrieving the notifications
+        """
+        try:
+            published = self.feed.latest_id
+            if since_id is None:
+                since_id = self.repository.get_latest_id(db)
+            else:
+                notifications = self.repository.get_newer_than(db, since_id, limit)
+                if notifications:
+                    return notifications
+
+            # Do not hold a pooled connection while the request is parked
+            db.close()
+            await self.feed.wait_for_newer(max(since_id, published), timeout)
+            return self.repository.get_newer_than(db, since_id, limit)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error retrieving notification feed: {str(e)}"
+            )
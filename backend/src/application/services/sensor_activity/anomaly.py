@@ -0,0 +1,275 @@
+from collections import deque
+from statistics import median
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from domain.dtos.sensor_activity.dtos import SensorAnomaly
+from domain.models.sensor_activity import SENSOR_METRICS
+from infrastructure.config.settings import get_settings
+
+STUCK = "stuck"
+SPIKE = "spike"
+OUT_OF_RANGE = "out_of_range"
+
+# Scales the MAD so the robust z-score is comparable to a standard z-score
+MAD_SCALE = 0.6745
+
+
+class _MetricState:
+    """Incremental detection state of one metric of one device."""
+
+    __slots__ = ("last_value", "run_length", "window")
+
+    def __init__(self, window_size: int):
+        self.last_value: Optional[float] = None
+        self.run_length = 0
+        self.window: deque = deque(maxlen=window_size)
+
+
+class AnomalyDetector:
+    """
+    Flags stuck, spiking and physically impossible sensor readings.
+
+    - stuck: the same value repeated for stuck_readings consecutive readings
+    - spike: robust z-score against the median/MAD of the previous
+      spike_window readings above spike_threshold
+    - out_of_range: value outside the metric's physical limits
+
+    check() runs per reading on the ingest path and keeps a small amount of
+    state per device and metric. detect_history() runs the same rules over a
+    stored history with NumPy. An anomaly is reported as new only when it
+    starts, so a sensor that stays stuck produces a single notification.
+    """
+
+    def __init__(
+        self,
+        stuck_readings: int,
+        spike_window: int,
+        spike_threshold: float,
+        limits: Mapping[str, Sequence[float]],
+    ):
+        self.stuck_readings = stuck_readings
+        self.spike_window = spike_window
+        self.spike_threshold = spike_threshold
+        self.limits = limits
+        self._states: Dict[str, Dict[str, _MetricState]] = {}
+        self._active: Dict[str, Set[Tuple[str, str]]] = {}
+
+    def _out_of_range(self, metric: str, value: float) -> bool:
+        limits = self.limits.get(metric)
+        return limits is not None and not (limits[0] <= value <= limits[1])
+
+    def _spike_warm_up(self) -> int:
+        # Readings needed in the window before spikes are scored
+        return max(self.spike_window // 2, 1)
+
+    def _robust_z(self, window: Sequence[float], value: float) -> Optional[float]:
+        center = median(window)
+        mad = median([abs(item - center) for item in window])
+        if mad == 0:
+            return None
+        return MAD_SCALE * (value - center) / mad
+
+    def check(
+        self, mac_address: str, values: Mapping[str, Optional[float]]
+    ) -> Tuple[List[SensorAnomaly], List[SensorAnomaly]]:
+        """
+        Check one reading and update the device's detection state.
+
+        Args:
+            mac_address: Device MAC address
+            values: Metric name to value mapping
+
+        Returns:
+            Tuple of (all anomalies in this reading, anomalies that just started)
+        """
+        states = self._states.setdefault(mac_address, {})
+        active = self._active.setdefault(mac_address, set())
+        anomalies: List[SensorAnomaly] = []
+        current: Set[Tuple[str, str]] = set()
+
+        for metric in SENSOR_METRICS:
+            value = values.get(metric)
+            if value is None:
+                continue
+            state = states.get(metric)
+            if state is None:
+                state = states[metric] = _MetricState(self.spike_window)
+
+            if self._out_of_range(metric, value):
+                limits = self.limits[metric]
+                current.add((metric, OUT_OF_RANGE))
+                anomalies.append(
+                    SensorAnomaly(
+                        mac_address=mac_address,
+                        metric=metric,
+                        kind=OUT_OF_RANGE,
+                        value=value,
+                        detail=f"{value} is outside [{limits[0]}, {limits[1]}]",
+                    )
+                )
+                # Impossible values would poison the stuck and spike baselines
+                continue
+
+            state.run_length = state.run_length + 1 if value == state.last_value else 1
+            state.last_value = value
+            if state.run_length >= self.stuck_readings:
+                current.add((metric, STUCK))
+                anomalies.append(
+                    SensorAnomaly(
+                        mac_address=mac_address,
+                        metric=metric,
+                        kind=STUCK,
+                        value=value,
+                        detail=f"Same value for {state.run_length} readings",
+                    )
+                )
+
+            if len(state.window) >= self._spike_warm_up():
+                score = self._robust_z(state.window, value)
+                if score is not None and abs(score) > self.spike_threshold:
+                    current.add((metric, SPIKE))
+                    anomalies.append(
+                        SensorAnomaly(
+                            mac_address=mac_address,
+                            metric=metric,
+                            kind=SPIKE,
+                            value=value,
+                            detail=f"Robust z-score {score:.1f}",
+                        )
+                    )
+            state.window.append(value)
+
+        started = [
+            anomaly for anomaly in anomalies if (anomaly.metric, anomaly.kind) not in active
+        ]
+        self._active[mac_address] = current
+        return anomalies, started
+
+    def detect_history(
+        self, mac_address: str, readings: Sequence[Mapping[str, Any]]
+    ) -> List[SensorAnomaly]:
+        """
+        Run the detection rules over a stored history in batch with NumPy.
+
+        Args:
+            mac_address: Device MAC address
+            readings: Row mappings ordered oldest first, with metric columns,
+                "id" and "measured_at"
+
+        Returns:
+            Anomalies found, one per flagged reading and metric; stuck runs are
+            reported once at the reading where they reach stuck_readings
+        """
+        if not readings:
+            return []
+        ids = [reading.get("id") for reading in readings]
+        timestamps = [reading.get("measured_at") for reading in readings]
+        found: List[Tuple[int, SensorAnomaly]] = []
+
+        def add(index: int, metric: str, kind: str, value: float, detail: str):
+            found.append(
+                (
+                    index,
+                    SensorAnomaly(
+                        mac_address=mac_address,
+                        metric=metric,
+                        kind=kind,
+                        value=float(value),
+                        detail=detail,
+                        reading_id=ids[index],
+                        created_at=timestamps[index],
+                    ),
+                )
+            )
+
+        for metric in SENSOR_METRICS:
+            values = np.array(
+                [
+                    np.nan if reading.get(metric) is None else reading.get(metric)
+                    for reading in readings
+                ],
+                dtype=float,
+            )
+            present = ~np.isnan(values)
+            if not present.any():
+                continue
+
+            limits = self.limits.get(metric)
+            if limits is not None:
+                impossible = present & ((values < limits[0]) | (values > limits[1]))
+                for index in np.flatnonzero(impossible):
+                    add(
+                        index,
+                        metric,
+                        OUT_OF_RANGE,
+                        values[index],
+                        f"{values[index]} is outside [{limits[0]}, {limits[1]}]",
+                    )
+                values = np.where(impossible, np.nan, values)
+
+            # check() skips gaps and impossible values, so work on what is left
+            positions = np.flatnonzero(~np.isnan(values))
+            values = values[positions]
+
+            # Length of the run of identical values ending at each reading
+            starts = np.ones(len(values), dtype=bool)
+            starts[1:] = values[1:] != values[:-1]
+            run_ids = np.cumsum(starts)
+            run_starts = np.flatnonzero(starts)
+            run_position = np.arange(len(values)) - run_starts[run_ids - 1] + 1
+            stuck = run_position == self.stuck_readings
+            for index in np.flatnonzero(stuck):
+                add(
+                    positions[index],
+                    metric,
+                    STUCK,
+                    values[index],
+                    f"Same value for {self.stuck_readings} readings",
+                )
+
+            # Like check(), score against shorter windows while they fill up
+            warm_up = self._spike_warm_up()
+            for index in range(warm_up, min(self.spike_window, len(values))):
+                score = self._robust_z(values[:index].tolist(), values[index])
+                if score is not None and abs(score) > self.spike_threshold:
+                    add(
+                        positions[index],
+                        metric,
+                        SPIKE,
+                        values[index],
+                        f"Robust z-score {score:.1f}",
+                    )
+            if len(values) > self.spike_window:
+                windows = np.lib.stride_tricks.sliding_window_view(
+                    values[:-1], self.spike_window
+                )
+                targets = values[self.spike_window :]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    centers = np.median(windows, axis=1)
+                    mads = np.median(np.abs(windows - centers[:, None]), axis=1)
+                    scores = MAD_SCALE * (targets - centers) / mads
+                spikes = (mads > 0) & (np.abs(scores) > self.spike_threshold)
+                for offset in np.flatnonzero(spikes):
+                    index = offset + self.spike_window
+                    add(
+                        positions[index],
+                        metric,
+                        SPIKE,
+                        values[index],
+                        f"Robust z-score {scores[offset]:.1f}",
+                    )
+
+        found.sort(key=lambda item: item[0])
+        return [anomaly for _, anomaly in found]
+
+
+settings = get_settings()
+# Shared incremental detector for the whole worker process
+anomaly_detector = AnomalyDetector(
+    stuck_readings=settings.ANOMALY_STUCK_READINGS,
+    spike_window=settings.ANOMALY_SPIKE_WINDOW,
+    spike_threshold=settings.ANOMALY_SPIKE_THRESHOLD,
+    limits=settings.ANOMALY_LIMITS,
+)
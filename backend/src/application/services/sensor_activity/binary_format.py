@@ -0,0 +1,178 @@
+"""
+Binary encoding of sensor readings for constrained devices.
+
+One reading is a fixed 57-byte little-endian header followed by the zone:
+
+    offset  size  field
+    0       1     version, currently 1
+    1       1     flags: bit 0 measured_at is set, bit 1 seq is set
+    2       6     MAC address
+    8       32    8 x int32 metrics in hundredths, in SENSOR_METRICS order;
+                  -2147483648 marks a missing value
+    40      8     measured_at as int64 Unix time in milliseconds
+    48      8     seq as uint64
+    56      1     zone length in bytes, 0 when there is no zone
+    57      n     zone, UTF-8
+
+On the ESP32 the header is a packed C struct, so building a reading is a
+handful of integer stores instead of formatting JSON. A batch is several
+readings back to back.
+"""
+
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional
+
+from application.services.sensor_activity.reading_age import check_reading_age
+from domain.dtos.sensor_activity.dtos import MAX_CLOCK_SKEW
+from domain.models.sensor_activity import SENSOR_METRICS
+
+MEDIA_TYPE = "application/vnd.agro-sensor-hub.reading"
+VERSION = 1
+HEADER = struct.Struct("<BB6s8iqQB")
+MISSING = -(2**31)
+SCALE = 100
+FLAG_MEASURED_AT = 0x01
+FLAG_SEQ = 0x02
+MAX_SEQ = 2**63 - 1
+
+
+class BinaryFormatError(ValueError):
+    """Raised when a binary payload is malformed or holds invalid values."""
+
+
+class TooManyReadingsError(BinaryFormatError):
+    """Raised when a payload holds more readings than allowed."""
+
+
+def encode_reading(
+    mac_address: str,
+    values: Mapping[str, Optional[float]],
+    zone: Optional[str] = None,
+    measured_at: Optional[datetime] = None,
+    seq: Optional[int] = None,
+) -> bytes:
+    """
+    Encode one reading, as the device firmware does.
+
+    Args:
+        mac_address: Device MAC address in format XX:XX:XX:XX:XX:XX
+        values: Metric name to value; missing metrics are sent as missing
+        zone: Optional zone name
+        measured_at: Optional time the reading was taken
+        seq: Optional per-device sequence number
+
+    Returns:
+        The encoded reading
+    """
+    flags = 0
+    measured_ms = 0
+    if measured_at is not None:
+        flags |= FLAG_MEASURED_AT
+        measured_ms = round(measured_at.timestamp() * 1000)
+    if seq is not None:
+        flags |= FLAG_SEQ
+    metrics = [
+        MISSING if values.get(metric) is None else round(values[metric] * SCALE)
+        for metric in SENSOR_METRICS
+    ]
+    zone_bytes = zone.encode("utf-8") if zone else b""
+    return (
+        HEADER.pack(
+            VERSION,
+            flags,
+            bytes.fromhex(mac_address.replace(":", "")),
+            *metrics,
+            measured_ms,
+            seq or 0,
+            len(zone_bytes),
+        )
+        + zone_bytes
+    )
+
+
+def decode_readings(payload: bytes, max_readings: int) -> List[Dict[str, Any]]:
+    """
+    Decode one or more readings straight into sensor_activities insert parameters.
+
+    Values get the same checks as SensorActivityCreate: humidity within
+    0-100, measured_at neither ahead of the server clock nor older than
+    SENSOR_MAX_READING_AGE_DAYS, and seq within range.
+
+    Args:
+        payload: Readings back to back
+        max_readings: Largest number of readings accepted
+
+    Returns:
+        One dict per reading with device_id, zone, the metrics, measured_at
+        (None when not sent) and seq (None when not sent)
+
+    Raises:
+        TooManyReadingsError: If the payload holds more than max_readings
+        BinaryFormatError: If the payload is malformed or a value is invalid
+    """
+    readings: List[Dict[str, Any]] = []
+    now = datetime.now(timezone.utc)
+    latest_allowed = now + MAX_CLOCK_SKEW
+    offset = 0
+    size = len(payload)
+    while offset < size:
+        if len(readings) == max_readings:
+            raise TooManyReadingsError(f"More than {max_readings} readings")
+        if payload[offset] != VERSION:
+            raise BinaryFormatError(
+                f"Unsupported version {payload[offset]} at byte {offset}"
+            )
+        if size - offset < HEADER.size:
+            raise BinaryFormatError(f"Truncated reading at byte {offset}")
+        _, flags, mac, *metrics, measured_ms, seq, zone_length = HEADER.unpack_from(
+            payload, offset
+        )
+        start = offset
+        offset += HEADER.size + zone_length
+        if offset > size:
+            raise BinaryFormatError(f"Truncated zone at byte {start + HEADER.size}")
+
+        reading: Dict[str, Any] = {"device_id": mac.hex(":").upper()}
+        try:
+            reading["zone"] = (
+                payload[start + HEADER.size : offset].decode("utf-8")
+                if zone_length
+                else None
+            )
+        except UnicodeDecodeError:
+            raise BinaryFormatError(f"Zone at byte {start + HEADER.size} is not UTF-8")
+        for metric, value in zip(SENSOR_METRICS, metrics):
+            reading[metric] = None if value == MISSING else value / SCALE
+        humidity = reading["env_humidity"]
+        if humidity is not None and not 0 <= humidity <= 100:
+            raise BinaryFormatError(
+                f"Humidity {humidity} outside 0-100 at byte {start}"
+            )
+
+        reading["measured_at"] = None
+        if flags & FLAG_MEASURED_AT:
+            try:
+                measured_at = datetime.fromtimestamp(measured_ms / 1000, timezone.utc)
+            except (OverflowError, OSError, ValueError):
+                raise BinaryFormatError(f"Invalid measured_at at byte {start}")
+            if measured_at > latest_allowed:
+                raise BinaryFormatError(
+                    f"measured_at is in the future at byte {start}; check the device clock"
+                )
+            try:
+                check_reading_age(measured_at, now)
+            except ValueError:
+                raise BinaryFormatError(
+                    f"measured_at is too old at byte {start}; check the device clock"
+                )
+            reading["measured_at"] = measured_at
+        reading["seq"] = None
+        if flags & FLAG_SEQ:
+            if seq > MAX_SEQ:
+                raise BinaryFormatError(f"seq above {MAX_SEQ} at byte {start}")
+            reading["seq"] = seq
+        readings.append(reading)
+    if not readings:
+        raise BinaryFormatError("Empty payload")
+    return readings
@@ -0,0 +1,202 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from application.services.sensor_activity.csv_parsing import (
+    CsvLayoutError,
+    parse_rows,
+    read_header,
+)
+from domain.dtos.sensor_activity.dtos import SensorActivityImportReport
+from domain.repositories.device.crud import DeviceRepository
+from domain.repositories.sensor_activity.crud import (
+    SensorActivityRepository,
+    import_staging,
+)
+from infrastructure.config.settings import Settings, get_settings
+from infrastructure.logging_config import get_logger
+from infrastructure.metrics import registry
+
+logger = get_logger(__name__)
+
+imported_rows_total = registry.counter(
+    "sensor_import_rows_total",
+    "CSV import rows by outcome: inserted, duplicate or rejected",
+    ("outcome",),
+)
+
+# Errors kept in the report across all chunks
+MAX_REPORTED_ERRORS = 50
+
+
+class SensorActivityImportService:
+    """Service class for bulk importing sensor activity history from CSV."""
+
+    def __init__(
+        self,
+        sensor_activity_repository: SensorActivityRepository,
+        device_repository: DeviceRepository,
+        settings: Optional[Settings] = None,
+    ):
+        self.repository = sensor_activity_repository
+        self.device_repository = device_repository
+        self.settings = settings or get_settings()
+
+    def _chunks(self, stream: TextIO) -> Iterator[Tuple[List[str], int]]:
+        """Yield (lines, line number of the first line) after the header."""
+        size = self.settings.SENSOR_IMPORT_CHUNK_ROWS
+        lines: List[str] = []
+        first_line_number = 2
+        for line_number, line in enumerate(stream, start=2):
+            if not lines:
+                first_line_number = line_number
+            lines.append(line)
+            if len(lines) >= size:
+                yield lines, first_line_number
+                lines = []
+        if lines:
+            yield lines, first_line_number
+
+    def _load_chunk(
+        self, db: Session, parsed: Dict[str, Any], report: SensorActivityImportReport
+    ) -> None:
+        """Stage, register devices and merge one parsed chunk in its own transaction."""
+        report.rows_read += parsed["rows"]
+        report.rows_rejected += parsed["rejected"]
+        imported_rows_total.inc(parsed["rejected"], outcome="rejected")
+        room = MAX_REPORTED_ERRORS - len(report.errors)
+        report.errors.extend(parsed["errors"][: max(room, 0)])
+        if not parsed["rows"]:
+            return
+        try:
+            staged = self.repository.stage_import(db, parsed["columns"])
+            report.devices_registered += self.device_repository.create_missing_from(
+                db, import_staging
+            )
+            inserted = self.repository.merge_import(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        report.rows_inserted += inserted
+        report.duplicates_skipped += staged - inserted
+        imported_rows_total.inc(inserted, outcome="inserted")
+        imported_rows_total.inc(staged - inserted, outcome="duplicate")
+
+    def import_csv(
+        self, db: Session, stream: TextIO, timezone_name: str = "UTC"
+    ) -> SensorActivityImportReport:
+        """
+        Import sensor readings from a CSV file.
+
+        Two layouts are accepted: the file produced by the CSV download
+        (Spanish headers, 12-hour timestamps with a zone abbreviation) and
+        one with the model's column names and ISO 8601 timestamps. Chunks of
+        SENSOR_IMPORT_CHUNK_ROWS lines are parsed in a process pool while the
+        parsed ones are loaded: each is copied into a temporary staging table,
+        unknown devices are registered, and rows not already stored for the
+        same device and timestamp are inserted. Every chunk commits on its
+        own, so an interrupted import can simply be run again.
+
+        Args:
+            db: Database session
+            stream: Text stream positioned at the header line
+            timezone_name: IANA zone for timestamps without an offset, and for
+                zone abbreviations other than UTC/GMT in the export layout
+
+        Returns:
+            SensorActivityImportReport with the counts and a sample of errors
+
+        Raises:
+            HTTPException: 400 if the file or the time zone is invalid
+            HTTPException: 500 if loading fails
+        """
+        started = time.perf_counter()
+        try:
+            ZoneInfo(timezone_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(
+                status_code=400, detail=f"Unknown time zone '{timezone_name}'"
+            )
+        try:
+            header = stream.readline()
+            if not header.strip():
+                raise HTTPException(status_code=400, detail="The CSV file is empty")
+            options = read_header(header)
+        except (CsvLayoutError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"Unsupported CSV: {e}")
+
+        report = SensorActivityImportReport(layout=options["layout"])
+        workers = self.settings.SENSOR_IMPORT_WORKERS or os.cpu_count() or 1
+        logger.info(
+            "Importing %s layout CSV with %s parser processes",
+            options["layout"],
+            workers,
+        )
+        try:
+            if workers == 1:
+                for lines, first_line in self._chunks(stream):
+                    parsed = parse_rows(lines, options, timezone_name, first_line)
+                    self._load_chunk(db, parsed, report)
+            else:
+                self._import_parallel(
+                    db, stream, options, timezone_name, workers, report
+                )
+        except HTTPException:
+            raise
+        except UnicodeDecodeError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"The file is not valid {e.encoding} after {report.rows_inserted} "
+                "imported rows; pass its encoding",
+            )
+        except Exception as e:
+            logger.error("CSV import failed: %s", e, exc_info=True)
+            raise HTTPException(
+                status_code=500,
+                detail=f"Import failed after {report.rows_inserted} rows: {str(e)}",
+            )
+
+        report.duration_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            "CSV import finished: %s read, %s inserted, %s duplicates, %s rejected, "
+            "%s devices registered in %.0fms",
+            report.rows_read,
+            report.rows_inserted,
+            report.duplicates_skipped,
+            report.rows_rejected,
+            report.devices_registered,
+            report.duration_ms,
+        )
+        return report
+
+    def _import_parallel(
+        self,
+        db: Session,
+        stream: TextIO,
+        options: Dict[str, Any],
+        timezone_name: str,
+        workers: int,
+        report: SensorActivityImportReport,
+    ) -> None:
+        # Spawned workers don't inherit the server's threads or connections
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            pending: Set[Future] = set()
+            for lines, first_line in self._chunks(stream):
+                pending.add(
+                    pool.submit(parse_rows, lines, options, timezone_name, first_line)
+                )
+                # Bound the parsed chunks held in memory
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._load_chunk(db, future.result(), report)
+            for future in pending:
+                self._load_chunk(db, future.result(), report)
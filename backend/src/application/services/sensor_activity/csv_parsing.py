@@ -0,0 +1,245 @@
+"""
+CSV parsing for sensor activity imports.
+
+Runs inside worker processes, so it imports nothing that touches the
+database or the settings.
+"""
+
+import csv
+import math
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+METRIC_COLUMNS = (
+    "env_humidity",
+    "env_temperature",
+    "ground_sensor_1",
+    "ground_sensor_2",
+    "ground_sensor_3",
+    "ground_sensor_4",
+    "ground_sensor_5",
+    "ground_sensor_6",
+)
+
+# Layout written by SensorActivityService.get_last_three_months_csv
+EXPORT_LAYOUT = "export"
+# Model column names with ISO 8601 timestamps
+ISO_LAYOUT = "iso"
+
+# Normalised header (lowercase, no accents) to column; None means ignored
+HEADER_ALIASES: Dict[str, Optional[str]] = {
+    "id": None,
+    "is_suspect": None,
+    "direccion mac": "device_id",
+    "mac_address": "device_id",
+    "device_id": "device_id",
+    "zona": "zone",
+    "zone": "zone",
+    "humedad ambiente": "env_humidity",
+    "temperatura ambiente": "env_temperature",
+    # Files without a measurement time carry the time it was stored
+    "tiempo de creacion": "measured_at",
+    "created_at": "measured_at",
+    "measured_at": "measured_at",
+    **{metric: metric for metric in METRIC_COLUMNS},
+    **{f"sensor tierra {i}": f"ground_sensor_{i}" for i in range(1, 7)},
+}
+
+MAC_ADDRESS = re.compile(r"^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$")
+NUMERIC_OFFSET = re.compile(r"^([+-])(\d{2}):?(\d{2})?$")
+MAX_ERRORS_PER_CHUNK = 10
+
+
+class CsvLayoutError(ValueError):
+    """Raised when a header doesn't match any supported layout."""
+
+
+def _normalise(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name.strip().lstrip("﻿"))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def read_header(line: str) -> Dict[str, Any]:
+    """
+    Work out the layout of a file from its header line.
+
+    Files saved by spreadsheets with a Spanish locale use ";" between fields
+    and a decimal comma; both are detected here.
+
+    Args:
+        line: First line of the file
+
+    Returns:
+        Parsing options to pass to parse_rows()
+
+    Raises:
+        CsvLayoutError: If required columns are missing or a column is unknown
+    """
+    delimiter = ";" if line.count(";") > line.count(",") else ","
+    names = next(csv.reader([line], delimiter=delimiter))
+    normalised = [_normalise(name) for name in names]
+    columns = []
+    for name, key in zip(names, normalised):
+        if key not in HEADER_ALIASES:
+            raise CsvLayoutError(f"Unknown column '{name}'")
+        if key == "created_at" and "measured_at" in normalised:
+            columns.append(None)
+        else:
+            columns.append(HEADER_ALIASES[key])
+    for required in ("device_id", "measured_at"):
+        if required not in columns:
+            raise CsvLayoutError(f"Missing column for {required}")
+    return {
+        "layout": EXPORT_LAYOUT if "tiempo de creacion" in normalised else ISO_LAYOUT,
+        "columns": columns,
+        "delimiter": delimiter,
+        "decimal_comma": delimiter == ";",
+    }
+
+
+def _zone_for(token: str, default: tzinfo) -> tzinfo:
+    """Resolve the zone abbreviation that strftime("%Z") appends."""
+    if token in ("UTC", "GMT", "Z"):
+        return timezone.utc
+    match = NUMERIC_OFFSET.match(token)
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        return timezone(-offset if sign == "-" else offset)
+    # Abbreviations like CET are ambiguous; the configured zone applies
+    return default
+
+
+def _parse_export_timestamp(value: str, default: tzinfo) -> datetime:
+    """Parse "2025-03-01 02:15:09 PM CET" as written by the export."""
+    base, zone = value[:22], value[22:].strip()
+    if len(base) == 22 and base[4] == "-" and base[13] == ":" and base[19] == " ":
+        hour = int(base[11:13]) % 12
+        marker = base[20:22].upper()
+        if marker == "PM":
+            hour += 12
+        elif marker != "AM":
+            raise ValueError(f"invalid timestamp '{value}'")
+        parsed = datetime(
+            int(base[0:4]),
+            int(base[5:7]),
+            int(base[8:10]),
+            hour,
+            int(base[14:16]),
+            int(base[17:19]),
+        )
+    else:
+        parts = value.split(" ")
+        zone = parts[3] if len(parts) > 3 else ""
+        parsed = datetime.strptime(" ".join(parts[:3]), "%Y-%m-%d %I:%M:%S %p")
+    return parsed.replace(tzinfo=_zone_for(zone, default))
+
+
+def _parse_iso_timestamp(value: str, default: tzinfo) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=default)
+
+
+def _parse_float(value: str, decimal_comma: bool) -> float:
+    value = value.strip()
+    if not value:
+        return math.nan
+    if decimal_comma:
+        value = value.replace(",", ".")
+    return float(value)
+
+
+def parse_rows(
+    lines: Sequence[str],
+    options: Dict[str, Any],
+    timezone_name: str,
+    first_line_number: int,
+) -> Dict[str, Any]:
+    """
+    Parse a chunk of data lines into columns ready for bulk loading.
+
+    Rows with an invalid MAC address, number or timestamp, or a humidity
+    outside 0-100, are rejected and counted.
+
+    Args:
+        lines: Data lines without the header
+        options: Output of read_header()
+        timezone_name: IANA zone for timestamps without an explicit offset
+        first_line_number: Line number of lines[0] in the file, for errors
+
+    Returns:
+        Dict with "columns" (device_id, zone, metrics and measured_at as
+        datetime64[us] in UTC), "rows", "rejected" and "errors" (a sample)
+    """
+    default_zone = ZoneInfo(timezone_name)
+    columns = options["columns"]
+    decimal_comma = options["decimal_comma"]
+    parse_timestamp = (
+        _parse_export_timestamp
+        if options["layout"] == EXPORT_LAYOUT
+        else _parse_iso_timestamp
+    )
+    indexes = {name: i for i, name in enumerate(columns) if name}
+    metric_indexes = [(metric, indexes.get(metric)) for metric in METRIC_COLUMNS]
+    zone_index = indexes.get("zone")
+
+    device_ids: List[str] = []
+    zones: List[Optional[str]] = []
+    metrics: Dict[str, List[float]] = {metric: [] for metric in METRIC_COLUMNS}
+    timestamps: List[int] = []
+    rejected = 0
+    errors: List[str] = []
+
+    reader = csv.reader(lines, delimiter=options["delimiter"])
+    for offset, fields in enumerate(reader):
+        if not fields:
+            continue
+        try:
+            if len(fields) != len(columns):
+                raise ValueError(f"expected {len(columns)} fields, found {len(fields)}")
+            mac_address = fields[indexes["device_id"]].strip().upper()
+            if not MAC_ADDRESS.match(mac_address):
+                raise ValueError(f"invalid MAC address '{mac_address}'")
+            values = [
+                (
+                    _parse_float(fields[index], decimal_comma)
+                    if index is not None
+                    else math.nan
+                )
+                for _, index in metric_indexes
+            ]
+            if not math.isnan(values[0]) and not 0 <= values[0] <= 100:
+                raise ValueError(f"humidity {values[0]} outside 0-100")
+            measured_at = parse_timestamp(
+                fields[indexes["measured_at"]].strip(), default_zone
+            )
+        except ValueError as e:
+            rejected += 1
+            if len(errors) < MAX_ERRORS_PER_CHUNK:
+                errors.append(f"line {first_line_number + offset}: {e}")
+            continue
+
+        device_ids.append(mac_address)
+        zone = fields[zone_index].strip() if zone_index is not None else ""
+        zones.append(zone or None)
+        for (metric, _), value in zip(metric_indexes, values):
+            metrics[metric].append(value)
+        timestamps.append(round(measured_at.timestamp() * 1_000_000))
+
+    parsed = {
+        "device_id": device_ids,
+        "zone": zones,
+        **{metric: np.array(values, dtype=float) for metric, values in metrics.items()},
+        "measured_at": np.array(timestamps, dtype="int64").astype("datetime64[us]"),
+    }
+    return {
+        "columns": parsed,
+        "rows": len(device_ids),
+        "rejected": rejected,
+        "errors": errors,
+    }
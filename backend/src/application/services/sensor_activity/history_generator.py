@@ -0,0 +1,374 @@
+import math
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from domain.models.sensor_activity import SENSOR_METRICS
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+DAYS_PER_YEAR = 365.25
+GROUND_SENSORS = 6
+
+
+def summerness(timestamps: np.ndarray) -> np.ndarray:
+    """0 in mid-January, 1 in mid-July (northern hemisphere)."""
+    day_of_year = (timestamps / SECONDS_PER_DAY) % DAYS_PER_YEAR
+    return (1 - np.cos(2 * np.pi * (day_of_year - 15) / DAYS_PER_YEAR)) / 2
+
+
+class DeviceProfile:
+    """Fixed characteristics of one simulated device."""
+
+    __slots__ = (
+        "mac_address",
+        "zone",
+        "phase",
+        "temperature_offset",
+        "humidity_offset",
+        "dry",
+        "wet",
+        "event_times",
+        "event_strengths",
+        "rain_times",
+        "gap_starts",
+        "gap_ends",
+    )
+
+
+class HistoryGenerator:
+    """
+    Generates realistic sensor history for a fleet of devices with NumPy.
+
+    - Temperature follows seasonal and diurnal cycles plus regional weather
+      that drifts from day to day.
+    - Humidity moves against temperature and rises after rain.
+    - The six ground sensors measure soil moisture at increasing depth. Each
+      zone's irrigation schedule and regional rain wet the soil, which then
+      dries exponentially, faster in summer; deeper sensors react later and
+      dry slower.
+    - Devices go offline at random for hours at a time, leaving gaps.
+    - Readings are noisy, and rare spikes are flagged as suspect with an
+      anomaly_spike notification, as the ingest path would do.
+
+    Output comes in time windows covering every device, sorted by timestamp,
+    so ids follow time as they do in a live table. The same seed always
+    produces the same history.
+    """
+
+    def __init__(
+        self,
+        devices: int,
+        start: datetime,
+        end: datetime,
+        interval_seconds: float = 300,
+        zones: int = 4,
+        seed: int = 0,
+        mac_prefix: str = "02:5D:00",
+        utc_offset_hours: float = 1.0,
+        gaps_per_day: float = 0.02,
+        mean_gap_hours: float = 8.0,
+        spike_probability: float = 2e-5,
+    ):
+        """
+        Args:
+            devices: Number of devices
+            start: Start of the history (timezone-aware)
+            end: End of the history (timezone-aware)
+            interval_seconds: Reporting interval of every device
+            zones: Number of irrigation zones the devices are spread across
+            seed: Seed of the random generator
+            mac_prefix: First three bytes of the generated MAC addresses
+            utc_offset_hours: Local time offset used for daily cycles
+            gaps_per_day: Expected outages per device and day
+            mean_gap_hours: Mean outage duration
+            spike_probability: Chance of a reading carrying a spike
+        """
+        self.rng = np.random.default_rng(seed)
+        self.start = start.timestamp()
+        self.end = end.timestamp()
+        self.interval = interval_seconds
+        self.utc_offset = utc_offset_hours * SECONDS_PER_HOUR
+        self.spike_probability = spike_probability
+        self.zones = [f"Zone {chr(ord('A') + i)}" for i in range(zones)]
+
+        days = int(math.ceil((self.end - self.start) / SECONDS_PER_DAY)) + 2
+        first_day = (
+            math.floor((self.start + self.utc_offset) / SECONDS_PER_DAY) - 1
+        ) * SECONDS_PER_DAY - self.utc_offset
+        day_starts = first_day + np.arange(days) * SECONDS_PER_DAY
+        self._weather_times = day_starts + 12 * SECONDS_PER_HOUR
+        self._weather = self._regional_weather(days)
+
+        # Regional rain, more frequent in winter, at a random time of day
+        rain_days = self.rng.random(days) < 0.06 + 0.14 * (1 - summerness(day_starts))
+        rain_times = day_starts[rain_days] + self.rng.uniform(
+            0, SECONDS_PER_DAY, rain_days.sum()
+        )
+        rain_strengths = self.rng.uniform(0.3, 1.0, len(rain_times))
+
+        # Each zone irrigates at 06:00 every 1-3 days, less often in winter
+        zone_irrigation = []
+        for zone_index in range(zones):
+            period = zone_index % 3 + 1
+            times = day_starts[zone_index % period :: period] + 6 * SECONDS_PER_HOUR
+            skip = self.rng.random(len(times)) < 0.7 * (1 - summerness(times))
+            times = times[~skip] + self.rng.normal(0, 600, (~skip).sum())
+            zone_irrigation.append(times)
+
+        self.profiles = [
+            self._make_profile(
+                i,
+                zones,
+                zone_irrigation,
+                rain_times,
+                rain_strengths,
+                days,
+                gaps_per_day,
+                mean_gap_hours,
+                mac_prefix,
+            )
+            for i in range(devices)
+        ]
+
+    def _regional_weather(self, days: int) -> np.ndarray:
+        """Daily temperature anomaly as an AR(1) process."""
+        shocks = self.rng.normal(0, 1.2, days)
+        weather = np.empty(days)
+        value = 0.0
+        for day in range(days):
+            value = 0.8 * value + shocks[day]
+            weather[day] = value
+        return weather
+
+    def _make_profile(
+        self,
+        index: int,
+        zones: int,
+        zone_irrigation: List[np.ndarray],
+        rain_times: np.ndarray,
+        rain_strengths: np.ndarray,
+        days: int,
+        gaps_per_day: float,
+        mean_gap_hours: float,
+        mac_prefix: str,
+    ) -> DeviceProfile:
+        rng = self.rng
+        profile = DeviceProfile()
+        profile.mac_address = "%s:%02X:%02X:%02X" % (
+            mac_prefix,
+            (index >> 16) & 0xFF,
+            (index >> 8) & 0xFF,
+            index & 0xFF,
+        )
+        profile.zone = self.zones[index % zones]
+        profile.phase = rng.uniform(0, self.interval)
+        profile.temperature_offset = rng.normal(0, 0.8)
+        profile.humidity_offset = rng.normal(0, 3)
+        profile.dry = rng.uniform(12, 22) + rng.normal(0, 2, GROUND_SENSORS)
+        profile.wet = rng.uniform(55, 70) + rng.normal(0, 2, GROUND_SENSORS)
+
+        irrigation = zone_irrigation[index % zones]
+        times = np.concatenate([irrigation, rain_times])
+        strengths = np.concatenate([np.ones(len(irrigation)), rain_strengths])
+        order = np.argsort(times)
+        # An event before the start so every reading has one to decay from
+        profile.event_times = np.concatenate(
+            [[self.start - 2 * SECONDS_PER_DAY], times[order]]
+        )
+        profile.event_strengths = np.concatenate([[0.5], strengths[order]])
+        profile.rain_times = np.concatenate([[-np.inf], rain_times])
+
+        gaps = rng.poisson(gaps_per_day * days)
+        starts = np.sort(rng.uniform(self.start, self.end, gaps))
+        # Running maximum so overlapping outages merge; the empty outage in
+        # front gives every reading one to compare against
+        profile.gap_starts = np.concatenate([[-np.inf], starts])
+        profile.gap_ends = np.maximum.accumulate(
+            np.concatenate(
+                [
+                    [-np.inf],
+                    starts + rng.exponential(mean_gap_hours * SECONDS_PER_HOUR, gaps),
+                ]
+            )
+        )
+        return profile
+
+    @property
+    def expected_readings(self) -> int:
+        """Readings the history would hold without outages."""
+        return int(len(self.profiles) * (self.end - self.start) / self.interval)
+
+    def device_columns(self) -> Dict[str, List]:
+        """Rows of the devices table, named after their zone like auto-registered devices."""
+        created_at = np.datetime64(int(self.start), "s")
+        return {
+            "mac_address": [profile.mac_address for profile in self.profiles],
+            "name": [profile.zone for profile in self.profiles],
+            "created_at": np.full(len(self.profiles), created_at),
+            "updated_at": np.full(len(self.profiles), created_at),
+        }
+
+    def _device_window(
+        self, profile: DeviceProfile, window_start: float, window_end: float
+    ) -> Tuple[np.ndarray, ...]:
+        """
+        Readings of one device within a window.
+
+        Returns:
+            (timestamps, values, suspect mask, spiked rows, spiked metric columns)
+        """
+        rng = self.rng
+        first = math.ceil((window_start - self.start - profile.phase) / self.interval)
+        last = math.ceil(
+            (min(window_end, self.end) - self.start - profile.phase) / self.interval
+        )
+        steps = np.arange(max(first, 0), last)
+        t = self.start + profile.phase + steps * self.interval
+        t += np.clip(
+            rng.normal(0, 0.03 * self.interval, len(t)),
+            -0.3 * self.interval,
+            0.3 * self.interval,
+        )
+
+        gap = np.searchsorted(profile.gap_starts, t, side="right") - 1
+        online = t >= profile.gap_ends[gap]
+        t = t[online]
+        n = len(t)
+
+        summer = summerness(t)
+        local_hour = ((t + self.utc_offset) / SECONDS_PER_HOUR) % 24
+        daily = (4 + 3 * summer) * np.cos(2 * np.pi * (local_hour - 15) / 24)
+        weather = np.interp(t, self._weather_times, self._weather)
+        temperature = (
+            9
+            + 14 * summer
+            + profile.temperature_offset
+            + daily
+            + weather
+            + rng.normal(0, 0.3, n)
+        )
+
+        last_rain = profile.rain_times[
+            np.searchsorted(profile.rain_times, t, side="right") - 1
+        ]
+        after_rain = np.exp(-(t - last_rain) / (6 * SECONDS_PER_HOUR))
+        humidity = (
+            65
+            + profile.humidity_offset
+            - 10 * summer
+            - 2.5 * (daily + weather)
+            + 25 * after_rain
+            + rng.normal(0, 1.5, n)
+        )
+
+        values = np.empty((n, len(SENSOR_METRICS)))
+        values[:, 0] = np.clip(humidity, 5, 100)
+        values[:, 1] = temperature
+        drying_hours = 30 + 40 * (1 - summer)
+        for sensor in range(GROUND_SENSORS):
+            # Water reaches deeper sensors later, and they hold it longer
+            delayed = t - (10 + 25 * sensor) * 60
+            event = np.searchsorted(profile.event_times, delayed, side="right") - 1
+            elapsed = np.maximum(delayed - profile.event_times[event], 0)
+            tau = drying_hours * (1 + 0.35 * sensor) * SECONDS_PER_HOUR
+            wetness = (
+                profile.event_strengths[event]
+                * np.exp(-elapsed / tau)
+                * (1 - np.exp(-elapsed / (15 * 60)))
+            )
+            moisture = (
+                profile.dry[sensor]
+                + (profile.wet[sensor] - profile.dry[sensor]) * wetness
+            )
+            values[:, 2 + sensor] = np.clip(moisture + rng.normal(0, 0.4, n), 0, 100)
+
+        spikes = rng.random(n) < self.spike_probability
+        if spikes.any():
+            rows = np.flatnonzero(spikes)
+            metrics = rng.integers(0, len(SENSOR_METRICS), len(rows))
+            signs = rng.choice([-1, 1], len(rows))
+            magnitudes = np.where(
+                metrics == 1,
+                rng.uniform(8, 15, len(rows)),
+                rng.uniform(20, 40, len(rows)),
+            )
+            values[rows, metrics] += signs * magnitudes
+            values[:, 0] = np.clip(values[:, 0], 0, 100)
+            values[:, 2:] = np.clip(values[:, 2:], 0, 100)
+        else:
+            rows = metrics = np.empty(0, dtype=int)
+        return t, np.round(values, 1), spikes, rows, metrics
+
+    def windows(
+        self, window_days: float = 7
+    ) -> Iterator[Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]]:
+        """
+        Generate the history one time window at a time.
+
+        Args:
+            window_days: Length of each window
+
+        Yields:
+            (readings, notifications) as columns for the sensor_activities
+            and notifications tables, readings sorted by measured_at
+        """
+        window_seconds = window_days * SECONDS_PER_DAY
+        recent = self.end - 7 * SECONDS_PER_DAY
+        window_start = self.start
+        while window_start < self.end:
+            window_end = window_start + window_seconds
+            parts = []
+            spike_parts = []
+            for profile in self.profiles:
+                t, values, suspect, rows, metrics = self._device_window(
+                    profile, window_start, window_end
+                )
+                parts.append((profile, t, values, suspect))
+                for row, metric in zip(rows, metrics):
+                    spike_parts.append(
+                        (profile.mac_address, t[row], metric, values[row, metric])
+                    )
+            window_start = window_end
+
+            t = np.concatenate([part[1] for part in parts])
+            order = np.argsort(t, kind="stable")
+            counts = [len(part[1]) for part in parts]
+            readings = {
+                "device_id": np.repeat(
+                    np.array([part[0].mac_address for part in parts], dtype=object),
+                    counts,
+                )[order],
+                "zone": np.repeat(
+                    np.array([part[0].zone for part in parts], dtype=object), counts
+                )[order],
+            }
+            values = np.concatenate([part[2] for part in parts])[order]
+            for column, metric in enumerate(SENSOR_METRICS):
+                readings[metric] = values[:, column]
+            readings["is_suspect"] = np.concatenate([part[3] for part in parts])[order]
+            # History is taken as received when it was measured
+            readings["measured_at"] = (
+                (t[order] * 1e6).astype("int64").astype("datetime64[us]")
+            )
+            readings["created_at"] = readings["measured_at"]
+
+            spike_times = np.array([spike[1] for spike in spike_parts], dtype=float)
+            created_at = (spike_times * 1e6).astype("int64").astype("datetime64[us]")
+            notifications = {
+                "device_id": [spike[0] for spike in spike_parts],
+                "type": ["anomaly_spike"] * len(spike_parts),
+                "is_read": (spike_times < recent)
+                | (self.rng.random(len(spike_parts)) < 0.3),
+                "title": [
+                    f"Sensor {SENSOR_METRICS[spike[2]]} reported a spike"
+                    for spike in spike_parts
+                ],
+                "description": [
+                    f"Synthetic spike (value: {spike[3]})" for spike in spike_parts
+                ],
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+            yield readings, notifications
@@ -0,0 +1,262 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from infrastructure.config.settings import get_settings
+
+
+class TokenBucket:
+    """Live and backfill readings one device may still send right now."""
+
+    __slots__ = (
+        "tokens",
+        "updated_at",
+        "rate",
+        "burst",
+        "backfill_tokens",
+        "backfill_rate",
+        "backfill_burst",
+        "reported",
+    )
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        backfill_rate: float,
+        backfill_burst: float,
+        now: float,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.backfill_rate = backfill_rate
+        self.backfill_burst = backfill_burst
+        self.backfill_tokens = backfill_burst
+        self.updated_at = now
+        # Whether going over the limit was already reported for this bucket
+        self.reported = False
+
+    def has(self, readings: int, backfill: int) -> bool:
+        return self.tokens >= readings and self.backfill_tokens >= backfill
+
+    def take(self, readings: int, backfill: int) -> None:
+        self.tokens -= readings
+        self.backfill_tokens -= backfill
+
+
+class DeviceRateLimiter:
+    """
+    Limits how fast each device may send readings, with a token bucket per MAC.
+
+    A device earns rate readings per second up to burst, so it can catch up
+    after a short outage but can't flood the server. Devices listed in
+    overrides get their own rate and burst.
+
+    Readings a device stored while offline and flushes later are metered
+    apart, against a larger backfill_rate and backfill_burst, so a backlog
+    doesn't eat into the live allowance but a device flushing it on every
+    reboot is still held back.
+
+    Buckets are kept in least recently used order. Every check drops the
+    buckets idle for more than idle_seconds from the front, and the oldest
+    bucket beyond max_devices, so a check is O(1) amortized and memory stays
+    bounded. A bucket idle for burst / rate seconds is full again anyway, so
+    forgetting it only resets whether the device was already reported.
+
+    Memory: about 250 bytes per device.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        max_devices: int,
+        idle_seconds: float = math.inf,
+        overrides: Optional[Dict[str, Sequence[float]]] = None,
+        backfill_rate: Optional[float] = None,
+        backfill_burst: Optional[float] = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.backfill_rate = rate if backfill_rate is None else backfill_rate
+        self.backfill_burst = burst if backfill_burst is None else backfill_burst
+        self.max_devices = max_devices
+        self.idle_seconds = idle_seconds
+        self.overrides = {
+            mac_address.upper(): (float(limits[0]), float(limits[1]))
+            for mac_address, limits in (overrides or {}).items()
+        }
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._unreported: List[str] = []
+        # Ingest runs in worker threads
+        self._lock = threading.Lock()
+
+    def limits_for(self, mac_address: str) -> Tuple[float, float]:
+        """Return the (rate, burst) that applies to a device."""
+        return self.overrides.get(mac_address.upper(), (self.rate, self.burst))
+
+    def _bucket(self, mac_address: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(mac_address)
+        if bucket is None:
+            rate, burst = self.limits_for(mac_address)
+            bucket = self._buckets[mac_address] = TokenBucket(
+                rate, burst, self.backfill_rate, self.backfill_burst, now
+            )
+            if len(self._buckets) > self.max_devices:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(mac_address)
+            elapsed = now - bucket.updated_at
+            bucket.tokens = min(bucket.burst, bucket.tokens + elapsed * bucket.rate)
+            bucket.backfill_tokens = min(
+                bucket.backfill_burst,
+                bucket.backfill_tokens + elapsed * bucket.backfill_rate,
+            )
+            bucket.updated_at = now
+        # The bucket just used is at the end, so this never evicts it
+        while self._buckets:
+            oldest = next(iter(self._buckets.values()))
+            if now - oldest.updated_at <= self.idle_seconds:
+                break
+            self._buckets.popitem(last=False)
+        return bucket
+
+    def allow(
+        self,
+        mac_address: str,
+        readings: int = 1,
+        backfill: int = 0,
+        now: Optional[float] = None,
+    ) -> bool:
+        """
+        Take tokens for readings from the device's bucket if it has enough.
+
+        The first time a device is refused, it is queued for take_unreported().
+
+        Args:
+            mac_address: Device MAC address
+            readings: Live readings the device is sending together
+            backfill: Backfill readings sent with them
+            now: Monotonic time in seconds, for tests
+
+        Returns:
+            True if the readings are within the device's rates
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._bucket(mac_address, now)
+            if bucket.has(readings, backfill):
+                bucket.take(readings, backfill)
+                return True
+            if not bucket.reported:
+                bucket.reported = True
+                self._unreported.append(mac_address)
+            return False
+
+    def allow_all(
+        self,
+        readings: Mapping[str, int],
+        backfill: Optional[Mapping[str, int]] = None,
+        now: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Take tokens from several devices' buckets only if every one has enough.
+
+        Devices refused for the first time are queued for take_unreported().
+
+        Args:
+            readings: Live readings each device is sending, by MAC address
+            backfill: Backfill readings each device is sending, by MAC address
+            now: Monotonic time in seconds, for tests
+
+        Returns:
+            The devices without enough tokens; empty if the tokens were taken
+        """
+        now = time.monotonic() if now is None else now
+        backfill = backfill or {}
+        with self._lock:
+            buckets = {
+                mac_address: self._bucket(mac_address, now)
+                for mac_address in {**readings, **backfill}
+            }
+            counts = {
+                mac_address: (
+                    readings.get(mac_address, 0),
+                    backfill.get(mac_address, 0),
+                )
+                for mac_address in buckets
+            }
+            refused = [
+                mac_address
+                for mac_address, bucket in buckets.items()
+                if not bucket.has(*counts[mac_address])
+            ]
+            if not refused:
+                for mac_address, bucket in buckets.items():
+                    bucket.take(*counts[mac_address])
+                return []
+            for mac_address in refused:
+                if not buckets[mac_address].reported:
+                    buckets[mac_address].reported = True
+                    self._unreported.append(mac_address)
+            return refused
+
+    def retry_after(
+        self, mac_address: str, readings: int = 1, backfill: int = 0
+    ) -> int:
+        """Whole seconds until the device has tokens for the readings again."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(mac_address)
+            if bucket is None:
+                return 0
+            elapsed = now - bucket.updated_at
+            waits = [0]
+            for wanted, tokens, rate, burst in (
+                (readings, bucket.tokens, bucket.rate, bucket.burst),
+                (
+                    backfill,
+                    bucket.backfill_tokens,
+                    bucket.backfill_rate,
+                    bucket.backfill_burst,
+                ),
+            ):
+                tokens = min(burst, tokens + elapsed * rate)
+                missing = min(wanted, burst) - tokens
+                waits.append(math.ceil(missing / rate))
+            return max(waits)
+
+    def take_unreported(self) -> List[str]:
+        """Return the devices refused since the last call, once each."""
+        with self._lock:
+            unreported, self._unreported = self._unreported, []
+        return unreported
+
+
+def is_backfill(
+    measured_at: Optional[datetime], max_age: timedelta, now: datetime
+) -> bool:
+    """
+    Whether a reading was taken long enough ago to count as backfill.
+
+    Readings a device stored while offline and flushes later are metered
+    against the backfill allowance rather than the live one.
+    """
+    return measured_at is not None and measured_at < now - max_age
+
+
+settings = get_settings()
+# Shared limiter for the whole worker process
+device_rate_limiter = DeviceRateLimiter(
+    rate=settings.SENSOR_RATE_LIMIT_PER_SECOND,
+    burst=settings.SENSOR_RATE_LIMIT_BURST,
+    max_devices=settings.SENSOR_RATE_LIMIT_MAX_DEVICES,
+    idle_seconds=settings.SENSOR_RATE_LIMIT_IDLE_SECONDS,
+    overrides=settings.SENSOR_RATE_LIMIT_OVERRIDES,
+    backfill_rate=settings.SENSOR_RATE_LIMIT_BACKFILL_PER_SECOND,
+    backfill_burst=settings.SENSOR_RATE_LIMIT_BACKFILL_BURST,
+)
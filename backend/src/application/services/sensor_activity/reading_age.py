@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from infrastructure.config.settings import get_settings
+from infrastructure.metrics import registry
+
+too_old_total = registry.counter(
+    "sensor_ingest_too_old_total",
+    "Sensor readings rejected because measured_at is older than "
+    "SENSOR_MAX_READING_AGE_DAYS",
+)
+
+
+def check_reading_age(
+    measured_at: Optional[datetime], now: Optional[datetime] = None
+) -> None:
+    """
+    Refuse a reading measured longer ago than SENSOR_MAX_READING_AGE_DAYS.
+
+    Such a reading usually comes from a device whose clock was reset to
+    1970. Refusals are counted in sensor_ingest_too_old_total.
+
+    Args:
+        measured_at: When the reading was taken, None if the device didn't say
+        now: Current time, so a batch is checked against a single instant
+
+    Raises:
+        ValueError: If the reading is too old
+    """
+    if measured_at is None:
+        return
+    now = now or datetime.now(timezone.utc)
+    if measured_at < now - MAX_READING_AGE:
+        too_old_total.inc()
+        raise ValueError("measured_at is too old; check the device clock")
+
+
+settings = get_settings()
+# Readings measured longer ago than this are refused
+MAX_READING_AGE = timedelta(days=settings.SENSOR_MAX_READING_AGE_DAYS)
@@ -0,0 +1,217 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from domain.dtos.sensor_activity.dtos import SensorRetentionReport
+from domain.repositories.retention_watermark.crud import RetentionWatermarkRepository
+from domain.repositories.sensor_activity.crud import SensorActivityRepository
+from domain.repositories.sensor_activity_hourly.crud import (
+    HOURLY_WATERMARK,
+    LATE_ARRIVALS_WATERMARK,
+    SensorActivityHourlyRepository,
+)
+from infrastructure.config.settings import Settings, get_settings
+from infrastructure.database.base import SessionLocal
+from infrastructure.logging_config import get_logger
+from infrastructure.metrics import registry
+
+logger = get_logger(__name__)
+
+rollups_written_total = registry.counter(
+    "sensor_retention_rollups_written_total",
+    "Hourly rollup rows written by sensor data compaction",
+)
+late_rows_merged_total = registry.counter(
+    "sensor_retention_late_rows_merged_total",
+    "Late sensor readings merged into already compacted hourly rollups",
+)
+raw_rows_deleted_total = registry.counter(
+    "sensor_retention_rows_deleted_total",
+    "Raw sensor readings deleted after compaction",
+)
+
+
+def floor_hour(value: datetime) -> datetime:
+    """Truncate a timestamp to the start of its UTC hour."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+class SensorRetentionService:
+    """
+    Compacts old sensor readings into hourly rollups and deletes the raw rows.
+
+    Compaction walks forward one hour of measurement time at a time. Each
+    hour's rollups and the advanced watermark commit in the same transaction,
+    so an interrupted run resumes from the last compacted hour. Raw rows below
+    the watermark are then deleted in throttled batches; the latest reading of
+    every device is kept so the dashboard still lists devices that stopped
+    reporting.
+
+    Every run works on the readings received before a cutoff taken when it
+    starts. Readings received after that, even for hours compacted in the same
+    run, are late arrivals: the next run finds them by arrival time and merges
+    them into the stored rollups instead of recompacting whole hours.
+    """
+
+    def __init__(
+        self,
+        sensor_activity_repository: SensorActivityRepository,
+        hourly_repository: SensorActivityHourlyRepository,
+        watermark_repository: RetentionWatermarkRepository,
+        settings: Optional[Settings] = None,
+    ):
+        self.repository = sensor_activity_repository
+        self.hourly_repository = hourly_repository
+        self.watermark_repository = watermark_repository
+        self.settings = settings or get_settings()
+
+    def run(self, db: Session) -> SensorRetentionReport:
+        """
+        Run compaction and raw data deletion once.
+
+        Args:
+            db: Database session
+
+        Returns:
+            SensorRetentionReport describing the work done
+
+        Raises:
+            HTTPException: If there's an error applying the retention policy
+        """
+        try:
+            return self._run(db)
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error applying sensor data retention: {str(e)}",
+            )
+
+    def _run(self, db: Session) -> SensorRetentionReport:
+        started_at = datetime.now(timezone.utc)
+        start_time = time.perf_counter()
+        horizon = floor_hour(
+            started_at - timedelta(days=self.settings.SENSOR_RAW_RETENTION_DAYS)
+        )
+        watermark = self.watermark_repository.get(db, HOURLY_WATERMARK)
+        received_before = self.watermark_repository.get_database_now(db) - timedelta(
+            seconds=self.settings.SENSOR_LATE_ARRIVAL_GRACE_SECONDS
+        )
+
+        late_rows_merged = self._merge_late(db, watermark, received_before)
+        hours_compacted, rollups_written, watermark = self._compact(
+            db, watermark, horizon, received_before
+        )
+        rows_deleted = (
+            self._delete_compacted(db, watermark, received_before) if watermark else 0
+        )
+
+        report = SensorRetentionReport(
+            started_at=started_at,
+            horizon=horizon,
+            watermark=watermark,
+            hours_compacted=hours_compacted,
+            rollups_written=rollups_written,
+            late_rows_merged=late_rows_merged,
+            rows_deleted=rows_deleted,
+            duration_ms=(time.perf_counter() - start_time) * 1000,
+        )
+        logger.info(
+            "Sensor retention finished: hours=%s rollups=%s late=%s deleted=%s watermark=%s duration=%.2fms",
+            report.hours_compacted,
+            rollups_written,
+            late_rows_merged,
+            rows_deleted,
+            watermark,
+            report.duration_ms,
+        )
+        return report
+
+    def _merge_late(
+        self, db: Session, watermark: Optional[datetime], received_before: datetime
+    ) -> int:
+        received_from = self.watermark_repository.get(db, LATE_ARRIVALS_WATERMARK)
+        if received_from is not None and received_from >= received_before:
+            return 0
+        merged = 0
+        # On the first run every reading received so far is either compacted
+        # or above the watermark, so there is nothing to merge yet
+        if watermark is not None and received_from is not None:
+            merged = self.hourly_repository.merge_late(
+                db, watermark, received_from, received_before
+            )
+        # Compaction below only sees readings received before the cutoff, so
+        # the cutoff must be stored before any hour is compacted
+        self.watermark_repository.set(db, LATE_ARRIVALS_WATERMARK, received_before)
+        db.commit()
+        late_rows_merged_total.inc(merged)
+        return merged
+
+    def _compact(
+        self,
+        db: Session,
+        watermark: Optional[datetime],
+        horizon: datetime,
+        received_before: datetime,
+    ) -> tuple:
+        hours = 0
+        rollups = 0
+        bucket_start = watermark
+        while hours < self.settings.SENSOR_COMPACTION_MAX_HOURS_PER_RUN:
+            # Jump straight to the next hour that has readings
+            next_reading = self.repository.get_oldest_measured_at(
+                db, since=bucket_start
+            )
+            if next_reading is None:
+                break
+            bucket_start = floor_hour(next_reading)
+            if bucket_start >= horizon:
+                break
+            bucket_end = bucket_start + timedelta(hours=1)
+            written = self.hourly_repository.compact_window(
+                db, bucket_start, bucket_end, received_before
+            )
+            self.watermark_repository.set(db, HOURLY_WATERMARK, bucket_end)
+            db.commit()
+            rollups_written_total.inc(written)
+            rollups += written
+            hours += 1
+            watermark = bucket_start = bucket_end
+        return hours, rollups, watermark
+
+    def _delete_compacted(
+        self, db: Session, watermark: datetime, received_before: datetime
+    ) -> int:
+        batch_size = self.settings.SENSOR_RETENTION_DELETE_BATCH_SIZE
+        keep_ids = self.repository.get_latest_ids_per_device(db)
+        total = 0
+        while True:
+            # Late arrivals received after the cutoff aren't merged yet
+            deleted = self.repository.delete_older_than_batch(
+                db, watermark, batch_size, keep_ids, received_before
+            )
+            db.commit()
+            total += deleted
+            raw_rows_deleted_total.inc(deleted)
+            if deleted < batch_size:
+                break
+            time.sleep(self.settings.SENSOR_RETENTION_BATCH_PAUSE_SECONDS)
+        return total
+
+
+def run_sensor_retention() -> None:
+    """Entry point for the background scheduler."""
+    db = SessionLocal()
+    try:
+        SensorRetentionService(
+            SensorActivityRepository(),
+            SensorActivityHourlyRepository(),
+            RetentionWatermarkRepository(),
+        ).run(db)
+    finally:
+        db.close()
@@ -0,0 +1,360 @@
+import math
+from array import array
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from domain.dtos.sensor_activity.dtos import (
+    DeviceRollingStatsResponse,
+    RollingMetricStats,
+)
+from domain.models.sensor_activity import SENSOR_METRICS
+from domain.repositories.device.crud import DeviceRepository
+from domain.repositories.sensor_activity.crud import SensorActivityRepository
+from infrastructure.config.settings import get_settings
+from infrastructure.database.base import SessionLocal
+from infrastructure.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class RollingWindow:
+    """
+    Ring buffer over the last N values of one metric with O(1) statistics.
+
+    Values live in an array('d') of N doubles. Mean and variance are kept with
+    a sliding Welford update, min/max with monotonic deques of positions
+    (amortised O(1)), and the EWMA is updated in place.
+
+    Memory: 8*N bytes for the buffer plus the two deques, which hold at most
+    N small ints each and usually only a handful. With the default N=60 that
+    is roughly 0.5 KB per metric, about 4 KB per device for all 8 metrics.
+    """
+
+    __slots__ = (
+        "size",
+        "alpha",
+        "_values",
+        "_count",
+        "_position",
+        "_mean",
+        "_m2",
+        "_ewma",
+        "_min_positions",
+        "_max_positions",
+    )
+
+    def __init__(self, size: int, alpha: float):
+        self.size = size
+        self.alpha = alpha
+        self._values = array("d", bytes(8 * size))
+        self._count = 0
+        self._position = 0  # Total number of values ever added
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._ewma: Optional[float] = None
+        self._min_positions: deque = deque()
+        self._max_positions: deque = deque()
+
+    def _value_at(self, position: int) -> float:
+        return self._values[position % self.size]
+
+    def add(self, value: float) -> None:
+        """Add a value, evicting the oldest one once the window is full."""
+        index = self._position % self.size
+        if self._count < self.size:
+            self._count += 1
+            delta = value - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (value - self._mean)
+        else:
+            old = self._values[index]
+            new_mean = self._mean + (value - old) / self.size
+            self._m2 += (value - old) * (value - new_mean + old - self._mean)
+            self._mean = new_mean
+        self._values[index] = value
+        self._ewma = (
+            value
+            if self._ewma is None
+            else self.alpha * value + (1 - self.alpha) * self._ewma
+        )
+
+        oldest_kept = self._position - self.size + 1
+        while self._min_positions and self._value_at(self._min_positions[-1]) >= value:
+            self._min_positions.pop()
+        self._min_positions.append(self._position)
+        if self._min_positions[0] < oldest_kept:
+            self._min_positions.popleft()
+        while self._max_positions and self._value_at(self._max_positions[-1]) <= value:
+            self._max_positions.pop()
+        self._max_positions.append(self._position)
+        if self._max_positions[0] < oldest_kept:
+            self._max_positions.popleft()
+        self._position += 1
+
+    def values(self) -> List[float]:
+        """Return the values in the window, oldest first."""
+        start = self._position - self._count
+        return [self._value_at(position) for position in range(start, self._position)]
+
+    def snapshot(self) -> Optional[Dict[str, float]]:
+        """Return the current statistics, or None if the window is empty."""
+        if self._count == 0:
+            return None
+        return {
+            "count": self._count,
+            "min": self._value_at(self._min_positions[0]),
+            "max": self._value_at(self._max_positions[0]),
+            "mean": self._mean,
+            "stddev": math.sqrt(max(self._m2, 0.0) / self._count),
+            "ewma": self._ewma,
+        }
+
+
+class RollingStatsRegistry:
+    """
+    Per-device rolling windows for every sensor metric.
+
+    State is per worker process: each worker sees the readings it ingested
+    itself, on top of the history loaded by warm_up at startup.
+
+    The windows follow the device's live readings, so the time of its latest
+    reading is kept too: a reading measured more than late_after before it is
+    part of a backlog and must not be added, see is_late(). The time of the
+    first live reading of each device is kept as well, so warm_up can put the
+    history before it without counting a reading twice.
+    """
+
+    def __init__(
+        self, window_size: int, alpha: float, late_after: timedelta = timedelta(0)
+    ):
+        self.window_size = window_size
+        self.alpha = alpha
+        self.late_after = late_after
+        self._devices: Dict[str, Dict[str, RollingWindow]] = {}
+        self._latest: Dict[str, datetime] = {}
+        self._first_live: Dict[str, datetime] = {}
+
+    def _new_device(self) -> Dict[str, RollingWindow]:
+        return {
+            metric: RollingWindow(self.window_size, self.alpha)
+            for metric in SENSOR_METRICS
+        }
+
+    @staticmethod
+    def _add_values(
+        windows: Dict[str, RollingWindow], values: Mapping[str, Optional[float]]
+    ) -> None:
+        for metric, window in windows.items():
+            value = values.get(metric)
+            if value is not None:
+                window.add(float(value))
+
+    @staticmethod
+    def _as_utc(measured_at: datetime) -> datetime:
+        if measured_at.tzinfo is None:
+            # SQLite hands timestamps back without their offset
+            return measured_at.replace(tzinfo=timezone.utc)
+        return measured_at
+
+    def _see(self, mac_address: str, measured_at: datetime) -> None:
+        measured_at = self._as_utc(measured_at)
+        latest = self._latest.get(mac_address)
+        if latest is None or measured_at > latest:
+            self._latest[mac_address] = measured_at
+
+    def is_late(self, mac_address: str, measured_at: Optional[datetime]) -> bool:
+        """
+        Whether a reading was measured well before the device's latest one.
+
+        Args:
+            mac_address: Device MAC address
+            measured_at: When the reading was taken, None for just now
+
+        Returns:
+            True if the reading is more than late_after older than the latest
+        """
+        latest = self._latest.get(mac_address)
+        return (
+            measured_at is not None
+            and latest is not None
+            and measured_at < latest - self.late_after
+        )
+
+    def add(
+        self,
+        mac_address: str,
+        values: Mapping[str, Optional[float]],
+        measured_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Add one reading to the device's windows. Missing metrics are skipped.
+
+        Args:
+            mac_address: Device MAC address
+            values: Metric name to value mapping
+            measured_at: When the reading was taken, None for just now
+        """
+        measured_at = self._as_utc(measured_at or datetime.now(timezone.utc))
+        windows = self._devices.get(mac_address)
+        if windows is None:
+            windows = self._devices[mac_address] = self._new_device()
+            self._first_live[mac_address] = measured_at
+        self._add_values(windows, values)
+        self._see(mac_address, measured_at)
+
+    def get(self, mac_address: str) -> Optional[Dict[str, RollingWindow]]:
+        """Return the windows of a device, or None if it has no readings."""
+        return self._devices.get(mac_address)
+
+    def _merge_history(
+        self, mac_address: str, readings: List[Mapping[str, Any]]
+    ) -> Dict[str, RollingWindow]:
+        """Build windows with the history of a device followed by its live values."""
+        first_live = self._first_live.pop(mac_address, None)
+        windows = self._new_device()
+        for reading in readings:
+            measured_at = reading["measured_at"]
+            # Readings stored since the first live one are already in the windows
+            if first_live is None or (
+                measured_at is not None and self._as_utc(measured_at) < first_live
+            ):
+                self._add_values(windows, reading)
+        live = self._devices.get(mac_address)
+        if live is not None:
+            for metric, window in live.items():
+                for value in window.values():
+                    windows[metric].add(value)
+        return windows
+
+    def warm_up(
+        self,
+        db: Session,
+        sensor_activity_repository: SensorActivityRepository,
+        device_repository: DeviceRepository,
+        batch_size: int,
+    ) -> int:
+        """
+        Load the last window_size readings of every device from the database.
+
+        Issues one query per batch of batch_size devices. Devices that already
+        received live readings keep them, after the history measured before
+        the first of them.
+
+        Args:
+            db: Database session
+            sensor_activity_repository: Repository used to read recent readings
+            device_repository: Repository used to list devices
+            batch_size: Number of devices loaded per query
+
+        Returns:
+            Number of devices warmed up
+        """
+        mac_addresses = [
+            device.mac_address for device in device_repository.get_all_devices(db)
+        ]
+        warmed = 0
+        for offset in range(0, len(mac_addresses), batch_size):
+            batch = mac_addresses[offset : offset + batch_size]
+            readings = sensor_activity_repository.get_recent_for_devices(
+                db, batch, self.window_size
+            )
+            history: Dict[str, List[Dict[str, Any]]] = {}
+            for reading in readings:
+                history.setdefault(reading["device_id"], []).append(reading)
+                if reading["measured_at"] is not None:
+                    self._see(reading["device_id"], reading["measured_at"])
+            for mac_address, device_readings in history.items():
+                self._devices[mac_address] = self._merge_history(
+                    mac_address, device_readings
+                )
+                warmed += 1
+        return warmed
+
+
+settings = get_settings()
+# Shared rolling statistics for the whole worker process
+rolling_stats = RollingStatsRegistry(
+    settings.ROLLING_STATS_WINDOW_SIZE,
+    settings.ROLLING_STATS_EWMA_ALPHA,
+    timedelta(seconds=settings.ROLLING_STATS_LATE_SECONDS),
+)
+
+
+class RollingStatsService:
+    """Service class for reading per-device rolling statistics."""
+
+    def __init__(self, registry: Optional[RollingStatsRegistry] = None):
+        self.registry = registry or rolling_stats
+
+    def get_metrics(self, mac_address: str) -> Optional[Dict[str, RollingMetricStats]]:
+        """
+        Get rolling statistics for every metric of a device.
+
+        Args:
+            mac_address: Device MAC address
+
+        Returns:
+            Metric name to RollingMetricStats mapping, or None if the device has no readings
+        """
+        windows = self.registry.get(mac_address)
+        if windows is None:
+            return None
+        metrics = {}
+        for metric, window in windows.items():
+            snapshot = window.snapshot()
+            if snapshot is not None:
+                metrics[metric] = RollingMetricStats(
+                    count=snapshot["count"],
+                    **{
+                        key: round(value, 2)
+                        for key, value in snapshot.items()
+                        if key != "count"
+                    },
+                )
+        return metrics
+
+    def get_device_stats(self, mac_address: str) -> DeviceRollingStatsResponse:
+        """
+        Get rolling statistics for a device.
+
+        Args:
+            mac_address: Device MAC address
+
+        Returns:
+            DeviceRollingStatsResponse with one entry per metric that has readings
+
+        Raises:
+            HTTPException: If there are no readings for the device
+        """
+        metrics = self.get_metrics(mac_address)
+        if not metrics:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No rolling statistics for device with MAC address {mac_address}",
+            )
+        return DeviceRollingStatsResponse(
+            mac_address=mac_address,
+            window_size=self.registry.window_size,
+            metrics=metrics,
+        )
+
+
+def warm_up_rolling_stats() -> None:
+    """Load recent readings into the rolling windows at startup."""
+    db = SessionLocal()
+    try:
+        warmed = rolling_stats.warm_up(
+            db,
+            SensorActivityRepository(),
+            DeviceRepository(),
+            get_settings().ROLLING_STATS_WARMUP_BATCH_SIZE,
+        )
+        logger.info("Rolling statistics warmed up for %s devices", warmed)
+    except Exception:
+        logger.exception("Rolling statistics warm-up failed")
+    finally:
+        db.close()
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from domain.dtos.sensor_activity.dtos import SensorActivityResponse
+from infrastructure.config.settings import get_settings
+
+
+class DeviceSequences:
+    """Sequence numbers one device sent recently."""
+
+    __slots__ = ("high_water_mark", "recent")
+
+    def __init__(self, high_water_mark: Optional[int]):
+        # Highest seq stored for the device; -1 when it never sent one
+        self.high_water_mark = -1 if high_water_mark is None else high_water_mark
+        # None for readings stored by a batch, which doesn't build responses
+        self.recent: "OrderedDict[int, Optional[SensorActivityResponse]]" = (
+            OrderedDict()
+        )
+
+
+class SequenceTracker:
+    """
+    Remembers the sequence numbers each device sent, to answer retries from memory.
+
+    Per device it keeps the highest seq stored (the high-water mark) and the
+    responses of the last recent_size readings. A retry of one of those is
+    answered with a dictionary lookup. A seq above the high-water mark is new
+    without asking the database, and anything else is looked up by the
+    caller, which the unique (device_id, seq) index keeps correct across
+    workers and restarts.
+
+    Memory: about 1 KB per cached response, so recent_size KB per device.
+    """
+
+    def __init__(self, recent_size: int):
+        self.recent_size = recent_size
+        self._devices: Dict[str, DeviceSequences] = {}
+
+    def get(self, mac_address: str) -> Optional[DeviceSequences]:
+        """Return the device's state, or None until load() is called for it."""
+        return self._devices.get(mac_address)
+
+    def load(self, mac_address: str, high_water_mark: Optional[int]) -> DeviceSequences:
+        """
+        Start tracking a device from the highest seq stored for it.
+
+        Args:
+            mac_address: Device MAC address
+            high_water_mark: Highest stored seq, or None if there is none
+
+        Returns:
+            The device's state
+        """
+        state = self._devices[mac_address] = DeviceSequences(high_water_mark)
+        return state
+
+    def remember(
+        self, mac_address: str, seq: int, response: Optional[SensorActivityResponse]
+    ) -> None:
+        """
+        Record a stored reading so retries of it are answered from memory.
+
+        Args:
+            mac_address: Device MAC address
+            seq: Sequence number of the reading
+            response: Stored reading returned to retries, None if not at hand
+        """
+        state = self._devices.get(mac_address)
+        if state is None:
+            state = self.load(mac_address, seq)
+        state.high_water_mark = max(state.high_water_mark, seq)
+        state.recent[seq] = response
+        state.recent.move_to_end(seq)
+        while len(state.recent) > self.recent_size:
+            state.recent.popitem(last=False)
+
+
+# Shared tracker for the whole worker process
+sequence_tracker = SequenceTracker(get_settings().SENSOR_DEDUP_RECENT_PER_DEVICE)
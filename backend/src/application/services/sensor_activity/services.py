@@ -1,18 +1,102 @@
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Set, Tuple, Union
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import timezone
 
 from domain.repositories.sensor_activity.crud import SensorActivityRepository
+from domain.repositories.sensor_activity_hourly.crud import (
+    HOURLY_WATERMARK,
+    SensorActivityHourlyRepository,
+)
+from domain.repositories.retention_watermark.crud import RetentionWatermarkRepository
 from domain.dtos.sensor_activity.dtos import (
     PlantingBox,
+    SensorActivityBatchResponse,
     SensorActivityCreate,
     SensorActivityListResponse,
+    SensorActivityNotStored,
     SensorActivityResponse,
+    SensorActivitySeriesResponse,
+    SensorAnomaly,
 )
 from application.services.device.services import DeviceService
+from application.services.notification.services import NotificationService
+from application.services.sensor_activity.anomaly import (
+    AnomalyDetector,
+    anomaly_detector,
+)
+from application.services.sensor_activity.deadband import (
+    DeadbandFilter,
+    deadband_filter,
+    step_series,
+)
+from application.services.sensor_activity.rate_limit import (
+    DeviceRateLimiter,
+    device_rate_limiter,
+    is_backfill,
+)
+from application.services.sensor_activity.reading_age import check_reading_age
+from application.services.sensor_activity.rolling_stats import RollingStatsService
+from application.services.sensor_activity.sequence_tracker import (
+    SequenceTracker,
+    sequence_tracker,
+)
+from domain.models.sensor_activity import SENSOR_METRICS
 from domain.dtos.device.dtos import DeviceCreate, DeviceResponse
+from domain.dtos.notification.dtos import NotificationCreate
+from domain.repositories.notification.crud import NotificationRepository
+from infrastructure.config.settings import Settings, get_settings
+from infrastructure.logging_config import get_logger
+from infrastructure.metrics import registry
+
+logger = get_logger(__name__)
+
+ingested_rows_total = registry.counter(
+    "sensor_ingest_rows_total",
+    "Sensor readings stored, by whether they were flagged as suspect",
+    ("suspect",),
+)
+ingest_duplicates_total = registry.counter(
+    "sensor_ingest_duplicates_total",
+    "Retried sensor readings answered with the stored one, by where it was found",
+    ("source",),
+)
+duplicate_mismatch_total = registry.counter(
+    "sensor_ingest_duplicate_mismatch_total",
+    "Retried sensor readings whose values differ from the stored reading",
+)
+seq_restarts_total = registry.counter(
+    "sensor_ingest_seq_restarts_total",
+    "Devices that started their sequence numbers again, usually after a reboot",
+)
+rate_limited_total = registry.counter(
+    "sensor_ingest_rate_limited_total",
+    "Sensor readings over their device's rate limit, by whether the request was "
+    "rejected or the reading dropped",
+    ("action",),
+)
+unchanged_total = registry.counter(
+    "sensor_ingest_unchanged_total",
+    "Sensor readings not stored because no metric moved beyond its deadband",
+)
+export_bytes_total = registry.counter(
+    "sensor_export_bytes_total",
+    "Bytes of CSV generated by sensor activity exports",
+)
+
+# Largest step-wise series returned by get_step_series()
+SERIES_MAX_POINTS = 10000
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a timestamp to UTC, taking one without an offset as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
 
 
 class SensorActivityService:
@@ -22,9 +106,86 @@ class SensorActivityService:
         self,
         sensor_activity_repository: SensorActivityRepository,
         device_service: DeviceService,
+        hourly_repository: Optional[SensorActivityHourlyRepository] = None,
+        watermark_repository: Optional[RetentionWatermarkRepository] = None,
+        rolling_stats_service: Optional[RollingStatsService] = None,
+        notification_service: Optional[NotificationService] = None,
+        detector: Optional[AnomalyDetector] = None,
+        tracker: Optional[SequenceTracker] = None,
+        rate_limiter: Optional[DeviceRateLimiter] = None,
+        deadband: Optional[DeadbandFilter] = None,
+        settings: Optional[Settings] = None,
     ):
         self.repository = sensor_activity_repository
         self.device_service = device_service
+        self.hourly_repository = hourly_repository or SensorActivityHourlyRepository()
+        self.watermark_repository = (
+            watermark_repository or RetentionWatermarkRepository()
+        )
+        self.rolling_stats_service = rolling_stats_service or RollingStatsService()
+        self.notification_service = notification_service or NotificationService(
+            NotificationRepository()
+        )
+        self.anomaly_detector = detector or anomaly_detector
+        self.sequence_tracker = tracker or sequence_tracker
+        self.rate_limiter = rate_limiter or device_rate_limiter
+        self.deadband_filter = deadband or deadband_filter
+        self.settings = settings or get_settings()
+
+    def _get_filtered_with_rollups(
+        self,
+        db: Session,
+        skip: int,
+        limit: int,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+    ) -> List[SensorActivityResponse]:
+        """
+        Get sensor activities, falling back to hourly rollups for compacted ranges.
+
+        Raw readings at or after the compaction watermark come first (newest
+        first), followed by hourly rollups before it, paginated as one list.
+        Dates without an offset are taken as UTC.
+
+        Args:
+            db: Database session
+            skip: Number of records to skip (offset)
+            limit: Maximum number of records to return
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+
+        Returns:
+            List of raw and hourly SensorActivityResponse records
+        """
+        start_date, end_date = as_utc(start_date), as_utc(end_date)
+        watermark = as_utc(
+            self.watermark_repository.get_cached(db, HOURLY_WATERMARK)
+        )
+        if watermark is None or (start_date and start_date >= watermark):
+            return self.repository.get_filtered_list(
+                db=db, skip=skip, limit=limit, start_date=start_date, end_date=end_date
+            )
+        if end_date and end_date < watermark:
+            return self.hourly_repository.get_filtered_list(
+                db=db, skip=skip, limit=limit, start_date=start_date, end_date=end_date
+            )
+
+        activities = self.repository.get_filtered_list(
+            db=db, skip=skip, limit=limit, start_date=watermark, end_date=end_date
+        )
+        if len(activities) == limit:
+            return activities
+        if activities or skip == 0:
+            raw_total = skip + len(activities)
+        else:
+            raw_total = self.repository.count_filtered(db, watermark, end_date)
+        return activities + self.hourly_repository.get_filtered_list(
+            db=db,
+            skip=max(0, skip - raw_total),
+            limit=limit - len(activities),
+            start_date=start_date,
+            end_date=watermark,
+        )
 
     def _ensure_device_exists(
         self, db: Session, mac_address: str, zone: Optional[str]
@@ -65,24 +226,436 @@ class SensorActivityService:
                 db, DeviceCreate(mac_address=device.mac_address, name=new_zone)
             )
 
+    def _notify_anomaly(self, db: Session, anomaly: SensorAnomaly) -> None:
+        """
+        Create a notification for an anomaly that just started.
+
+        Args:
+            db: Database session
+            anomaly: The detected anomaly
+        """
+        titles = {
+            "stuck": f"Sensor {anomaly.metric} appears stuck",
+            "spike": f"Sensor {anomaly.metric} reported a spike",
+            "out_of_range": f"Sensor {anomaly.metric} reported an impossible value",
+        }
+        logger.warning(
+            "Anomaly on %s: %s %s (%s)", anomaly.mac_address, anomaly.metric, anomaly.kind, anomaly.detail
+        )
+        self.notification_service.create(
+            db,
+            NotificationCreate(
+                device_id=anomaly.mac_address,
+                type=f"anomaly_{anomaly.kind}",
+                title=titles.get(anomaly.kind, f"Anomaly on sensor {anomaly.metric}"),
+                description=f"{anomaly.detail} (value: {anomaly.value})",
+            ),
+        )
+
+    def _report_rate_limited(self, db: Session) -> None:
+        """
+        Create one notification for every device that just went over its rate limit.
+
+        The limiter hands out each device once until its bucket is forgotten
+        after SENSOR_RATE_LIMIT_IDLE_SECONDS of silence, so a device stuck in
+        a reboot loop is reported once rather than on every reading. Limiters
+        are per worker, so a device already reported by another worker, with
+        the notification still unread, is not reported again.
+
+        Args:
+            db: Database session
+        """
+        for mac_address in self.rate_limiter.take_unreported():
+            rate, burst = self.rate_limiter.limits_for(mac_address)
+            logger.warning(
+                "Device %s went over its rate limit of %s readings/s", mac_address, rate
+            )
+            if self.notification_service.has_unread(db, mac_address, "rate_limited"):
+                continue
+            self._ensure_device_exists(db, mac_address, None)
+            self.notification_service.create(
+                db,
+                NotificationCreate(
+                    device_id=mac_address,
+                    type="rate_limited",
+                    title="Device is sending too many readings",
+                    description=(
+                        f"Readings above {rate:g}/s (bursts of {burst:g}), or "
+                        f"backlogs above {self.rate_limiter.backfill_rate:g}/s "
+                        f"(bursts of {self.rate_limiter.backfill_burst:g}), are "
+                        "being refused; check the device for a reboot loop or a "
+                        "wrong reporting interval"
+                    ),
+                ),
+            )
+
+    def _backfill_flags(self, readings: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Whether each reading counts against its device's backfill allowance.
+
+        Readings measured more than SENSOR_RATE_LIMIT_BACKFILL_SECONDS ago are
+        a backlog flushed after an outage. They are still metered, only at the
+        larger backfill rate, since measured_at comes from the device.
+        """
+        now = datetime.now(timezone.utc)
+        max_age = timedelta(seconds=self.settings.SENSOR_RATE_LIMIT_BACKFILL_SECONDS)
+        return [
+            is_backfill(reading["measured_at"], max_age, now) for reading in readings
+        ]
+
+    def _check_rate_limit(
+        self, db: Session, mac_address: str, measured_at: Optional[datetime]
+    ) -> bool:
+        """
+        Refuse a single reading over its device's rate limit.
+
+        Args:
+            db: Database session
+            mac_address: The MAC address of the device
+            measured_at: When the device took the reading, if it says
+
+        Returns:
+            False if the reading is dropped under the "downsample" policy
+
+        Raises:
+            HTTPException: 429 with Retry-After under the "reject" policy if
+                the device is over its limit
+        """
+        if not self.settings.SENSOR_RATE_LIMIT_ENABLED:
+            return True
+        reading = {"device_id": mac_address, "measured_at": measured_at}
+        backfill = int(self._backfill_flags([reading])[0])
+        if self.rate_limiter.allow(mac_address, 1 - backfill, backfill):
+            return True
+        self._report_rate_limited(db)
+        if self.settings.SENSOR_RATE_LIMIT_POLICY == "downsample":
+            rate_limited_total.inc(action="dropped")
+            return False
+        rate_limited_total.inc(action="rejected")
+        raise HTTPException(
+            status_code=429,
+            detail="The device is sending readings faster than its rate limit",
+            headers={
+                "Retry-After": str(
+                    max(
+                        self.rate_limiter.retry_after(
+                            mac_address, 1 - backfill, backfill
+                        ),
+                        1,
+                    )
+                )
+            },
+        )
+
+    def _check_batch_rate_limit(
+        self, db: Session, readings: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Refuse a whole batch if any of its devices is over its rate limit.
+
+        Tokens are only taken if every device has enough, so a refused batch
+        can be sent again as it is once Retry-After has passed.
+
+        Args:
+            db: Database session
+            readings: Insert parameters with device_id and measured_at
+
+        Raises:
+            HTTPException: 429 with Retry-After if a device is over its limit
+        """
+        counts: Dict[str, int] = {}
+        backfill: Dict[str, int] = {}
+        for reading, is_late in zip(readings, self._backfill_flags(readings)):
+            mac_address = reading["device_id"]
+            bucket = backfill if is_late else counts
+            bucket[mac_address] = bucket.get(mac_address, 0) + 1
+        refused = self.rate_limiter.allow_all(counts, backfill)
+        if not refused:
+            return
+        self._report_rate_limited(db)
+        rate_limited_total.inc(len(readings), action="rejected")
+        retry_after = max(
+            self.rate_limiter.retry_after(
+                mac_address, counts.get(mac_address, 0), backfill.get(mac_address, 0)
+            )
+            for mac_address in refused
+        )
+        detail = "Devices over their rate limit, nothing stored: " + ", ".join(
+            refused
+        )
+        oversized = [
+            mac_address
+            for mac_address in refused
+            if counts.get(mac_address, 0)
+            > self.rate_limiter.limits_for(mac_address)[1]
+            or backfill.get(mac_address, 0) > self.rate_limiter.backfill_burst
+        ]
+        if oversized:
+            detail += (
+                "; these send more readings than their burst and must "
+                "split them across batches: " + ", ".join(oversized)
+            )
+        raise HTTPException(
+            status_code=429,
+            detail=detail,
+            headers={"Retry-After": str(max(retry_after, 1))},
+        )
+
+    def _check_reading_ages(self, readings: List[Dict[str, Any]]) -> None:
+        """
+        Refuse a batch holding readings older than SENSOR_MAX_READING_AGE_DAYS.
+
+        Args:
+            readings: Insert parameters with measured_at
+
+        Raises:
+            HTTPException: 422 listing the positions of the readings too old
+        """
+        now = datetime.now(timezone.utc)
+        too_old = []
+        for index, reading in enumerate(readings):
+            try:
+                check_reading_age(reading["measured_at"], now)
+            except ValueError:
+                too_old.append(index)
+        if too_old:
+            raise HTTPException(
+                status_code=422,
+                detail=(
+                    f"Readings measured more than "
+                    f"{self.settings.SENSOR_MAX_READING_AGE_DAYS} days ago, at "
+                    f"positions {', '.join(map(str, too_old[:20]))}; check the "
+                    "device clock"
+                ),
+            )
+
+    def split_rate_limited(
+        self, readings: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        Take readings from their devices' buckets one by one, in order.
+
+        Args:
+            readings: Insert parameters with device_id and measured_at
+
+        Returns:
+            Tuple of (readings within the limit, indexes of the others)
+        """
+        refused = [
+            index
+            for index, is_late in enumerate(self._backfill_flags(readings))
+            if not self.rate_limiter.allow(
+                readings[index]["device_id"], 1 - is_late, int(is_late)
+            )
+        ]
+        action = (
+            "dropped"
+            if self.settings.SENSOR_RATE_LIMIT_POLICY == "downsample"
+            else "rejected"
+        )
+        rate_limited_total.inc(len(refused), action=action)
+        skipped = set(refused)
+        return [
+            reading for index, reading in enumerate(readings) if index not in skipped
+        ], refused
+
+    def _is_retry(
+        self, stored: SensorActivityResponse, measured_at: Optional[datetime]
+    ) -> bool:
+        """
+        Check whether a stored reading with the same seq is the one being retried.
+
+        Devices start counting from zero again when they reboot, so a stored
+        reading measured more than SENSOR_DEDUP_WINDOW_MINUTES before the new
+        one was sent before the reboot and only shares its seq by chance.
+
+        Args:
+            stored: Stored reading with the same device and seq
+            measured_at: When the new reading was taken, None for just now
+
+        Returns:
+            True if the new reading repeats the stored one
+        """
+        window = timedelta(minutes=self.settings.SENSOR_DEDUP_WINDOW_MINUTES)
+        stored_at = as_utc(stored.measured_at or stored.created_at)
+        return stored_at >= as_utc(measured_at or datetime.now(timezone.utc)) - window
+
+    def _check_retry_values(
+        self, stored: SensorActivityResponse, values: Dict[str, Any]
+    ) -> None:
+        """Warn when a retry carries other values than the reading it repeats."""
+        if any(
+            getattr(stored, metric) != values.get(metric) for metric in SENSOR_METRICS
+        ):
+            duplicate_mismatch_total.inc()
+            logger.warning(
+                "Reading %s of %s was retried with other values; kept the stored one",
+                stored.seq,
+                stored.mac_address,
+            )
+
+    def _restart_seqs(
+        self,
+        db: Session,
+        mac_address: str,
+        seq: int,
+        measured_at: Optional[datetime],
+    ) -> None:
+        """
+        Free the sequence numbers a device used before it started counting again.
+
+        Stored readings from before the restart keep their data but lose their
+        seq, so the device can reuse it.
+
+        Args:
+            db: Database session
+            mac_address: Device MAC address
+            seq: First sequence number seen again
+            measured_at: When the reading with that seq was taken
+        """
+        window = timedelta(minutes=self.settings.SENSOR_DEDUP_WINDOW_MINUTES)
+        measured_before = as_utc(measured_at or datetime.now(timezone.utc)) - window
+        released = self.repository.release_seqs(db, mac_address, seq, measured_before)
+        seq_restarts_total.inc()
+        logger.info(
+            "Device %s started its sequence numbers again at %s; released %s",
+            mac_address,
+            seq,
+            released,
+        )
+        self.sequence_tracker.load(
+            mac_address, self.repository.get_max_seq(db, mac_address)
+        )
+
+    def _find_duplicate(
+        self,
+        db: Session,
+        mac_address: str,
+        seq: int,
+        measured_at: Optional[datetime],
+        values: Dict[str, Any],
+    ) -> Optional[SensorActivityResponse]:
+        """
+        Find the stored reading that a reading with a sequence number repeats.
+
+        Recent readings are answered from memory and a seq above the device's
+        high-water mark is new without a query; only out-of-order or old
+        sequence numbers are looked up in the database. A stored reading from
+        before the device restarted its sequence numbers isn't a duplicate:
+        its seq is released instead.
+
+        Args:
+            db: Database session
+            mac_address: Device MAC address
+            seq: Sequence number sent by the device
+            measured_at: When the reading was taken
+            values: Metric values of the reading
+
+        Returns:
+            The stored reading, or None if the reading is new
+        """
+        state = self.sequence_tracker.get(mac_address)
+        if state is None:
+            state = self.sequence_tracker.load(
+                mac_address, self.repository.get_max_seq(db, mac_address)
+            )
+        source = "memory" if seq in state.recent else "database"
+        stored = state.recent.get(seq)
+        if stored is None:
+            if source == "database" and seq > state.high_water_mark:
+                return None
+            stored = self.repository.get_by_seq(db, mac_address, seq)
+            if stored is None:
+                return None
+        if not self._is_retry(stored, measured_at):
+            self._restart_seqs(db, mac_address, seq, measured_at)
+            return None
+        ingest_duplicates_total.inc(source=source)
+        self._check_retry_values(stored, values)
+        # Devices usually retry more than once
+        self.sequence_tracker.remember(mac_address, seq, stored)
+        return stored
+
     def create(
         self, db: Session, activity_create: SensorActivityCreate
-    ) -> SensorActivityResponse:
+    ) -> Union[SensorActivityResponse, SensorActivityNotStored]:
+        """
+        Create a new sensor activity record, see create_or_get().
+
+        Args:
+            db: Database session
+            activity_create: Sensor activity creation data transfer object
+
+        Returns:
+            The created SensorActivity record, the stored one for a retry, or
+            why the reading wasn't stored
+
+        Raises:
+            HTTPException: If there's an error creating the sensor activity
+        """
+        return self.create_or_get(db, activity_create)[0]
+
+    def create_or_get(
+        self, db: Session, activity_create: SensorActivityCreate
+    ) -> Tuple[Union[SensorActivityResponse, SensorActivityNotStored], bool]:
         """
         Create a new sensor activity record. If the device doesn't exist, it will be created.
         If the device exists and has a different zone name, it will be updated.
+        The reading is checked for anomalies; new anomalies create notifications
+        and, if ANOMALY_MARK_SUSPECT is set, the reading is flagged as suspect
+        when one of them is of a kind in ANOMALY_SUSPECT_KINDS.
+        A reading whose seq was already stored for the device is a retry: the
+        stored record is returned and nothing else happens. Readings over the
+        device's rate limit are refused before any of this, or dropped under
+        the "downsample" policy. With
+        SENSOR_DEADBAND_ENABLED, a reading that doesn't move any metric beyond
+        its deadband since the device's last stored reading isn't stored.
+        Readings measured more than ROLLING_STATS_LATE_SECONDS before the
+        device's latest one are stored without anomaly checks and left out of
+        the rolling statistics.
 
         Args:
             db: Database session
             activity_create: Sensor activity creation data transfer object
 
         Returns:
-            The created SensorActivity record with device information
+            Tuple of (the SensorActivity record with device information, or
+            SensorActivityNotStored if the reading wasn't stored, whether it was
+            created by this call)
 
         Raises:
+            HTTPException: 422 if the reading is older than
+                SENSOR_MAX_READING_AGE_DAYS
+            HTTPException: 429 if the device is over its rate limit under the
+                "reject" policy
             HTTPException: If there's an error creating the sensor activity
         """
+        mac_address, seq = activity_create.mac_address, activity_create.seq
         try:
+            check_reading_age(activity_create.measured_at)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        try:
+            if not self._check_rate_limit(db, mac_address, activity_create.measured_at):
+                return (
+                    SensorActivityNotStored(
+                        reason="rate_limited",
+                        detail="Reading dropped: the device is over its rate limit",
+                    ),
+                    False,
+                )
+
+            # Step 0: Answer retries with the stored reading
+            values = {
+                metric: getattr(activity_create, metric) for metric in SENSOR_METRICS
+            }
+            if seq is not None:
+                duplicate = self._find_duplicate(
+                    db, mac_address, seq, activity_create.measured_at, values
+                )
+                if duplicate is not None:
+                    return duplicate, False
+
             # Step 1: Ensure device exists
             device = self._ensure_device_exists(
                 db, activity_create.mac_address, activity_create.zone
@@ -92,14 +665,337 @@ class SensorActivityService:
             if activity_create.zone:
                 self._update_device_zone(db, device, activity_create.zone)
 
-            # Step 3: Create sensor activity record
-            return self.repository.create(db, activity_create)
+            # Step 3: Check the reading for anomalies, unless it is a late one
+            # that would be compared with readings taken after it
+            registry = self.rolling_stats_service.registry
+            live = not registry.is_late(mac_address, activity_create.measured_at)
+            anomalies: List[SensorAnomaly] = []
+            started: List[SensorAnomaly] = []
+            if self.settings.ANOMALY_DETECTION_ENABLED and live:
+                anomalies, started = self.anomaly_detector.check(
+                    activity_create.mac_address, values
+                )
+            is_suspect = self._is_suspect(anomalies)
+
+            # Step 4: Skip readings that repeat the last stored one
+            if self.settings.SENSOR_DEADBAND_ENABLED and not self._should_store(
+                mac_address,
+                values,
+                activity_create.measured_at or datetime.now(timezone.utc),
+                anomalies,
+            ):
+                if live:
+                    registry.add(
+                        mac_address,
+                        self._trusted_values(values, anomalies),
+                        activity_create.measured_at,
+                    )
+                for anomaly in started:
+                    self._notify_anomaly(db, anomaly)
+                unchanged_total.inc()
+                return (
+                    SensorActivityNotStored(
+                        reason="unchanged",
+                        detail="Reading not stored: no metric moved beyond its "
+                        "deadband",
+                    ),
+                    False,
+                )
+
+            # Step 5: Create sensor activity record
+            try:
+                activity = self.repository.create(
+                    db, activity_create, is_suspect=is_suspect
+                )
+            except IntegrityError:
+                # Another worker stored the same seq first
+                db.rollback()
+                stored = (
+                    self.repository.get_by_seq(db, mac_address, seq)
+                    if seq is not None
+                    else None
+                )
+                if stored is None:
+                    raise
+                ingest_duplicates_total.inc(source="database")
+                self.sequence_tracker.remember(mac_address, seq, stored)
+                return stored, False
+            ingested_rows_total.inc(suspect=str(is_suspect).lower())
+            if seq is not None:
+                self.sequence_tracker.remember(mac_address, seq, activity)
+
+            # Step 6: Feed the in-memory rolling statistics with trusted values
+            if live:
+                registry.add(
+                    mac_address,
+                    self._trusted_values(values, anomalies),
+                    activity_create.measured_at,
+                )
+
+            # Step 7: Notify about anomalies that just started
+            for anomaly in started:
+                self._notify_anomaly(db, anomaly)
+            return activity, True
 
+        except HTTPException:
+            raise
         except Exception as e:
+            self.deadband_filter.forget([mac_address])
             raise HTTPException(
                 status_code=500, detail=f"Error creating sensor activity: {str(e)}"
             )
 
+    def _is_suspect(self, anomalies: List[SensorAnomaly]) -> bool:
+        """Whether a reading with these anomalies is flagged as suspect."""
+        return self.settings.ANOMALY_MARK_SUSPECT and any(
+            anomaly.kind in self.settings.ANOMALY_SUSPECT_KINDS for anomaly in anomalies
+        )
+
+    @staticmethod
+    def _trusted_values(
+        values: Dict[str, Optional[float]], anomalies: List[SensorAnomaly]
+    ) -> Dict[str, Optional[float]]:
+        """The values of a reading without its anomalous metrics, for statistics."""
+        anomalous = {anomaly.metric for anomaly in anomalies}
+        return {
+            metric: None if metric in anomalous else value
+            for metric, value in values.items()
+        }
+
+    def _should_store(
+        self,
+        mac_address: str,
+        values: Dict[str, Optional[float]],
+        measured_at: datetime,
+        anomalies: List[SensorAnomaly],
+    ) -> bool:
+        """
+        Check a reading against the deadband of its device.
+
+        Spikes and out-of-range readings are always stored, and so is the
+        reading after them, so a step-wise series doesn't hold the suspect
+        value. Stuck readings repeat the last stored one and go through the
+        deadband like any other.
+
+        Args:
+            mac_address: Device MAC address
+            values: Metric values of the reading
+            measured_at: When the reading was taken
+            anomalies: Anomalies detected in the reading
+
+        Returns:
+            True if the reading must be stored
+        """
+        if any(anomaly.kind != "stuck" for anomaly in anomalies):
+            self.deadband_filter.forget([mac_address])
+            return True
+        return self.deadband_filter.should_store(mac_address, values, measured_at)
+
+    def _split_duplicates(
+        self, db: Session, readings: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Drop readings whose seq is already stored or repeated within the batch.
+
+        Works like _find_duplicate(), but the sequence numbers that need the
+        database are looked up with one query per device, and a device that
+        restarted its sequence numbers has its old ones released once.
+
+        Args:
+            db: Database session
+            readings: Insert parameters with device_id and seq
+
+        Returns:
+            Tuple of (new readings in their original order, duplicates dropped)
+        """
+        dropped: Set[int] = set()
+        seen: Set[Tuple[str, int]] = set()
+        to_check: Dict[str, List[int]] = {}
+        for index, reading in enumerate(readings):
+            mac_address, seq = reading["device_id"], reading["seq"]
+            if seq is None:
+                continue
+            if (mac_address, seq) in seen:
+                ingest_duplicates_total.inc(source="memory")
+                dropped.add(index)
+                continue
+            seen.add((mac_address, seq))
+            state = self.sequence_tracker.get(mac_address)
+            if state is None:
+                state = self.sequence_tracker.load(
+                    mac_address, self.repository.get_max_seq(db, mac_address)
+                )
+            cached = state.recent.get(seq)
+            if cached is not None and self._is_retry(cached, reading["measured_at"]):
+                ingest_duplicates_total.inc(source="memory")
+                self._check_retry_values(cached, reading)
+                dropped.add(index)
+            elif seq in state.recent or seq <= state.high_water_mark:
+                to_check.setdefault(mac_address, []).append(index)
+        for mac_address, indexes in to_check.items():
+            stored = self.repository.get_by_seqs(
+                db, mac_address, [readings[index]["seq"] for index in indexes]
+            )
+            restarted = []
+            for index in indexes:
+                reading = readings[index]
+                previous = stored.get(reading["seq"])
+                if previous is None:
+                    continue
+                if self._is_retry(previous, reading["measured_at"]):
+                    ingest_duplicates_total.inc(source="database")
+                    self._check_retry_values(previous, reading)
+                    dropped.add(index)
+                else:
+                    restarted.append(reading)
+            if restarted:
+                first = min(restarted, key=lambda reading: reading["seq"])
+                self._restart_seqs(db, mac_address, first["seq"], first["measured_at"])
+        return [
+            reading for index, reading in enumerate(readings) if index not in dropped
+        ], len(dropped)
+
+    def create_batch(
+        self,
+        db: Session,
+        readings: List[Dict[str, Any]],
+        check_rate_limit: bool = True,
+    ) -> SensorActivityBatchResponse:
+        """
+        Store many readings with one INSERT and one commit.
+
+        Readings go through the same steps as in create_or_get(): if a device
+        is over its rate limit, the whole batch is refused under the "reject"
+        policy and its excess readings are dropped under "downsample". Then
+        devices are registered and their zones updated, retries are skipped
+        by seq, every reading but the late ones is checked for anomalies in
+        order and, with SENSOR_DEADBAND_ENABLED, readings within the deadband
+        are skipped. The records are inserted together and no response is
+        built per reading.
+
+        Args:
+            db: Database session
+            readings: Insert parameters as returned by decode_readings():
+                device_id, zone, the metrics, measured_at and seq
+            check_rate_limit: False if the caller already took the readings
+                from the rate limiter
+
+        Returns:
+            SensorActivityBatchResponse with the counts
+
+        Raises:
+            HTTPException: 422 if a reading is older than
+                SENSOR_MAX_READING_AGE_DAYS
+            HTTPException: 429 with Retry-After if a device is over its rate
+                limit under the "reject" policy
+            HTTPException: If there's an error storing the readings
+        """
+        self._check_reading_ages(readings)
+        try:
+            accepted = readings
+            if check_rate_limit and self.settings.SENSOR_RATE_LIMIT_ENABLED:
+                if self.settings.SENSOR_RATE_LIMIT_POLICY == "downsample":
+                    accepted = self.split_rate_limited(readings)[0]
+                else:
+                    self._check_batch_rate_limit(db, readings)
+            new_readings, duplicates = self._split_duplicates(db, accepted)
+
+            zones: Dict[str, Optional[str]] = {}
+            for reading in new_readings:
+                mac_address = reading["device_id"]
+                zones[mac_address] = reading["zone"] or zones.get(mac_address)
+            for mac_address, zone in zones.items():
+                device = self._ensure_device_exists(db, mac_address, zone)
+                if zone:
+                    self._update_device_zone(db, device, zone)
+
+            received_at = datetime.now(timezone.utc)
+            registry = self.rolling_stats_service.registry
+            started: List[SensorAnomaly] = []
+            rows = []
+            unchanged = 0
+            for reading in new_readings:
+                values = {metric: reading[metric] for metric in SENSOR_METRICS}
+                measured_at = reading["measured_at"] or received_at
+                anomalies: List[SensorAnomaly] = []
+                # Late readings would be compared with readings taken after them
+                if not registry.is_late(reading["device_id"], measured_at):
+                    if self.settings.ANOMALY_DETECTION_ENABLED:
+                        anomalies, new_started = self.anomaly_detector.check(
+                            reading["device_id"], values
+                        )
+                        started.extend(new_started)
+                    registry.add(
+                        reading["device_id"],
+                        self._trusted_values(values, anomalies),
+                        measured_at,
+                    )
+                if self.settings.SENSOR_DEADBAND_ENABLED and not self._should_store(
+                    reading["device_id"], values, measured_at, anomalies
+                ):
+                    unchanged += 1
+                    continue
+                rows.append(
+                    {
+                        **reading,
+                        "measured_at": measured_at,
+                        "is_suspect": self._is_suspect(anomalies),
+                    }
+                )
+
+            try:
+                inserted = self.repository.create_many(db, rows)
+            except IntegrityError:
+                # Another worker stored some of the seqs first
+                db.rollback()
+                stored: Set[Tuple[str, int]] = set()
+                by_device: Dict[str, List[int]] = {}
+                for row in rows:
+                    if row["seq"] is not None:
+                        by_device.setdefault(row["device_id"], []).append(row["seq"])
+                for mac_address, seqs in by_device.items():
+                    stored.update(
+                        (mac_address, seq)
+                        for seq in self.repository.get_stored_seqs(
+                            db, mac_address, seqs
+                        )
+                    )
+                remaining = [
+                    row for row in rows if (row["device_id"], row["seq"]) not in stored
+                ]
+                raced = len(rows) - len(remaining)
+                ingest_duplicates_total.inc(raced, source="database")
+                duplicates += raced
+                rows = remaining
+                inserted = self.repository.create_many(db, rows)
+
+            for row in rows:
+                if row["seq"] is not None:
+                    self.sequence_tracker.remember(row["device_id"], row["seq"], None)
+            suspect = sum(1 for row in rows if row["is_suspect"])
+            unchanged_total.inc(unchanged)
+            ingested_rows_total.inc(suspect, suspect="true")
+            ingested_rows_total.inc(inserted - suspect, suspect="false")
+            for anomaly in started:
+                self._notify_anomaly(db, anomaly)
+            self._report_rate_limited(db)
+            return SensorActivityBatchResponse(
+                received=len(readings),
+                inserted=inserted,
+                duplicates=duplicates,
+                suspect=suspect,
+                rate_limited=len(readings) - len(accepted),
+                unchanged=unchanged,
+            )
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            self.deadband_filter.forget({reading["device_id"] for reading in readings})
+            raise HTTPException(
+                status_code=500, detail=f"Error creating sensor activities: {str(e)}"
+            )
+
     def get_filtered_list(
         self,
         db: Session,
@@ -110,6 +1006,7 @@ class SensorActivityService:
     ) -> List[SensorActivityResponse]:
         """
         Get a filtered and paginated list of sensor activities.
+        Ranges older than the raw retention window are served from hourly rollups.
 
         Args:
             db: Database session
@@ -125,8 +1022,8 @@ class SensorActivityService:
             HTTPException: If there's an error retrieving the sensor activities
         """
         try:
-            activities = self.repository.get_filtered_list(
-                db=db, skip=skip, limit=limit, start_date=start_date, end_date=end_date
+            activities = self._get_filtered_with_rollups(
+                db, skip, limit, start_date, end_date
             )
             if not activities:
                 raise HTTPException(
@@ -272,7 +1169,8 @@ class SensorActivityService:
 
         for activity in latest_activities:
             # Check if the latest reading is more than 10 minutes old
-            is_active = (current_time - activity.created_at) <= ten_minutes
+            measured_at = activity.measured_at or activity.created_at
+            is_active = (current_time - measured_at) <= ten_minutes
             status = "active" if is_active else "inactive"
 
             result.append(
@@ -280,7 +1178,7 @@ class SensorActivityService:
                     mac_address=activity.mac_address,
                     name=str(activity.zone or activity.mac_address),
                     status=status,
-                    latest_reading=activity.created_at,
+                    latest_reading=measured_at,
                     environment_temperature=round(float(activity.env_temperature or 0), 2),
                     environment_humidity=round(float(activity.env_humidity or 0), 2),
                     planting_boxes=[
@@ -301,6 +1199,9 @@ class SensorActivityService:
                             ground_humidity=round(max(0, float(activity.ground_sensor_4 or 0)), 2),
                         ),
                     ],
+                    rolling_stats=self.rolling_stats_service.get_metrics(
+                        activity.mac_address
+                    ),
                 )
             )
         return result
@@ -324,12 +1225,12 @@ class SensorActivityService:
             start_date = end_date - timedelta(days=90)  # Approximately 3 months
             
             # Get all sensor activities for the last three months without pagination limit
-            activities = self.repository.get_filtered_list(
-                db=db, 
-                skip=0, 
+            activities = self._get_filtered_with_rollups(
+                db,
+                skip=0,
                 limit=10000,  # Large limit to get all records
-                start_date=start_date, 
-                end_date=end_date
+                start_date=start_date,
+                end_date=end_date,
             )
             
             if not activities:
@@ -344,7 +1245,7 @@ class SensorActivityService:
             
             for activity in activities:
                 csv_row = [
-                    str(activity.id),
+                    str(activity.id if activity.id is not None else ""),
                     activity.mac_address,
                     str(activity.zone or ""),
                     str(activity.env_humidity if activity.env_humidity is not None else ""),
@@ -355,11 +1256,15 @@ class SensorActivityService:
                     str(activity.ground_sensor_4 if activity.ground_sensor_4 is not None else ""),
                     str(activity.ground_sensor_5 if activity.ground_sensor_5 is not None else ""),
                     str(activity.ground_sensor_6 if activity.ground_sensor_6 is not None else ""),
-                    activity.created_at.astimezone().strftime("%Y-%m-%d %I:%M:%S %p %Z")
+                    (activity.measured_at or activity.created_at)
+                    .astimezone()
+                    .strftime("%Y-%m-%d %I:%M:%S %p %Z")
                 ]
                 csv_content.append(",".join(csv_row))
             
-            return "\n".join(csv_content)
+            csv_data = "\n".join(csv_content)
+            export_bytes_total.inc(len(csv_data.encode("utf-8")))
+            return csv_data
             
         except HTTPException as he:
             raise he
@@ -367,3 +1272,104 @@ class SensorActivityService:
             raise HTTPException(
                 status_code=500, detail=f"Error generating CSV data: {str(e)}"
             )
+
+    def get_anomalies(
+        self, db: Session, mac_address: str, limit: int = 1000
+    ) -> List[SensorAnomaly]:
+        """
+        Scan the recent history of a device for anomalies in batch.
+
+        Args:
+            db: Database session
+            mac_address: The MAC address of the device
+            limit: Number of most recent readings to scan
+
+        Returns:
+            List of anomalies found, oldest first
+
+        Raises:
+            HTTPException: If the device has no readings or if there's an error scanning them
+        """
+        try:
+            readings = self.repository.get_recent_for_devices(db, [mac_address], limit)
+            if not readings:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"No sensor activity found for device with MAC address {mac_address}",
+                )
+            return self.anomaly_detector.detect_history(mac_address, readings)
+        except HTTPException as he:
+            raise he
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error scanning sensor activity: {str(e)}"
+            )
+
+    def get_step_series(
+        self,
+        db: Session,
+        mac_address: str,
+        start_date: datetime,
+        end_date: datetime,
+        step_seconds: int,
+    ) -> SensorActivitySeriesResponse:
+        """
+        Rebuild a device's readings as a step-wise series with a point per step.
+
+        With deadband compression only readings that changed, and a heartbeat,
+        are stored, so every point holds the last reading stored at or before
+        it. A reading is held for twice SENSOR_DEADBAND_HEARTBEAT_MINUTES at
+        most, after which the device stopped reporting and the point is null.
+        Ranges already compacted into hourly rollups have no raw readings.
+
+        Args:
+            db: Database session
+            mac_address: The MAC address of the device
+            start_date: First point
+            end_date: Last possible point
+            step_seconds: Seconds between points
+
+        Returns:
+            SensorActivitySeriesResponse with the points, oldest first
+
+        Raises:
+            HTTPException: 400 if the range is empty or needs too many points
+            HTTPException: 404 if the device has no readings up to end_date
+            HTTPException: If there's an error reading the series
+        """
+        if end_date < start_date:
+            raise HTTPException(
+                status_code=400, detail="end_date must not be before start_date"
+            )
+        step = timedelta(seconds=step_seconds)
+        count = int((end_date - start_date) / step) + 1
+        if count > SERIES_MAX_POINTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"The series would have more than {SERIES_MAX_POINTS} points; "
+                "use a larger step or a shorter range",
+            )
+        try:
+            readings = self.repository.get_readings_between(
+                db, mac_address, start_date, end_date
+            )
+            if not readings:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"No sensor activity found for device with MAC address {mac_address}",
+                )
+            heartbeat = self.settings.SENSOR_DEADBAND_HEARTBEAT_MINUTES
+            hold = timedelta(minutes=2 * heartbeat)
+            return SensorActivitySeriesResponse(
+                mac_address=mac_address,
+                step_seconds=step_seconds,
+                hold_seconds=int(hold.total_seconds()),
+                points=step_series(readings, start_date, step, count, hold),
+            )
+        except HTTPException as he:
+            raise he
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error reading sensor activity series: {str(e)}",
+            )
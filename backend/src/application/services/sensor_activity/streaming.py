@@ -0,0 +1,183 @@
+"""
+Ingestion of newline-delimited JSON readings over a long-lived connection.
+
+A gateway streams one SensorActivityCreate object per line. Lines are parsed
+as the bytes arrive and the readings are stored in batches through
+SensorActivityService.create_batch, one session and one commit per batch.
+Every stored batch is acknowledged with the number of lines consumed so far,
+so the gateway can discard what it buffered up to that line and resend the
+rest after a disconnect; readings carrying a seq are deduplicated on resend.
+Lines refused by the rate limit are listed in the ack so they can be resent.
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from application.services.sensor_activity.reading_age import check_reading_age
+from application.services.sensor_activity.services import SensorActivityService
+from domain.dtos.sensor_activity.dtos import (
+    SensorActivityCreate,
+    SensorActivityStreamAck,
+)
+from domain.models.sensor_activity import SENSOR_METRICS
+
+# Errors reported per acknowledgement; the rest are only counted
+MAX_ERRORS_PER_ACK = 10
+
+
+def as_reading(activity: SensorActivityCreate) -> Dict[str, Any]:
+    """Insert parameters for a validated reading, as decode_readings() returns."""
+    return {
+        "device_id": activity.mac_address,
+        "zone": activity.zone,
+        **{metric: getattr(activity, metric) for metric in SENSOR_METRICS},
+        "measured_at": activity.measured_at,
+        "seq": activity.seq,
+    }
+
+
+class ReadingStreamIngestor:
+    """
+    Parses an NDJSON byte stream and stores its readings in batches.
+
+    feed() only parses, so it can run on the event loop; flush() talks to the
+    database and belongs in a worker thread. The caller decides when to
+    flush, usually when ready() says a batch is full or has waited long
+    enough.
+    """
+
+    def __init__(
+        self,
+        service: SensorActivityService,
+        db: Session,
+        batch_size: int,
+        flush_seconds: float,
+        max_line_bytes: int,
+    ):
+        self.service = service
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_line_bytes = max_line_bytes
+        self.lines = 0
+        self._buffer = bytearray()
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_lines: List[int] = []
+        self._rejected = 0
+        self._errors: List[str] = []
+        self._first_pending_at: Optional[float] = None
+
+    def _parse_line(self, line: bytes) -> None:
+        self.lines += 1
+        if self._first_pending_at is None:
+            self._first_pending_at = time.monotonic()
+        line = line.strip()
+        if not line:
+            return
+        try:
+            if len(line) > self.max_line_bytes:
+                raise ValueError(f"longer than {self.max_line_bytes} bytes")
+            activity = SensorActivityCreate.model_validate_json(line)
+            check_reading_age(activity.measured_at)
+        except ValidationError as e:
+            self._reject(
+                "; ".join(
+                    f"{'.'.join(map(str, error['loc'])) or 'line'}: {error['msg']}"
+                    for error in e.errors(include_url=False)
+                )
+            )
+            return
+        except ValueError as e:
+            self._reject(str(e))
+            return
+        self._pending.append(as_reading(activity))
+        self._pending_lines.append(self.lines)
+
+    def _reject(self, detail: str) -> None:
+        self._rejected += 1
+        if len(self._errors) < MAX_ERRORS_PER_ACK:
+            self._errors.append(f"line {self.lines}: {detail}")
+
+    def feed(self, data: bytes) -> None:
+        """
+        Parse the complete lines in data; a trailing partial line is kept.
+
+        Args:
+            data: Next bytes of the stream, split anywhere
+        """
+        self._buffer += data
+        start = 0
+        while True:
+            end = self._buffer.find(b"\n", start)
+            if end == -1:
+                break
+            self._parse_line(bytes(self._buffer[start:end]))
+            start = end + 1
+        del self._buffer[:start]
+        # A line that never ends would otherwise grow the buffer forever
+        if len(self._buffer) > self.max_line_bytes:
+            self._parse_line(bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self) -> None:
+        """Parse the last line when the stream doesn't end with a newline."""
+        if self._buffer:
+            self._parse_line(bytes(self._buffer))
+            self._buffer.clear()
+
+    def ready(self) -> bool:
+        """Whether a batch is full or its first line waited flush_seconds."""
+        if len(self._pending) >= self.batch_size:
+            return True
+        return (
+            self._first_pending_at is not None
+            and time.monotonic() - self._first_pending_at >= self.flush_seconds
+        )
+
+    def seconds_until_ready(self) -> Optional[float]:
+        """Seconds until ready() turns true by time alone, None if nothing waits."""
+        if self._first_pending_at is None:
+            return None
+        elapsed = time.monotonic() - self._first_pending_at
+        return max(self.flush_seconds - elapsed, 0.0)
+
+    def flush(self) -> Optional[SensorActivityStreamAck]:
+        """
+        Store the parsed readings and acknowledge every line consumed so far.
+
+        Returns:
+            SensorActivityStreamAck, or None if no line arrived since the
+            last one
+
+        Raises:
+            HTTPException: If the readings can't be stored
+        """
+        if self._first_pending_at is None:
+            return None
+        readings, self._pending = self._pending, []
+        lines, self._pending_lines = self._pending_lines, []
+        accepted, refused = readings, []
+        settings = self.service.settings
+        if settings.SENSOR_RATE_LIMIT_ENABLED:
+            accepted, refused = self.service.split_rate_limited(readings)
+        result = self.service.create_batch(self.db, accepted, check_rate_limit=False)
+        ack = SensorActivityStreamAck(
+            line=self.lines,
+            rejected=self._rejected,
+            errors=self._errors,
+            rate_limited_lines=(
+                [lines[index] for index in refused]
+                if settings.SENSOR_RATE_LIMIT_POLICY == "reject"
+                else []
+            ),
+            **result.model_dump(exclude={"received", "rate_limited"}),
+            received=len(readings),
+            rate_limited=len(refused),
+        )
+        self._rejected = 0
+        self._errors = []
+        self._first_pending_at = None
+        return ack
@@ -7,11 +7,14 @@ class DeviceBase(BaseModel):
     """Base Pydantic model for Device data."""
 
     mac_address: Annotated[
-        str, StringConstraints(pattern=r"^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$")
+        str,
+        StringConstraints(
+            pattern=r"^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$", to_upper=True
+        ),
     ] = Field(
         title="MAC Address",
-        description="Device MAC address in format XX:XX:XX:XX:XX:XX",
-        examples=["35:98:f4:d1:86:51"],
+        description="Device MAC address in format XX:XX:XX:XX:XX:XX (upper case)",
+        examples=["35:98:F4:D1:86:51"],
     )
 
     name: Optional[Annotated[str, StringConstraints(min_length=1, max_length=100)]] = (
@@ -34,3 +34,20 @@ class NotificationResponse(NotificationBase):
         """Pydantic configuration."""
 
         from_attributes = True
+
+
+class NotificationRetentionReport(BaseModel):
+    """DTO describing the outcome of a notification retention run."""
+
+    dry_run: bool = Field(..., description="Whether rows were only counted")
+    started_at: datetime = Field(..., description="When the run started")
+    read_cutoff: datetime = Field(
+        ..., description="Read notifications created before this are deleted"
+    )
+    unread_cutoff: datetime = Field(
+        ..., description="Unread notifications created before this are archived"
+    )
+    deleted: int = Field(0, description="Read notifications deleted (or eligible)")
+    archived: int = Field(0, description="Unread notifications archived (or eligible)")
+    batches: int = Field(0, description="Number of batches executed")
+    duration_ms: float = Field(0, description="Total run time in milliseconds")
@@ -1,17 +1,23 @@
-from datetime import datetime
-from typing import Annotated, Optional
-from pydantic import BaseModel, Field, StringConstraints
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Dict, List, Optional
+from pydantic import BaseModel, Field, StringConstraints, field_validator
+
+# Device clocks ahead of the server by more than this are rejected
+MAX_CLOCK_SKEW = timedelta(minutes=5)
 
 
 class SensorActivityBase(BaseModel):
     """Base Pydantic model for Sensor Activity data."""
 
     mac_address: Annotated[
-        str, StringConstraints(pattern=r"^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$")
+        str,
+        StringConstraints(
+            pattern=r"^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$", to_upper=True
+        ),
     ] = Field(
         title="MAC Address",
-        description="Device MAC address in format XX:XX:XX:XX:XX:XX",
-        examples=["35:98:f4:d1:86:51"],
+        description="Device MAC address in format XX:XX:XX:XX:XX:XX (upper case)",
+        examples=["35:98:F4:D1:86:51"],
     )
     zone: Optional[str] = Field(
         default=None,
@@ -69,6 +75,42 @@ class SensorActivityBase(BaseModel):
         description="Ground sensor 6 reading",
         examples=[505],
     )
+    measured_at: Optional[datetime] = Field(
+        default=None,
+        title="Measured At",
+        description=(
+            "When the device took the reading, for readings stored and forwarded "
+            "later; defaults to the arrival time. Timestamps without an offset are "
+            "taken as UTC"
+        ),
+        examples=["2024-03-09T14:06:36Z"],
+    )
+    seq: Optional[int] = Field(
+        default=None,
+        title="Sequence Number",
+        description=(
+            "Counter the device increments for every new reading and repeats when "
+            "retrying one. A reading whose sequence number was already stored for "
+            "the device is not stored again. It must not restart from zero, so "
+            "firmware should keep it across reboots"
+        ),
+        ge=0,
+        le=2**63 - 1,
+        examples=[1042],
+    )
+
+    @field_validator("measured_at")
+    @classmethod
+    def normalise_measured_at(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Store measurement times in UTC and reject clocks far ahead of ours."""
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        value = value.astimezone(timezone.utc)
+        if value > datetime.now(timezone.utc) + MAX_CLOCK_SKEW:
+            raise ValueError("measured_at is in the future; check the device clock")
+        return value
 
 
 class SensorActivityCreate(SensorActivityBase):
@@ -87,6 +129,8 @@ class SensorActivityCreate(SensorActivityBase):
                 "ground_sensor_4": 510,
                 "ground_sensor_5": 490,
                 "ground_sensor_6": 505,
+                "measured_at": "2024-03-09T14:06:36Z",
+                "seq": 1042,
             }
         }
 
@@ -94,8 +138,10 @@ class SensorActivityCreate(SensorActivityBase):
 class SensorActivityResponse(BaseModel):
     """Pydantic model for Sensor Activity responses including timestamps and ID."""
 
-    id: int = Field(
-        title="ID", description="Unique identifier for the sensor activity record"
+    id: Optional[int] = Field(
+        title="ID",
+        description="Unique identifier for the sensor activity record; null for "
+        "hourly averages, which aren't records of their own",
     )
     mac_address: Annotated[
         str, StringConstraints(pattern=r"^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$")
@@ -116,9 +162,32 @@ class SensorActivityResponse(BaseModel):
     ground_sensor_6: Optional[float] = None
     created_at: datetime = Field(
         title="Created At",
-        description="Timestamp when the sensor activity was recorded",
+        description="Timestamp when the sensor activity was received",
         examples=["2024-03-09T14:11:36.387495Z"],
     )
+    measured_at: Optional[datetime] = Field(
+        default=None,
+        title="Measured At",
+        description="Timestamp when the device took the reading",
+        examples=["2024-03-09T14:06:36Z"],
+    )
+    seq: Optional[int] = Field(
+        default=None,
+        title="Sequence Number",
+        description="Sequence number sent by the device, if any",
+        examples=[1042],
+    )
+    is_suspect: bool = Field(
+        default=False,
+        title="Is Suspect",
+        description="Whether anomaly detection flagged the reading",
+    )
+    resolution: str = Field(
+        default="raw",
+        title="Resolution",
+        description="'raw' for a single reading, 'hourly' for an hourly average of compacted readings",
+        examples=["raw"],
+    )
 
     class Config:
         from_attributes = True
@@ -137,10 +206,107 @@ class SensorActivityResponse(BaseModel):
                 "ground_sensor_5": 65.6,
                 "ground_sensor_6": 65.6,
                 "created_at": "2024-03-09T14:11:36.387495Z",
+                "measured_at": "2024-03-09T14:06:36Z",
+                "resolution": "raw",
             }
         }
 
 
+class SensorActivityNotStored(BaseModel):
+    """Pydantic model for a reading that was accepted but not stored."""
+
+    reason: str = Field(
+        title="Reason",
+        description="Why the reading wasn't stored: rate_limited or unchanged",
+        examples=["rate_limited"],
+    )
+    detail: str = Field(
+        title="Detail",
+        examples=["Reading dropped: the device is over its rate limit"],
+    )
+
+
+class SensorActivityBatchResponse(BaseModel):
+    """Pydantic model for the outcome of storing a batch of sensor activities."""
+
+    received: int = Field(
+        title="Received", description="Readings in the request", examples=[120]
+    )
+    inserted: int = Field(
+        title="Inserted", description="Readings stored", examples=[118]
+    )
+    duplicates: int = Field(
+        title="Duplicates",
+        description="Readings skipped because their seq was already stored",
+        examples=[2],
+    )
+    suspect: int = Field(
+        title="Suspect",
+        description="Stored readings flagged by anomaly detection",
+        examples=[0],
+    )
+    rate_limited: int = Field(
+        default=0,
+        title="Rate Limited",
+        description="Readings dropped because their device was over its rate limit",
+        examples=[0],
+    )
+    unchanged: int = Field(
+        default=0,
+        title="Unchanged",
+        description="Readings not stored because no metric moved beyond its deadband",
+        examples=[0],
+    )
+
+
+class SensorActivityStreamAck(SensorActivityBatchResponse):
+    """Pydantic model acknowledging a batch of streamed sensor activities."""
+
+    line: int = Field(
+        title="Line",
+        description="Lines of the stream consumed so far, including this batch",
+        examples=[1500],
+    )
+    rejected: int = Field(
+        title="Rejected",
+        description="Lines in this batch that weren't valid readings",
+        examples=[1],
+    )
+    errors: List[str] = Field(
+        default_factory=list,
+        title="Errors",
+        description="Why lines were rejected, for the first few",
+        examples=[["line 1203: mac_address: String should match pattern"]],
+    )
+    rate_limited_lines: List[int] = Field(
+        default_factory=list,
+        title="Rate Limited Lines",
+        description=(
+            "Lines refused because their device was over its rate limit, under "
+            "the reject policy; send them again later"
+        ),
+        examples=[[1207, 1208]],
+    )
+
+
+class SensorActivityStreamError(BaseModel):
+    """Pydantic model ending a stream whose next batch couldn't be stored."""
+
+    error: str = Field(
+        title="Error",
+        description="Why the batch couldn't be stored",
+        examples=["Error creating sensor activities: connection reset"],
+    )
+    line: int = Field(
+        title="Line",
+        description=(
+            "Lines acknowledged before the failure; everything after this line "
+            "must be sent again"
+        ),
+        examples=[1000],
+    )
+
+
 class PlantingBox(BaseModel):
     """Pydantic model for planting box data."""
 
@@ -159,6 +325,41 @@ class PlantingBox(BaseModel):
         json_schema_extra = {"example": {"name": "Cajón 1", "ground_humidity": 72.5}}
 
 
+class RollingMetricStats(BaseModel):
+    """Pydantic model for rolling statistics of one metric over the last N readings."""
+
+    count: int = Field(title="Count", description="Readings in the window", examples=[60])
+    min: float = Field(title="Minimum", examples=[61.2])
+    max: float = Field(title="Maximum", examples=[68.9])
+    mean: float = Field(title="Mean", examples=[65.1])
+    stddev: float = Field(
+        title="Standard Deviation", description="Population standard deviation", examples=[1.8]
+    )
+    ewma: float = Field(
+        title="EWMA",
+        description="Exponentially weighted moving average",
+        examples=[65.7],
+    )
+
+
+class DeviceRollingStatsResponse(BaseModel):
+    """Pydantic model for the rolling statistics of a device."""
+
+    mac_address: str = Field(
+        title="MAC Address",
+        description="Device MAC address in format XX:XX:XX:XX:XX:XX",
+        examples=["35:98:f4:d1:86:51"],
+    )
+    window_size: int = Field(
+        title="Window Size",
+        description="Maximum number of readings per metric in the window",
+        examples=[60],
+    )
+    metrics: Dict[str, RollingMetricStats] = Field(
+        title="Metrics", description="Rolling statistics per metric"
+    )
+
+
 class SensorActivityListResponse(BaseModel):
     """Pydantic model for listing Sensor Activity responses."""
 
@@ -204,6 +405,11 @@ class SensorActivityListResponse(BaseModel):
             ]
         ],
     )
+    rolling_stats: Optional[Dict[str, RollingMetricStats]] = Field(
+        default=None,
+        title="Rolling Statistics",
+        description="Rolling statistics per metric over the last readings of the device",
+    )
 
     class Config:
         json_schema_extra = {
@@ -224,3 +430,136 @@ class SensorActivityListResponse(BaseModel):
                 ],
             }
         }
+
+
+class SensorRetentionReport(BaseModel):
+    """Pydantic model describing the outcome of a sensor data retention run."""
+
+    started_at: datetime = Field(
+        title="Started At", description="When the run started"
+    )
+    horizon: datetime = Field(
+        title="Horizon",
+        description="Readings older than this are compacted into hourly rollups",
+    )
+    watermark: Optional[datetime] = Field(
+        default=None,
+        title="Watermark",
+        description="Readings before this have been compacted",
+    )
+    hours_compacted: int = Field(
+        default=0, title="Hours Compacted", description="Hourly windows compacted"
+    )
+    rollups_written: int = Field(
+        default=0, title="Rollups Written", description="Hourly rollup rows written"
+    )
+    late_rows_merged: int = Field(
+        default=0,
+        title="Late Rows Merged",
+        description="Readings received after their hour was compacted, merged into its rollup",
+    )
+    rows_deleted: int = Field(
+        default=0, title="Rows Deleted", description="Raw readings deleted"
+    )
+    duration_ms: float = Field(
+        default=0, title="Duration", description="Total run time in milliseconds"
+    )
+
+
+class SensorActivityImportReport(BaseModel):
+    """Pydantic model describing the outcome of a CSV import."""
+
+    layout: str = Field(
+        title="Layout",
+        description="'export' for files from the CSV download, 'iso' for model column names",
+    )
+    rows_read: int = Field(
+        default=0, title="Rows Read", description="Data lines parsed successfully"
+    )
+    rows_rejected: int = Field(
+        default=0, title="Rows Rejected", description="Data lines that failed to parse"
+    )
+    rows_inserted: int = Field(
+        default=0, title="Rows Inserted", description="Readings stored"
+    )
+    duplicates_skipped: int = Field(
+        default=0,
+        title="Duplicates Skipped",
+        description="Readings already stored or repeated in the file, by device and timestamp",
+    )
+    devices_registered: int = Field(
+        default=0, title="Devices Registered", description="Unknown devices created"
+    )
+    errors: List[str] = Field(
+        default_factory=list,
+        title="Errors",
+        description="Sample of rejected lines with the reason",
+    )
+    duration_ms: float = Field(
+        default=0, title="Duration", description="Total run time in milliseconds"
+    )
+
+
+class SensorAnomaly(BaseModel):
+    """Pydantic model for an anomaly detected in a sensor reading."""
+
+    mac_address: str = Field(
+        title="MAC Address",
+        description="Device MAC address in format XX:XX:XX:XX:XX:XX",
+        examples=["35:98:f4:d1:86:51"],
+    )
+    metric: str = Field(
+        title="Metric", description="Reading column that is anomalous", examples=["ground_sensor_3"]
+    )
+    kind: str = Field(
+        title="Kind",
+        description="One of 'stuck', 'spike' or 'out_of_range'",
+        examples=["stuck"],
+    )
+    value: float = Field(title="Value", description="Anomalous value", examples=[0.0])
+    detail: str = Field(
+        title="Detail", description="Human readable explanation", examples=["Same value for 30 readings"]
+    )
+    reading_id: Optional[int] = Field(
+        default=None, title="Reading ID", description="ID of the stored reading, if known"
+    )
+    created_at: Optional[datetime] = Field(
+        default=None, title="Created At", description="Timestamp of the reading, if known"
+    )
+
+
+class SensorActivitySeriesPoint(BaseModel):
+    """Pydantic model for the values a device held at one instant."""
+
+    at: datetime = Field(
+        title="At", description="Sampling instant", examples=["2024-03-09T14:05:00Z"]
+    )
+    values: Dict[str, Optional[float]] = Field(
+        title="Values",
+        description=(
+            "Value of each metric in the last reading stored at or before the "
+            "instant; null when there is none or it is too old to hold"
+        ),
+        examples=[{"env_humidity": 65.2, "env_temperature": 22.4}],
+    )
+
+
+class SensorActivitySeriesResponse(BaseModel):
+    """Pydantic model for a device's readings resampled as a step-wise series."""
+
+    mac_address: str = Field(
+        title="MAC Address",
+        description="Device MAC address in format XX:XX:XX:XX:XX:XX",
+        examples=["35:98:f4:d1:86:51"],
+    )
+    step_seconds: int = Field(
+        title="Step Seconds", description="Seconds between points", examples=[60]
+    )
+    hold_seconds: int = Field(
+        title="Hold Seconds",
+        description="Longest a stored reading is held before a point turns null",
+        examples=[1800],
+    )
+    points: List[SensorActivitySeriesPoint] = Field(
+        title="Points", description="One point per step, oldest first"
+    )
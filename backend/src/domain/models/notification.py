@@ -1,4 +1,13 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Boolean,
+    DateTime,
+    Text,
+)
 from sqlalchemy.sql import func
 
 from infrastructure.database.base import Base
@@ -8,6 +17,9 @@ class Notification(Base):
     """Model for storing system notifications."""
 
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_is_read_created_at", "is_read", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     device_id = Column(String(17), ForeignKey("devices.mac_address"), nullable=False)
@@ -19,3 +31,19 @@ class Notification(Base):
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+
+class NotificationArchive(Base):
+    """Model for unread notifications moved out of the live table by retention."""
+
+    __tablename__ = "notifications_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    device_id = Column(String(17), nullable=False, index=True)
+    type = Column(String(50), nullable=False)
+    is_read = Column(Boolean, nullable=False, default=False)
+    title = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.sql import func
+
+from infrastructure.database.base import Base
+
+
+class RetentionWatermark(Base):
+    """Model for the progress of resumable background retention jobs."""
+
+    __tablename__ = "retention_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    watermark = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
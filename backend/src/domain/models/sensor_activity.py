@@ -1,14 +1,42 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Float, DateTime
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Float,
+    DateTime,
+    false,
+)
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from infrastructure.database.base import Base
 
+# Numeric reading columns shared by raw readings and hourly rollups
+SENSOR_METRICS = (
+    "env_humidity",
+    "env_temperature",
+    "ground_sensor_1",
+    "ground_sensor_2",
+    "ground_sensor_3",
+    "ground_sensor_4",
+    "ground_sensor_5",
+    "ground_sensor_6",
+)
+
 
 class SensorActivity(Base):
     """Model for storing sensor activity data from ESP32 devices."""
 
     __tablename__ = "sensor_activities"
+    __table_args__ = (
+        Index("ix_sensor_activities_device_id_measured_at", "device_id", "measured_at"),
+        # Rejects a retried reading that another worker already stored
+        Index("uq_sensor_activities_device_id_seq", "device_id", "seq", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     device_id = Column(
@@ -23,7 +51,13 @@ class SensorActivity(Base):
     ground_sensor_4 = Column(Float, nullable=True)
     ground_sensor_5 = Column(Float, nullable=True)
     ground_sensor_6 = Column(Float, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    seq = Column(BigInteger, nullable=True)  # Per-device counter sent by the device
+    is_suspect = Column(Boolean, nullable=False, default=False, server_default=false())
+    # When the device took the reading; defaults to arrival time. Queries,
+    # latest readings and rollups are based on it.
+    measured_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # When the server received the reading; finds late arrivals for rollups
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     # Relationship to Device model
     device = relationship("Device", back_populates="sensor_activities")
@@ -0,0 +1,53 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+
+from infrastructure.database.base import Base
+
+
+class SensorActivityHourly(Base):
+    """Model for hourly aggregates of sensor activity compacted by retention."""
+
+    __tablename__ = "sensor_activity_hourly"
+    __table_args__ = (
+        UniqueConstraint(
+            "device_id", "bucket_start", name="uq_sensor_activity_hourly_device_bucket"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    device_id = Column(String(17), ForeignKey("devices.mac_address"), nullable=False)
+    zone = Column(String(100), nullable=True)
+    bucket_start = Column(DateTime(timezone=True), nullable=False, index=True)
+    sample_count = Column(Integer, nullable=False)
+    # Averages use the same names as the raw columns; min/max are suffixed
+    env_humidity = Column(Float, nullable=True)
+    env_humidity_min = Column(Float, nullable=True)
+    env_humidity_max = Column(Float, nullable=True)
+    env_temperature = Column(Float, nullable=True)
+    env_temperature_min = Column(Float, nullable=True)
+    env_temperature_max = Column(Float, nullable=True)
+    ground_sensor_1 = Column(Float, nullable=True)
+    ground_sensor_1_min = Column(Float, nullable=True)
+    ground_sensor_1_max = Column(Float, nullable=True)
+    ground_sensor_2 = Column(Float, nullable=True)
+    ground_sensor_2_min = Column(Float, nullable=True)
+    ground_sensor_2_max = Column(Float, nullable=True)
+    ground_sensor_3 = Column(Float, nullable=True)
+    ground_sensor_3_min = Column(Float, nullable=True)
+    ground_sensor_3_max = Column(Float, nullable=True)
+    ground_sensor_4 = Column(Float, nullable=True)
+    ground_sensor_4_min = Column(Float, nullable=True)
+    ground_sensor_4_max = Column(Float, nullable=True)
+    ground_sensor_5 = Column(Float, nullable=True)
+    ground_sensor_5_min = Column(Float, nullable=True)
+    ground_sensor_5_max = Column(Float, nullable=True)
+    ground_sensor_6 = Column(Float, nullable=True)
+    ground_sensor_6_min = Column(Float, nullable=True)
+    ground_sensor_6_max = Column(Float, nullable=True)
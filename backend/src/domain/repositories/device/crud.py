@@ -1,6 +1,7 @@
 from typing import Optional, TypedDict, List
 
 from domain.dtos.device.dtos import DeviceCreate, DeviceResponse
+from sqlalchemy import Table, func, insert, select
 from sqlalchemy.orm import Session
 
 from domain.models.device import Device
@@ -89,3 +90,31 @@ class DeviceRepository:
         """
         devices = db.query(Device).order_by(Device.name).all()
         return [DeviceResponse.model_validate(device) for device in devices]
+
+    def create_missing_from(self, db: Session, source: Table) -> int:
+        """
+        Register every device referenced by a table that isn't registered yet.
+
+        Runs as a single INSERT ... SELECT. Like devices created on ingest,
+        new devices are named after their zone, or their MAC address when the
+        rows carry no zone. The caller owns the transaction.
+
+        Args:
+            db: Database session
+            source: Table with device_id and zone columns
+
+        Returns:
+            Number of devices created
+        """
+        missing = (
+            select(
+                source.c.device_id,
+                func.coalesce(func.max(source.c.zone), source.c.device_id),
+            )
+            .where(source.c.device_id.not_in(select(Device.mac_address)))
+            .group_by(source.c.device_id)
+        )
+        result = db.execute(
+            insert(Device).from_select(["mac_address", "name"], missing)
+        )
+        return result.rowcount
@@ -1,8 +1,9 @@
+from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import desc
+from sqlalchemy import delete, desc, func, insert, select
 from sqlalchemy.orm import Session
 
-from domain.models.notification import Notification
+from domain.models.notification import Notification, NotificationArchive
 from domain.dtos.notification.dtos import NotificationCreate, NotificationResponse
 
 
@@ -139,3 +140,159 @@ class NotificationRepository:
             NotificationResponse.model_validate(notification)
             for notification in notifications
         ]
+
+    def has_unread(self, db: Session, mac_address: str, type: str) -> bool:
+        """
+        Check whether a device has an unread notification of the given type.
+
+        Args:
+            db: Database session
+            mac_address: The MAC address of the device
+            type: Notification type to match
+
+        Returns:
+            True if such a notification exists
+        """
+        query = (
+            select(Notification.id)
+            .where(Notification.device_id == mac_address)
+            .where(Notification.type == type)
+            .where(Notification.is_read == False)
+            .limit(1)
+        )
+        return db.execute(query).first() is not None
+
+    def get_newer_than(
+        self, db: Session, since_id: int, limit: int = 20
+    ) -> List[NotificationResponse]:
+        """
+        Get notifications created after the given cursor, oldest first.
+
+        Args:
+            db: Database session
+            since_id: Only notifications with an ID greater than this are returned
+            limit: Maximum number of records to return
+
+        Returns:
+            List of Notification records as NotificationResponse ordered by ID
+        """
+        notifications = (
+            db.query(Notification)
+            .filter(Notification.id > since_id)
+            .order_by(Notification.id)
+            .limit(limit)
+            .all()
+        )
+        return [
+            NotificationResponse.model_validate(notification)
+            for notification in notifications
+        ]
+
+    def get_latest_id(self, db: Session) -> int:
+        """
+        Get the ID of the most recent notification.
+
+        Args:
+            db: Database session
+
+        Returns:
+            The highest notification ID, or 0 if there are no notifications
+        """
+        return db.query(func.max(Notification.id)).scalar() or 0
+
+    def count_older_than(self, db: Session, cutoff: datetime, is_read: bool) -> int:
+        """
+        Count notifications with the given read status created before a cutoff.
+
+        Args:
+            db: Database session
+            cutoff: Only notifications created before this timestamp are counted
+            is_read: Read status to match
+
+        Returns:
+            Number of matching notifications
+        """
+        return (
+            db.query(func.count(Notification.id))
+            .filter(Notification.is_read == is_read)
+            .filter(Notification.created_at < cutoff)
+            .scalar()
+        )
+
+    def delete_read_batch(self, db: Session, cutoff: datetime, batch_size: int) -> int:
+        """
+        Delete one batch of read notifications created before a cutoff.
+
+        Uses DELETE ... WHERE id IN (SELECT ... LIMIT n) so each statement only
+        locks a bounded number of rows. The caller owns the transaction.
+
+        Args:
+            db: Database session
+            cutoff: Only notifications created before this timestamp are deleted
+            batch_size: Maximum number of rows to delete
+
+        Returns:
+            Number of deleted rows
+        """
+        batch_ids = (
+            select(Notification.id)
+            .where(Notification.is_read == True)
+            .where(Notification.created_at < cutoff)
+            .limit(batch_size)
+        )
+        result = db.execute(
+            delete(Notification).where(Notification.id.in_(batch_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount
+
+    def archive_unread_batch(
+        self, db: Session, cutoff: datetime, batch_size: int
+    ) -> int:
+        """
+        Move one batch of unread notifications created before a cutoff to the archive.
+
+        The caller owns the transaction so the copy and delete commit together.
+
+        Args:
+            db: Database session
+            cutoff: Only notifications created before this timestamp are archived
+            batch_size: Maximum number of rows to move
+
+        Returns:
+            Number of archived rows
+        """
+        batch_ids = list(
+            db.execute(
+                select(Notification.id)
+                .where(Notification.is_read == False)
+                .where(Notification.created_at < cutoff)
+                .limit(batch_size)
+            ).scalars()
+        )
+        if not batch_ids:
+            return 0
+
+        columns = [
+            "id",
+            "device_id",
+            "type",
+            "is_read",
+            "title",
+            "description",
+            "created_at",
+            "updated_at",
+        ]
+        db.execute(
+            insert(NotificationArchive).from_select(
+                columns,
+                select(*[getattr(Notification, column) for column in columns]).where(
+                    Notification.id.in_(batch_ids)
+                ),
+            )
+        )
+        db.execute(
+            delete(Notification).where(Notification.id.in_(batch_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        return len(batch_ids)
@@ -0,0 +1,74 @@
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from domain.models.retention_watermark import RetentionWatermark
+
+
+class RetentionWatermarkRepository:
+    # Watermarks only move forward once per compaction step, so read paths
+    # can use a slightly stale value instead of querying on every request.
+    CACHE_TTL_SECONDS = 60
+    _cache: Dict[str, Tuple[Optional[datetime], float]] = {}
+
+    def __init__(self):
+        pass
+
+    def get(self, db: Session, name: str) -> Optional[datetime]:
+        """
+        Get the current watermark of a retention job.
+
+        Args:
+            db: Database session
+            name: Name of the retention job
+
+        Returns:
+            The watermark timestamp, or None if the job never ran
+        """
+        record = db.get(RetentionWatermark, name)
+        watermark = record.watermark if record else None
+        self._cache[name] = (watermark, time.monotonic())
+        return watermark
+
+    def get_cached(self, db: Session, name: str) -> Optional[datetime]:
+        """
+        Get a watermark, reusing a value read within the last CACHE_TTL_SECONDS.
+
+        Args:
+            db: Database session
+            name: Name of the retention job
+
+        Returns:
+            The watermark timestamp, or None if the job never ran
+        """
+        cached = self._cache.get(name)
+        if cached and time.monotonic() - cached[1] < self.CACHE_TTL_SECONDS:
+            return cached[0]
+        return self.get(db, name)
+
+    def set(self, db: Session, name: str, watermark: datetime) -> None:
+        """
+        Store the watermark of a retention job. The caller owns the transaction.
+
+        Args:
+            db: Database session
+            name: Name of the retention job
+            watermark: New watermark timestamp
+        """
+        db.merge(RetentionWatermark(name=name, watermark=watermark))
+        self._cache[name] = (watermark, time.monotonic())
+
+    def get_database_now(self, db: Session) -> datetime:
+        """
+        Get the current time of the database clock, which stamps created_at.
+
+        Args:
+            db: Database session
+
+        Returns:
+            The database's current timestamp
+        """
+        return db.execute(select(func.now())).scalar()
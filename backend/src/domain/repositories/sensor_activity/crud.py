@@ -1,21 +1,54 @@
 from datetime import datetime
-from typing import Optional, List
-from sqlalchemy import desc, func
+from typing import Any, Dict, Iterable, Mapping, Optional, List, Sequence, Set
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    delete,
+    desc,
+    func,
+    insert,
+    select,
+    update,
+)
 from sqlalchemy.orm import Session, joinedload
 
-from domain.models.sensor_activity import SensorActivity
+from domain.models.sensor_activity import SENSOR_METRICS, SensorActivity
+from infrastructure.database.bulk import copy_columns
+from infrastructure.database.functions import second_bounds
 from domain.dtos.sensor_activity.dtos import (
     SensorActivityCreate,
     SensorActivityResponse,
 )
 
 
+# Per-transaction staging table that CSV imports are copied into before the merge
+import_staging = Table(
+    "sensor_activities_import",
+    MetaData(),
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("device_id", String(17), nullable=False),
+    Column("zone", String(100)),
+    *(Column(metric, Float) for metric in SENSOR_METRICS),
+    Column("measured_at", DateTime(timezone=True), nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
 class SensorActivityRepository:
     def __init__(self):
         pass
 
     def create(
-        self, db: Session, activity_create: SensorActivityCreate
+        self,
+        db: Session,
+        activity_create: SensorActivityCreate,
+        is_suspect: bool = False,
     ) -> SensorActivityResponse:
         """
         Create a new sensor activity record.
@@ -23,6 +56,7 @@ class SensorActivityRepository:
         Args:
             db: Database session
             activity_create: Sensor activity creation data transfer object
+            is_suspect: Whether anomaly detection flagged the reading
 
         Returns:
             The created SensorActivity record as SensorActivityResponse
@@ -38,7 +72,12 @@ class SensorActivityRepository:
             ground_sensor_4=activity_create.ground_sensor_4,
             ground_sensor_5=activity_create.ground_sensor_5,
             ground_sensor_6=activity_create.ground_sensor_6,
+            seq=activity_create.seq,
+            is_suspect=is_suspect,
         )
+        # Left unset, the column defaults to the arrival time
+        if activity_create.measured_at is not None:
+            activity.measured_at = activity_create.measured_at
         db.add(activity)
         db.commit()
         db.refresh(activity)
@@ -53,6 +92,23 @@ class SensorActivityRepository:
 
         return SensorActivityResponse.model_validate(activity)
 
+    def create_many(self, db: Session, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert many sensor activity records with a single executemany INSERT.
+
+        Args:
+            db: Database session
+            rows: Insert parameters, all with the same keys
+
+        Returns:
+            Number of records inserted
+        """
+        if not rows:
+            return 0
+        db.execute(insert(SensorActivity), rows)
+        db.commit()
+        return len(rows)
+
     def get_filtered_list(
         self,
         db: Session,
@@ -62,7 +118,7 @@ class SensorActivityRepository:
         end_date: Optional[datetime] = None,
     ) -> List[SensorActivityResponse]:
         """
-        Get a filtered and paginated list of sensor activities.
+        Get a filtered and paginated list of sensor activities by measurement time.
 
         Args:
             db: Database session
@@ -77,12 +133,12 @@ class SensorActivityRepository:
         query = db.query(SensorActivity).options(joinedload(SensorActivity.device))
 
         if start_date:
-            query = query.filter(SensorActivity.created_at >= start_date)
+            query = query.filter(SensorActivity.measured_at >= start_date)
         if end_date:
-            query = query.filter(SensorActivity.created_at <= end_date)
+            query = query.filter(SensorActivity.measured_at <= end_date)
 
         activities = (
-            query.order_by(desc(SensorActivity.created_at))
+            query.order_by(desc(SensorActivity.measured_at))
             .offset(skip)
             .limit(limit)
             .all()
@@ -112,6 +168,122 @@ class SensorActivityRepository:
         )
         return SensorActivityResponse.model_validate(activity) if activity else None
 
+    def get_by_seq(
+        self, db: Session, mac_address: str, seq: int
+    ) -> Optional[SensorActivityResponse]:
+        """
+        Get the sensor activity a device sent with a sequence number.
+
+        Args:
+            db: Database session
+            mac_address: The MAC address of the sensor
+            seq: Sequence number sent by the device
+
+        Returns:
+            SensorActivity record as SensorActivityResponse if found, None otherwise
+        """
+        activity = (
+            db.query(SensorActivity)
+            .filter(SensorActivity.device_id == mac_address, SensorActivity.seq == seq)
+            .first()
+        )
+        return SensorActivityResponse.model_validate(activity) if activity else None
+
+    def get_stored_seqs(
+        self, db: Session, mac_address: str, seqs: Iterable[int]
+    ) -> Set[int]:
+        """
+        Get which of a device's sequence numbers are already stored.
+
+        Args:
+            db: Database session
+            mac_address: The MAC address of the sensor
+            seqs: Sequence numbers to look up
+
+        Returns:
+            The stored subset of seqs
+        """
+        seqs = list(seqs)
+        if not seqs:
+            return set()
+        return set(
+            db.execute(
+                select(SensorActivity.seq).where(
+                    SensorActivity.device_id == mac_address,
+                    SensorActivity.seq.in_(seqs),
+                )
+            ).scalars()
+        )
+
+    def get_by_seqs(
+        self, db: Session, mac_address: str, seqs: Iterable[int]
+    ) -> Dict[int, SensorActivityResponse]:
+        """
+        Get the sensor activities a device sent with several sequence numbers.
+
+        Args:
+            db: Database session
+            mac_address: The MAC address of the sensor
+            seqs: Sequence numbers to look up
+
+        Returns:
+            Stored seq to SensorActivityResponse mapping
+        """
+        seqs = list(seqs)
+        if not seqs:
+            return {}
+        activities = db.query(SensorActivity).filter(
+            SensorActivity.device_id == mac_address, SensorActivity.seq.in_(seqs)
+        )
+        return {
+            activity.seq: SensorActivityResponse.model_validate(activity)
+            for activity in activities
+        }
+
+    def release_seqs(
+        self, db: Session, mac_address: str, from_seq: int, measured_before: datetime
+    ) -> int:
+        """
+        Clear the sequence numbers a device used before it started counting again.
+
+        Args:
+            db: Database session
+            mac_address: The MAC address of the sensor
+            from_seq: Lowest sequence number to clear
+            measured_before: Only readings measured before this are cleared
+
+        Returns:
+            Number of records whose seq was cleared
+        """
+        result = db.execute(
+            update(SensorActivity)
+            .where(
+                SensorActivity.device_id == mac_address,
+                SensorActivity.seq >= from_seq,
+                SensorActivity.measured_at < measured_before,
+            )
+            .values(seq=None)
+        )
+        db.commit()
+        return result.rowcount
+
+    def get_max_seq(self, db: Session, mac_address: str) -> Optional[int]:
+        """
+        Get the highest sequence number stored for a device.
+
+        Args:
+            db: Database session
+            mac_address: The MAC address of the sensor
+
+        Returns:
+            The highest seq, or None if the device never sent one
+        """
+        return (
+            db.query(func.max(SensorActivity.seq))
+            .filter(SensorActivity.device_id == mac_address)
+            .scalar()
+        )
+
     def get_latest_by_mac_address(
         self, db: Session, mac_address: str
     ) -> Optional[SensorActivityResponse]:
@@ -129,7 +301,7 @@ class SensorActivityRepository:
             db.query(SensorActivity)
             .options(joinedload(SensorActivity.device))
             .filter(SensorActivity.device_id == mac_address)
-            .order_by(desc(SensorActivity.created_at))
+            .order_by(desc(SensorActivity.measured_at), desc(SensorActivity.id))
             .first()
         )
         return SensorActivityResponse.model_validate(activity) if activity else None
@@ -137,30 +309,284 @@ class SensorActivityRepository:
     def get_latest_for_all_devices(self, db: Session) -> List[SensorActivityResponse]:
         """
         Get the latest sensor activity record for each unique device.
-        Returns only one record per device (the most recent one).
+        Returns only one record per device (the most recently measured one),
+        so readings that arrive late don't replace newer ones.
         """
-        # Subquery to get the latest record ID for each device
-        latest_ids = (
-            db.query(
-                SensorActivity.device_id,
-                func.max(SensorActivity.id).label('latest_id')
-            )
-            .group_by(SensorActivity.device_id)
-            .subquery()
-        )
+        # Subquery to get the latest measurement time for each device
+        latest = self._latest_measured_per_device()
 
         # Main query joining with the subquery to get the full records
         activities = (
             db.query(SensorActivity)
             .options(joinedload(SensorActivity.device))
             .join(
-                latest_ids,
-                SensorActivity.device_id == latest_ids.c.device_id
+                latest,
+                and_(
+                    SensorActivity.device_id == latest.c.device_id,
+                    SensorActivity.measured_at == latest.c.latest_measured_at,
+                ),
             )
-            .filter(SensorActivity.id == latest_ids.c.latest_id)
-            .order_by(desc(SensorActivity.created_at))
+            .order_by(desc(SensorActivity.measured_at), desc(SensorActivity.id))
             .all()
         )
+        # Several readings can share the latest timestamp; keep the newest row
+        seen = set()
+        result = []
+        for activity in activities:
+            if activity.device_id not in seen:
+                seen.add(activity.device_id)
+                result.append(SensorActivityResponse.model_validate(activity))
+        return result
+
+    def _latest_measured_per_device(self):
+        return (
+            select(
+                SensorActivity.device_id,
+                func.max(SensorActivity.measured_at).label("latest_measured_at"),
+            )
+            .group_by(SensorActivity.device_id)
+            .subquery()
+        )
+
+    def count_filtered(
+        self,
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> int:
+        """
+        Count sensor activities within an optional date range.
+
+        Args:
+            db: Database session
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+
+        Returns:
+            Number of matching SensorActivity records
+        """
+        query = db.query(func.count(SensorActivity.id))
+        if start_date:
+            query = query.filter(SensorActivity.measured_at >= start_date)
+        if end_date:
+            query = query.filter(SensorActivity.measured_at <= end_date)
+        return query.scalar()
+
+    def get_oldest_measured_at(
+        self, db: Session, since: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        """
+        Get the measurement time of the oldest sensor activity, optionally at or after a point in time.
+
+        Args:
+            db: Database session
+            since: Optional lower bound for the search
+
+        Returns:
+            The oldest measured_at, or None if there are no matching records
+        """
+        query = db.query(func.min(SensorActivity.measured_at))
+        if since:
+            query = query.filter(SensorActivity.measured_at >= since)
+        return query.scalar()
+
+    def get_latest_ids_per_device(self, db: Session) -> List[int]:
+        """
+        Get the ID of the most recently measured sensor activity of every device.
+
+        Args:
+            db: Database session
+
+        Returns:
+            List of SensorActivity IDs, one per device
+        """
+        latest = self._latest_measured_per_device()
         return [
-            SensorActivityResponse.model_validate(activity) for activity in activities
+            row[0]
+            for row in db.query(func.max(SensorActivity.id))
+            .join(
+                latest,
+                and_(
+                    SensorActivity.device_id == latest.c.device_id,
+                    SensorActivity.measured_at == latest.c.latest_measured_at,
+                ),
+            )
+            .group_by(SensorActivity.device_id)
+            .all()
         ]
+
+    def delete_older_than_batch(
+        self,
+        db: Session,
+        cutoff: datetime,
+        batch_size: int,
+        keep_ids: Optional[List[int]] = None,
+        received_before: Optional[datetime] = None,
+    ) -> int:
+        """
+        Delete one batch of sensor activities measured before a cutoff.
+
+        Uses DELETE ... WHERE id IN (SELECT ... LIMIT n) so each statement only
+        locks a bounded number of rows. The caller owns the transaction.
+
+        Args:
+            db: Database session
+            cutoff: Only records measured before this timestamp are deleted
+            batch_size: Maximum number of rows to delete
+            keep_ids: IDs that must not be deleted
+            received_before: Only records received before this timestamp are deleted
+
+        Returns:
+            Number of deleted rows
+        """
+        batch_ids = (
+            select(SensorActivity.id)
+            .where(SensorActivity.measured_at < cutoff)
+            .limit(batch_size)
+        )
+        if received_before:
+            batch_ids = batch_ids.where(SensorActivity.created_at < received_before)
+        if keep_ids:
+            batch_ids = batch_ids.where(SensorActivity.id.notin_(keep_ids))
+        result = db.execute(
+            delete(SensorActivity).where(SensorActivity.id.in_(batch_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount
+
+    def get_recent_for_devices(
+        self, db: Session, mac_addresses: List[str], per_device: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the most recent readings of several devices in a single query.
+
+        Args:
+            db: Database session
+            mac_addresses: MAC addresses of the devices
+            per_device: Maximum number of readings per device
+
+        Returns:
+            Row mappings ordered by device and then oldest first
+        """
+        ranked = (
+            select(
+                SensorActivity,
+                func.row_number()
+                .over(
+                    partition_by=SensorActivity.device_id,
+                    order_by=desc(SensorActivity.measured_at),
+                )
+                .label("rank"),
+            )
+            .where(SensorActivity.device_id.in_(mac_addresses))
+            .subquery()
+        )
+        rows = db.execute(
+            select(ranked)
+            .where(ranked.c.rank <= per_device)
+            .order_by(ranked.c.device_id, ranked.c.measured_at)
+        ).mappings()
+        return [dict(row) for row in rows]
+
+    def get_readings_between(
+        self,
+        db: Session,
+        mac_address: str,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a device's readings in a time range and the last one before it.
+
+        The reading before start_date holds the values at the start of the
+        range when readings are only stored once they change.
+
+        Args:
+            db: Database session
+            mac_address: MAC address of the device
+            start_date: Start of the range, inclusive
+            end_date: End of the range, inclusive
+
+        Returns:
+            Row mappings with measured_at and the metrics, oldest first
+        """
+        columns = [
+            SensorActivity.measured_at,
+            *(getattr(SensorActivity, metric) for metric in SENSOR_METRICS),
+        ]
+        device = SensorActivity.device_id == mac_address
+        before = (
+            db.execute(
+                select(*columns)
+                .where(device, SensorActivity.measured_at < start_date)
+                .order_by(desc(SensorActivity.measured_at))
+                .limit(1)
+            )
+            .mappings()
+            .first()
+        )
+        rows = db.execute(
+            select(*columns)
+            .where(
+                device,
+                SensorActivity.measured_at >= start_date,
+                SensorActivity.measured_at <= end_date,
+            )
+            .order_by(SensorActivity.measured_at)
+        ).mappings()
+        return ([dict(before)] if before else []) + [dict(row) for row in rows]
+
+    def stage_import(self, db: Session, columns: Mapping[str, Sequence]) -> int:
+        """
+        Create the import staging table and bulk load rows into it.
+
+        The caller owns the transaction and must call merge_import() before
+        committing, which drops the table again.
+
+        Args:
+            db: Database session
+            columns: device_id, zone, metric and measured_at columns
+
+        Returns:
+            Number of rows staged
+        """
+        connection = db.connection()
+        import_staging.create(connection)
+        return copy_columns(connection, import_staging.name, columns)
+
+    def merge_import(self, db: Session) -> int:
+        """
+        Insert staged rows that aren't stored yet and drop the staging table.
+
+        A reading is a duplicate when a row with the same device_id and
+        measured_at exists earlier in the staged batch, or when a stored row
+        of the device was measured within the same second: exports write
+        whole seconds, so a re-imported export never matches exactly. The
+        lookup is a range on the (device_id, measured_at) index. created_at
+        is left to default to the import time, so the retention job can merge
+        imported readings into hours it has already compacted.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of rows inserted
+        """
+        first_of_key = select(func.min(import_staging.c.id)).group_by(
+            import_staging.c.device_id, import_staging.c.measured_at
+        )
+        second_start, second_end = second_bounds(db, import_staging.c.measured_at)
+        stored = select(SensorActivity.id).where(
+            SensorActivity.device_id == import_staging.c.device_id,
+            SensorActivity.measured_at >= second_start,
+            SensorActivity.measured_at < second_end,
+        )
+        names = ["device_id", "zone", *SENSOR_METRICS, "measured_at"]
+        rows = (
+            select(*(import_staging.c[name] for name in names))
+            .where(import_staging.c.id.in_(first_of_key), ~stored.exists())
+            .order_by(import_staging.c.measured_at)
+        )
+        result = db.execute(insert(SensorActivity).from_select(names, rows))
+        import_staging.drop(db.connection())
+        return result.rowcount
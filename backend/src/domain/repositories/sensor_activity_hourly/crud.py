@@ -0,0 +1,260 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional
+
+from sqlalchemy import desc, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from domain.models.sensor_activity import SENSOR_METRICS, SensorActivity
+from domain.models.sensor_activity_hourly import SensorActivityHourly
+from domain.dtos.sensor_activity.dtos import SensorActivityResponse
+from infrastructure.database.functions import hour_bucket
+from infrastructure.database.upsert import upsert
+
+# Name of the watermark up to which raw readings have been compacted
+HOURLY_WATERMARK = "sensor_activity_hourly"
+# Arrival time up to which late readings have been merged into rollups
+LATE_ARRIVALS_WATERMARK = "sensor_activity_hourly_received"
+
+ROLLUP_COLUMNS = ["zone", "sample_count"] + [
+    f"{metric}{suffix}" for metric in SENSOR_METRICS for suffix in ("", "_min", "_max")
+]
+
+# (device, hour) groups of late readings merged per statement
+LATE_MERGE_BATCH_SIZE = 500
+
+
+def _merge_rollup(
+    existing: Optional[SensorActivityHourly], late: Mapping[str, Any]
+) -> Dict[str, Any]:
+    """Combine a stored rollup with the aggregates of late readings of the same hour."""
+    old_count = existing.sample_count if existing else 0
+    merged = {
+        "device_id": late["device_id"],
+        "bucket_start": late["bucket_start"],
+        "zone": late["zone"] or (existing.zone if existing else None),
+        "sample_count": old_count + late["sample_count"],
+    }
+    for metric in SENSOR_METRICS:
+        old_avg = getattr(existing, metric) if existing else None
+        new_count = late[f"{metric}_count"]
+        if not new_count:
+            new_avg = None
+        elif old_avg is None:
+            new_avg = late[f"{metric}_sum"] / new_count
+        else:
+            # Stored averages are weighted by the rollup's sample count
+            new_avg = (old_avg * old_count + late[f"{metric}_sum"]) / (
+                old_count + new_count
+            )
+        merged[metric] = old_avg if new_avg is None else new_avg
+        for suffix, pick in (("_min", min), ("_max", max)):
+            values = [
+                value
+                for value in (
+                    getattr(existing, f"{metric}{suffix}") if existing else None,
+                    late[f"{metric}{suffix}"],
+                )
+                if value is not None
+            ]
+            merged[f"{metric}{suffix}"] = pick(values) if values else None
+    return merged
+
+
+class SensorActivityHourlyRepository:
+    def __init__(self):
+        pass
+
+    def compact_window(
+        self,
+        db: Session,
+        bucket_start: datetime,
+        bucket_end: datetime,
+        received_before: Optional[datetime] = None,
+    ) -> int:
+        """
+        Aggregate raw readings measured in one hour into hourly rollups, one row per device.
+
+        Re-running a window replaces its rollups, so an interrupted compaction
+        can safely be repeated. The caller owns the transaction.
+
+        Args:
+            db: Database session
+            bucket_start: Start of the hour (inclusive)
+            bucket_end: End of the hour (exclusive)
+            received_before: Only readings received before this are included;
+                later ones are left for merge_late()
+
+        Returns:
+            Number of rollup rows written
+        """
+        aggregates = [
+            SensorActivity.device_id,
+            func.max(SensorActivity.zone).label("zone"),
+            func.count(SensorActivity.id).label("sample_count"),
+        ]
+        for metric in SENSOR_METRICS:
+            column = getattr(SensorActivity, metric)
+            aggregates += [
+                func.avg(column).label(metric),
+                func.min(column).label(f"{metric}_min"),
+                func.max(column).label(f"{metric}_max"),
+            ]
+        query = (
+            select(*aggregates)
+            .where(SensorActivity.measured_at >= bucket_start)
+            .where(SensorActivity.measured_at < bucket_end)
+            .group_by(SensorActivity.device_id)
+        )
+        if received_before:
+            query = query.where(SensorActivity.created_at < received_before)
+        rows = db.execute(query).mappings()
+        values = [dict(row, bucket_start=bucket_start) for row in rows]
+        upsert(
+            db,
+            SensorActivityHourly,
+            values,
+            index_elements=("device_id", "bucket_start"),
+            update_columns=ROLLUP_COLUMNS,
+        )
+        return len(values)
+
+    def merge_late(
+        self,
+        db: Session,
+        watermark: datetime,
+        received_from: datetime,
+        received_before: datetime,
+    ) -> int:
+        """
+        Merge readings that arrived after their hour was compacted into its rollups.
+
+        Only readings received in [received_from, received_before) and measured
+        before the watermark are aggregated, found through the created_at
+        index, so the cost follows the number of late readings rather than the
+        compacted range. Their aggregates are combined with the stored rollups
+        of the same device and hour. The caller owns the transaction.
+
+        Args:
+            db: Database session
+            watermark: Readings measured before this have been compacted
+            received_from: Start of the arrival window (inclusive)
+            received_before: End of the arrival window (exclusive)
+
+        Returns:
+            Number of late readings merged
+        """
+        bucket = hour_bucket(db, SensorActivity.measured_at).label("bucket_start")
+        aggregates = [
+            SensorActivity.device_id,
+            bucket,
+            func.max(SensorActivity.zone).label("zone"),
+            func.count(SensorActivity.id).label("sample_count"),
+        ]
+        for metric in SENSOR_METRICS:
+            column = getattr(SensorActivity, metric)
+            aggregates += [
+                func.sum(column).label(f"{metric}_sum"),
+                func.count(column).label(f"{metric}_count"),
+                func.min(column).label(f"{metric}_min"),
+                func.max(column).label(f"{metric}_max"),
+            ]
+        late_groups = [
+            dict(row, bucket_start=row["bucket_start"].replace(tzinfo=timezone.utc))
+            for row in db.execute(
+                select(*aggregates)
+                .where(SensorActivity.created_at >= received_from)
+                .where(SensorActivity.created_at < received_before)
+                .where(SensorActivity.measured_at < watermark)
+                .group_by(SensorActivity.device_id, bucket)
+            ).mappings()
+        ]
+
+        merged = 0
+        for start in range(0, len(late_groups), LATE_MERGE_BATCH_SIZE):
+            batch = late_groups[start : start + LATE_MERGE_BATCH_SIZE]
+            keys = [(group["device_id"], group["bucket_start"]) for group in batch]
+            existing = {
+                (
+                    rollup.device_id,
+                    rollup.bucket_start.replace(tzinfo=timezone.utc),
+                ): rollup
+                for rollup in db.query(SensorActivityHourly).filter(
+                    tuple_(
+                        SensorActivityHourly.device_id,
+                        SensorActivityHourly.bucket_start,
+                    ).in_(keys)
+                )
+            }
+            upsert(
+                db,
+                SensorActivityHourly,
+                [
+                    _merge_rollup(existing.get(key), group)
+                    for key, group in zip(keys, batch)
+                ],
+                index_elements=("device_id", "bucket_start"),
+                update_columns=ROLLUP_COLUMNS,
+            )
+            merged += sum(group["sample_count"] for group in batch)
+        return merged
+
+    def _filtered_query(
+        self,
+        db: Session,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+    ):
+        query = db.query(SensorActivityHourly)
+        if start_date:
+            # Include the bucket that contains start_date
+            query = query.filter(
+                SensorActivityHourly.bucket_start > start_date - timedelta(hours=1)
+            )
+        if end_date:
+            query = query.filter(SensorActivityHourly.bucket_start < end_date)
+        return query
+
+    def get_filtered_list(
+        self,
+        db: Session,
+        skip: int = 0,
+        limit: int = 10,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> List[SensorActivityResponse]:
+        """
+        Get a filtered and paginated list of hourly rollups shaped as sensor activities.
+
+        Buckets overlapping the date range are included. Rollup ids are a
+        separate sequence from reading ids, so they aren't returned.
+
+        Args:
+            db: Database session
+            skip: Number of records to skip (offset)
+            limit: Maximum number of records to return
+            start_date: Optional start date filter (inclusive)
+            end_date: Optional end date filter (exclusive)
+
+        Returns:
+            List of hourly averages as SensorActivityResponse with resolution
+            "hourly" and no id
+        """
+        rollups = (
+            self._filtered_query(db, start_date, end_date)
+            .order_by(desc(SensorActivityHourly.bucket_start))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return [
+            SensorActivityResponse(
+                id=None,
+                mac_address=rollup.device_id,
+                zone=rollup.zone,
+                created_at=rollup.bucket_start,
+                measured_at=rollup.bucket_start,
+                resolution="hourly",
+                **{metric: getattr(rollup, metric) for metric in SENSOR_METRICS},
+            )
+            for rollup in rollups
+        ]
@@ -0,0 +1,24 @@
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class DatabasePoolStats(BaseModel):
+    """
+    Value object describing the state of a database connection pool.
+    Occupancy fields are null for pools that don't track them (e.g. SQLite).
+    """
+
+    pool_class: str = Field(..., description="SQLAlchemy pool implementation")
+    size: Optional[int] = Field(None, description="Configured number of pooled connections")
+    checked_in: Optional[int] = Field(None, description="Idle connections in the pool")
+    checked_out: Optional[int] = Field(None, description="Connections currently in use")
+    overflow: Optional[int] = Field(None, description="Connections open beyond the pool size")
+    checkouts: int = Field(..., description="Checkouts since the worker started")
+    timeouts: int = Field(..., description="Checkouts that timed out waiting")
+    wait_seconds_sum: float = Field(..., description="Total time spent waiting for connections")
+    wait_seconds_buckets: Dict[str, int] = Field(
+        ..., description="Cumulative checkout wait histogram keyed by upper bound in seconds"
+    )
+
+    class Config:
+        frozen = True  # Makes the model immutable
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, List, Literal
 
 
 class Settings(BaseSettings):
@@ -7,19 +8,181 @@ class Settings(BaseSettings):
     APP_NAME: str = "Agro Sensor Hub"
     APP_VERSION: str = "1.0.0"
     LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "color"  # "color" for terminals, "json" for log shipping
+    LOG_QUEUE_ENABLED: bool = True  # Format and write logs on a background thread
+    # Fraction of records below WARNING kept per logger (and its children),
+    # e.g. {"infrastructure.web.access": 0.1}
+    LOG_SAMPLING: Dict[str, float] = {}
     PORT: int = 8080
 
+    # Server Settings
+    SERVER_MODE: str = "development"  # "development" (reloader) or "production"
+    SERVER_WORKERS: int = 0  # 0 = one worker per available CPU core
+    SERVER_KEEP_ALIVE_SECONDS: int = 15  # Idle keep-alive before closing
+    SERVER_BACKLOG: int = 2048  # Pending connections queued by the kernel
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30  # Wait for in-flight requests
+
+    # Metrics Settings
+    # Directory where each server worker publishes its metrics for /metrics to
+    # aggregate; created automatically for multi-worker production servers
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_SNAPSHOT_INTERVAL_SECONDS: float = 5
+
+    # Admin Settings
+    ADMIN_TOKEN: str = ""  # Enables /admin endpoints and X-Profile; empty disables
+    PROFILING_SAMPLE_INTERVAL_MS: float = 5  # Sampling interval for X-Profile: sample
+    PROFILING_MAX_SECONDS: float = 120  # Longest /admin/profile session
+
     # Database Settings
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_HOST: str = "0.0.0.0"  # Default for local development
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = "agro_sensor_hub"
-    DATABASE_URL: str = ""  # Will be set in __init__
+    DATABASE_URL: str = ""  # Built from POSTGRES_* in __init__ unless set
+    READ_DATABASE_URL: str = ""  # Optional read replica for GET endpoints
+
+    # Connection Pool Settings (per server worker)
+    DB_POOL_SIZE: int = 10  # Connections kept open
+    DB_POOL_MAX_OVERFLOW: int = 20  # Extra connections allowed under bursts
+    DB_POOL_TIMEOUT_SECONDS: float = 10  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Reopen connections older than this
+    DB_POOL_PRE_PING: bool = True  # Check connections are alive on checkout
+    DB_POOL_WARMUP_CONNECTIONS: int = 2  # Connections opened at startup
+    DB_STATEMENT_TIMEOUT_MS: int = 60000  # 0 disables the timeout
+
+    # SQL Instrumentation Settings
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_SLOW_QUERY_MS: float = 200  # Log statements slower than this
+    SQL_EXPLAIN_SLOW_QUERIES: bool = True  # Add the plan of slow SELECTs to the log
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10  # Warn when a request repeats a statement more
+    SERVER_TIMING_HEADER_ENABLED: bool = True  # Report DB time in Server-Timing
 
     # API Settings
     API_PREFIX: str = "/agro-sensor-hub/api"
 
+    # Admission Control Settings (per worker)
+    # Excess requests wait up to the timeout for a slot; beyond the queue they
+    # get 429 with Retry-After
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_INGEST_MAX_IN_FLIGHT: int = 16  # POSTs under /sensor-activities
+    ADMISSION_INGEST_MAX_QUEUED: int = 64
+    ADMISSION_INGEST_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_READ_MAX_IN_FLIGHT: int = 8  # Other API GETs but health and metrics
+    ADMISSION_READ_MAX_QUEUED: int = 32
+    ADMISSION_READ_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    ADMISSION_MAX_RETRY_AFTER_SECONDS: int = 60
+
+    # Notification Retention Settings
+    NOTIFICATION_RETENTION_ENABLED: bool = False
+    NOTIFICATION_RETENTION_DRY_RUN: bool = False
+    NOTIFICATION_READ_RETENTION_DAYS: int = 90  # Delete read notifications after
+    NOTIFICATION_UNREAD_ARCHIVE_DAYS: int = 365  # Archive unread notifications after
+    NOTIFICATION_RETENTION_BATCH_SIZE: int = 500
+    NOTIFICATION_RETENTION_BATCH_PAUSE_SECONDS: float = 0.1
+    NOTIFICATION_RETENTION_INTERVAL_SECONDS: int = 3600
+
+    # Sensor Data Retention Settings
+    SENSOR_RETENTION_ENABLED: bool = False
+    SENSOR_RAW_RETENTION_DAYS: int = 30  # Keep full-resolution readings for
+    SENSOR_COMPACTION_MAX_HOURS_PER_RUN: int = 168
+    SENSOR_RETENTION_DELETE_BATCH_SIZE: int = 1000
+    SENSOR_RETENTION_BATCH_PAUSE_SECONDS: float = 0.2
+    SENSOR_RETENTION_INTERVAL_SECONDS: int = 3600
+    # Readings received more recently wait for the next run, so inserts still
+    # in flight when a run starts aren't missed by the late-arrival merge
+    SENSOR_LATE_ARRIVAL_GRACE_SECONDS: int = 300
+
+    # Sensor Ingest Deduplication Settings
+    # Retries of the last N readings per device are answered from memory
+    SENSOR_DEDUP_RECENT_PER_DEVICE: int = 16
+    # A stored seq measured longer before is from before the device rebooted
+    SENSOR_DEDUP_WINDOW_MINUTES: int = 60
+    SENSOR_BATCH_MAX_READINGS: int = 1000  # Largest batch accepted per request
+    # Readings measured longer ago are refused, e.g. from a clock reset to 1970
+    SENSOR_MAX_READING_AGE_DAYS: int = 365
+
+    # Sensor Ingest Rate Limit Settings (per worker)
+    # Each worker keeps its own buckets, so with N workers behind a load balancer
+    # a device may get up to N times these limits
+    SENSOR_RATE_LIMIT_ENABLED: bool = True
+    SENSOR_RATE_LIMIT_PER_SECOND: float = 1.0  # Readings per second per device
+    SENSOR_RATE_LIMIT_BURST: int = 60  # Readings a device may send at once
+    # "reject" answers readings over the limit with 429 and Retry-After, whole
+    # batches included, and lists the refused lines in stream acks;
+    # "downsample" drops them and answers 202 for single readings
+    SENSOR_RATE_LIMIT_POLICY: Literal["reject", "downsample"] = "reject"
+    SENSOR_RATE_LIMIT_OVERRIDES: Dict[str, List[float]] = {}  # MAC: [rate, burst]
+    # Readings measured longer ago are a backlog flush, metered apart at the
+    # backfill rate; at most BURST / PER_SECOND, so live readings sent at the
+    # rate fit a burst
+    SENSOR_RATE_LIMIT_BACKFILL_SECONDS: int = 60
+    SENSOR_RATE_LIMIT_BACKFILL_PER_SECOND: float = 10.0
+    SENSOR_RATE_LIMIT_BACKFILL_BURST: int = 1500  # About a day of minute readings
+    SENSOR_RATE_LIMIT_IDLE_SECONDS: int = 600  # Forget devices quiet for longer
+    SENSOR_RATE_LIMIT_MAX_DEVICES: int = 100000  # Buckets kept in memory
+
+    # Sensor Deadband Compression Settings (per worker)
+    # A reading is stored only if some metric moved more than its deadband
+    # since the device's last stored reading, or once per heartbeat
+    SENSOR_DEADBAND_ENABLED: bool = False
+    SENSOR_DEADBAND_HEARTBEAT_MINUTES: float = 15
+    SENSOR_DEADBAND_EPSILONS: Dict[str, float] = {
+        "env_humidity": 0.05,
+        "env_temperature": 0.05,
+        "ground_sensor_1": 0.05,
+        "ground_sensor_2": 0.05,
+        "ground_sensor_3": 0.05,
+        "ground_sensor_4": 0.05,
+        "ground_sensor_5": 0.05,
+        "ground_sensor_6": 0.05,
+    }
+
+    # Sensor Streaming Ingestion Settings
+    SENSOR_STREAM_BATCH_SIZE: int = 500  # Readings stored and acknowledged together
+    SENSOR_STREAM_FLUSH_SECONDS: float = 1.0  # Longest a reading waits for its batch
+    SENSOR_STREAM_MAX_LINE_BYTES: int = 4096
+
+    # UDP Ingestion Settings
+    UDP_LISTENER_ENABLED: bool = False
+    UDP_LISTENER_HOST: str = "0.0.0.0"
+    UDP_LISTENER_PORT: int = 9700
+    UDP_QUEUE_SIZE: int = 10000  # Datagrams waiting to be stored; more are dropped
+
+    # Sensor CSV Import Settings
+    SENSOR_IMPORT_WORKERS: int = 0  # Parser processes; 0 uses every CPU
+    SENSOR_IMPORT_HTTP_WORKERS: int = 2  # Parser processes for uploads to the API
+    SENSOR_IMPORT_CHUNK_ROWS: int = 50000  # Lines parsed and committed together
+    SENSOR_IMPORT_MAX_UPLOAD_MB: int = 1024  # Largest file accepted by the endpoint
+
+    # Rolling Statistics Settings
+    # Memory is about 8 metrics * (8 bytes * window) per device, ~4 KB at 60
+    ROLLING_STATS_WINDOW_SIZE: int = 60  # Readings kept per device and metric
+    ROLLING_STATS_EWMA_ALPHA: float = 0.1
+    ROLLING_STATS_WARMUP_BATCH_SIZE: int = 50  # Devices loaded per warm-up query
+    # Readings measured this long before the device's latest one are a backlog:
+    # they skip the rolling windows and anomaly detection
+    ROLLING_STATS_LATE_SECONDS: int = 60
+
+    # Anomaly Detection Settings
+    ANOMALY_DETECTION_ENABLED: bool = True
+    ANOMALY_MARK_SUSPECT: bool = True  # Flag anomalous readings as suspect
+    # Kinds that flag a reading; a stuck value is plausible on a stable sensor
+    ANOMALY_SUSPECT_KINDS: List[str] = ["spike", "out_of_range"]
+    ANOMALY_STUCK_READINGS: int = 30  # Identical consecutive readings
+    ANOMALY_SPIKE_WINDOW: int = 30  # Readings in the median/MAD baseline
+    ANOMALY_SPIKE_THRESHOLD: float = 6.0  # Robust z-score
+    ANOMALY_LIMITS: Dict[str, List[float]] = {
+        "env_humidity": [0, 100],
+        "env_temperature": [-40, 80],
+        "ground_sensor_1": [0, 100],
+        "ground_sensor_2": [0, 100],
+        "ground_sensor_3": [0, 100],
+        "ground_sensor_4": [0, 100],
+        "ground_sensor_5": [0, 100],
+        "ground_sensor_6": [0, 100],
+    }
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -29,8 +192,9 @@ class Settings(BaseSettings):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        # Set DATABASE_URL after all variables are loaded
-        self.DATABASE_URL = f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        # Set DATABASE_URL after all variables are loaded, unless given explicitly
+        if not self.DATABASE_URL:
+            self.DATABASE_URL = f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
 
 @lru_cache()
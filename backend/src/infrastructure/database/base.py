@@ -1,14 +1,41 @@
+from starlette.requests import Request
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 from infrastructure.config.settings import get_settings
+from infrastructure.database.instrumentation import instrument_engine
+from infrastructure.database.pool import engine_options, record_pool_gauges
+from infrastructure.metrics import registry
 
 settings = get_settings()
 # Create database engine
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(
+    settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, settings)
+)
+# Read-only queries go to the replica when one is configured
+read_engine = (
+    create_engine(
+        settings.READ_DATABASE_URL,
+        **engine_options(settings.READ_DATABASE_URL, settings),
+    )
+    if settings.READ_DATABASE_URL
+    else engine
+)
 
-# Create session factory
+registry.add_collector(lambda: record_pool_gauges(engine, "primary"))
+if read_engine is not engine:
+    registry.add_collector(lambda: record_pool_gauges(read_engine, "read"))
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    instrument_engine(engine, "primary", settings)
+    if read_engine is not engine:
+        instrument_engine(read_engine, "read", settings)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Clients send "X-Consistency: strong" to read their own writes from the primary
+CONSISTENCY_HEADER = "X-Consistency"
 
 # Create declarative base
 Base = declarative_base()
@@ -23,3 +50,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """
+    Get database session for read-only queries.
+
+    Uses the read replica unless READ_DATABASE_URL is unset or the request
+    carries the "X-Consistency: strong" header, in which case the primary is used.
+    """
+    strong = request.headers.get(CONSISTENCY_HEADER, "").lower() == "strong"
+    db = SessionLocal() if strong else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,52 @@
+from datetime import timedelta
+from typing import Tuple
+
+from sqlalchemy import DateTime, func, literal
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def hour_bucket(db: Session, column) -> ColumnElement:
+    """
+    Build an expression truncating a timestamp column to the start of its UTC hour.
+
+    Args:
+        db: Database session, used to pick the dialect
+        column: Timezone-aware timestamp column
+
+    Returns:
+        Expression returning the start of the hour as a naive UTC datetime
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        # date_trunc on timestamptz would use the session time zone
+        return func.date_trunc("hour", func.timezone("UTC", column), type_=DateTime)
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m-%d %H:00:00", column, type_=DateTime)
+    raise NotImplementedError(f"Hour buckets are not supported for dialect {dialect}")
+
+
+def second_bounds(db: Session, column) -> Tuple[ColumnElement, ColumnElement]:
+    """
+    Build expressions for the start of a timestamp's second and of the next one.
+
+    Comparing another column against both keeps a range lookup on its index,
+    which a truncated comparison would not.
+
+    Args:
+        db: Database session, used to pick the dialect
+        column: Timezone-aware timestamp column
+
+    Returns:
+        Inclusive start and exclusive end of the second the timestamp falls in
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        start = func.date_trunc("second", column, type_=DateTime(timezone=True))
+        return start, start + literal(timedelta(seconds=1))
+    if dialect == "sqlite":
+        return (
+            func.strftime("%Y-%m-%d %H:%M:%S", column, type_=DateTime),
+            func.strftime("%Y-%m-%d %H:%M:%S", column, "+1 seconds", type_=DateTime),
+        )
+    raise NotImplementedError(f"Second bounds are not supported for dialect {dialect}")
@@ -0,0 +1,187 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from infrastructure.config.settings import Settings
+from infrastructure.logging_config import get_logger
+from infrastructure.metrics import registry
+
+logger = get_logger(__name__)
+
+statement_duration_seconds = registry.histogram(
+    "db_statement_duration_seconds",
+    "Duration of individual SQL statements",
+    ("engine",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0),
+)
+slow_statements_total = registry.counter(
+    "db_slow_statements_total",
+    "Statements slower than SQL_SLOW_QUERY_MS",
+    ("engine",),
+)
+
+# Longest parameter repr written to the slow query log
+MAX_LOGGED_PARAMETERS = 1000
+
+
+class QueryStats:
+    """Statements run on behalf of one request."""
+
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Statement text, which is already parameterised, to execution count
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement] = self.shapes.get(statement, 0) + 1
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """Return (statement, count) pairs run more than threshold times."""
+        return [
+            (statement, count)
+            for statement, count in self.shapes.items()
+            if count > threshold
+        ]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def start_query_stats() -> tuple:
+    """
+    Start collecting statements for the current request.
+
+    The stats object is shared by reference, so statements run from worker
+    threads started with asyncio.to_thread are counted too.
+
+    Returns:
+        (QueryStats, token) where the token is passed to stop_query_stats
+    """
+    stats = QueryStats()
+    return stats, _current_stats.set(stats)
+
+
+def stop_query_stats(token) -> None:
+    """Stop collecting statements for the current request."""
+    _current_stats.reset(token)
+
+
+def _explain(cursor, dialect_name: str, statement: str, parameters: Any) -> str:
+    """
+    Run EXPLAIN for a statement on a separate cursor of the same connection.
+
+    On PostgreSQL the EXPLAIN runs inside a savepoint, so a failure can't
+    abort the request's transaction.
+    """
+    prefix = "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+    explain_cursor = cursor.connection.cursor()
+    savepoint = dialect_name == "postgresql"
+    try:
+        if savepoint:
+            explain_cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            explain_cursor.execute(prefix + statement, parameters)
+            plan = "\n".join(
+                " ".join(str(column) for column in row)
+                for row in explain_cursor.fetchall()
+            )
+        except Exception:
+            if savepoint:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+        if savepoint:
+            explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    finally:
+        explain_cursor.close()
+
+
+def instrument_engine(engine: Engine, name: str, settings: Settings) -> None:
+    """
+    Time every statement executed through an engine.
+
+    Each statement, failed ones included, feeds db_statement_duration_seconds
+    and, when a request is being tracked, its QueryStats. Statements slower
+    than SQL_SLOW_QUERY_MS are logged with their parameters and, for SELECTs
+    when SQL_EXPLAIN_SLOW_QUERIES is set, their plan; failed ones with their
+    error.
+
+    Args:
+        engine: Engine to instrument
+        name: Value of the "engine" label, e.g. "primary" or "read"
+        settings: Application settings
+    """
+    slow_seconds = settings.SQL_SLOW_QUERY_MS / 1000
+    explain = settings.SQL_EXPLAIN_SLOW_QUERIES
+    dialect_name = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        connection, cursor, statement, parameters, context, executemany
+    ):
+        connection.info.setdefault("statement_start", []).append(
+            (context, time.perf_counter())
+        )
+
+    def record(statement: str, started: float) -> float:
+        seconds = time.perf_counter() - started
+        statement_duration_seconds.observe(seconds, engine=name)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        return seconds
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # after_cursor_execute doesn't run for a failed statement, so its start
+        # is popped here; errors raised elsewhere, such as while fetching rows,
+        # have no start of their own
+        connection = exception_context.connection
+        starts = connection.info.get("statement_start") if connection else None
+        if not starts or starts[-1][0] is not exception_context.execution_context:
+            return
+        seconds = record(exception_context.statement, starts.pop()[1])
+        if seconds >= slow_seconds:
+            slow_statements_total.inc(engine=name)
+            logger.warning(
+                "Slow query on %s engine failed (%.1fms): %s\nError: %s",
+                name,
+                seconds * 1000,
+                exception_context.statement,
+                exception_context.original_exception,
+            )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        connection, cursor, statement, parameters, context, executemany
+    ):
+        seconds = record(statement, connection.info["statement_start"].pop()[1])
+        if seconds < slow_seconds:
+            return
+
+        slow_statements_total.inc(engine=name)
+        plan = None
+        if explain and not executemany and statement.lstrip()[:6].upper() == "SELECT":
+            try:
+                plan = _explain(cursor, dialect_name, statement, parameters)
+            except Exception as e:
+                plan = f"EXPLAIN failed: {e}"
+        logger.warning(
+            "Slow query on %s engine (%.1fms): %s\nParameters: %.*s%s",
+            name,
+            seconds * 1000,
+            statement,
+            MAX_LOGGED_PARAMETERS,
+            repr(parameters),
+            f"\nPlan:\n{plan}" if plan else "",
+        )
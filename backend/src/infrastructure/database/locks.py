@@ -0,0 +1,45 @@
+import zlib
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+
+from infrastructure.database.base import engine
+
+
+def lock_key(name: str) -> int:
+    """Map a lock name to a stable 32-bit advisory lock key."""
+    return zlib.crc32(name.encode("utf-8"))
+
+
+@contextmanager
+def advisory_lock(name: str) -> Iterator[bool]:
+    """
+    Try to take a cluster-wide lock for the duration of the block.
+
+    Uses a PostgreSQL session-level advisory lock on a dedicated connection,
+    so it spans the commits made inside the block. On other databases there
+    is only one process to coordinate and the lock is always granted.
+
+    Args:
+        name: Lock name, e.g. the background task name
+
+    Yields:
+        True if the lock was acquired, False if another process holds it
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    key = lock_key(name)
+    with engine.connect() as connection:
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": key}
+        ).scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": key}
+                )
+                connection.commit()
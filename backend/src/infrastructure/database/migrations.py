@@ -0,0 +1,117 @@
+from pathlib import Path
+from typing import Optional, Set
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import NullPool
+
+from infrastructure.config.settings import get_settings
+from infrastructure.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Directory holding alembic.ini and the alembic/ scripts
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+
+def get_alembic_config(connection: Optional[Connection] = None) -> Config:
+    """
+    Build the Alembic configuration used by the application.
+
+    Args:
+        connection: Connection for env.py to run the migrations on
+
+    Returns:
+        Alembic Config pointing at the project's migration scripts
+    """
+    config = Config(str(SRC_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(SRC_DIR / "alembic"))
+    config.set_main_option("sqlalchemy.url", get_settings().DATABASE_URL)
+    # Logging is already configured by the application
+    config.attributes["configure_logging"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def get_script_heads(config: Config) -> Set[str]:
+    """Return the head revisions of the migration scripts."""
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def get_database_heads(connection: Connection) -> Set[str]:
+    """Return the revisions recorded in the database's alembic_version table."""
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def create_migration_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Create an engine for running migrations, separate from the application's.
+
+    The application engine cancels statements after DB_STATEMENT_TIMEOUT_MS,
+    which backfills and index builds on large tables easily exceed, so this
+    one turns the timeout off. It keeps no pool; dispose of it before the
+    server starts its workers.
+
+    Args:
+        database_url: Database to migrate; defaults to DATABASE_URL
+
+    Returns:
+        Engine without a statement timeout or connection pool
+    """
+    database_url = database_url or get_settings().DATABASE_URL
+    connect_args = {}
+    if database_url.startswith("postgresql"):
+        connect_args["options"] = "-c statement_timeout=0"
+    return create_engine(database_url, poolclass=NullPool, connect_args=connect_args)
+
+
+def upgrade_to_head(engine: Engine) -> str:
+    """
+    Bring the database schema up to date without leaving the process.
+
+    The revisions in alembic_version are compared with the script heads first,
+    so a database that is already current costs one query. An empty SQLite
+    database is created from the models and stamped, since the migration
+    scripts use PostgreSQL-only defaults.
+
+    Args:
+        engine: Engine of the primary database, from create_migration_engine()
+            so long migrations aren't cancelled
+
+    Returns:
+        "current" if nothing had to be done, "created" if an empty SQLite
+        database was created from the models, "upgraded" otherwise
+    """
+    with engine.connect() as connection:
+        config = get_alembic_config(connection)
+        script_heads = get_script_heads(config)
+        database_heads = get_database_heads(connection)
+        if database_heads == script_heads:
+            logger.info(
+                "Database schema is current at %s", ", ".join(sorted(script_heads))
+            )
+            return "current"
+
+        if engine.dialect.name == "sqlite" and not database_heads:
+            from infrastructure.database.base import Base
+            import infrastructure.database.models  # noqa: F401
+
+            Base.metadata.create_all(connection)
+            command.stamp(config, "head")
+            connection.commit()
+            logger.info("Created SQLite schema from the models")
+            return "created"
+
+        logger.info(
+            "Upgrading database schema from %s to %s",
+            ", ".join(sorted(database_heads)) or "empty",
+            ", ".join(sorted(script_heads)),
+        )
+        command.upgrade(config, "head")
+        connection.commit()
+        return "upgraded"
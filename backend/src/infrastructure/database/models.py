@@ -1,6 +1,15 @@
 from domain.models.sensor_activity import SensorActivity
+from domain.models.sensor_activity_hourly import SensorActivityHourly
 from domain.models.device import Device
-from domain.models.notification import Notification
+from domain.models.notification import Notification, NotificationArchive
+from domain.models.retention_watermark import RetentionWatermark
 
 # Import all models here to ensure they are registered with SQLAlchemy
-__all__ = ["SensorActivity", "Device", "Notification"]
+__all__ = [
+    "SensorActivity",
+    "SensorActivityHourly",
+    "Device",
+    "Notification",
+    "NotificationArchive",
+    "RetentionWatermark",
+]
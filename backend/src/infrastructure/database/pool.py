@@ -0,0 +1,156 @@
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from infrastructure.config.settings import Settings
+from infrastructure.logging_config import get_logger
+from infrastructure.metrics import registry
+
+logger = get_logger(__name__)
+
+pool_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+pool_timeouts_total = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS",
+)
+pool_connections = registry.gauge(
+    "db_pool_connections",
+    "Pooled connections by engine and state",
+    ("engine", "state"),
+)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts_total.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start)
+
+
+def engine_options(database_url: str, settings: Settings) -> Dict[str, Any]:
+    """
+    Build create_engine keyword arguments from the DB_* settings.
+
+    SQLite keeps SQLAlchemy's default pool; the pool sizing and the
+    statement timeout only apply to server databases.
+
+    Args:
+        database_url: Database URL the engine is created for
+        settings: Application settings
+
+    Returns:
+        Keyword arguments for create_engine
+    """
+    if database_url.startswith("sqlite"):
+        return {}
+    options: Dict[str, Any] = {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if database_url.startswith("postgresql") and settings.DB_STATEMENT_TIMEOUT_MS:
+        # Applied by the server to every statement on the connection
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return options
+
+
+def warm_up_pool(engine: Engine, connections: int) -> int:
+    """
+    Open connections up front so the first requests don't pay for connecting.
+
+    All connections are checked out at the same time, otherwise the pool
+    would hand back the same one each time, then returned to the pool.
+
+    Args:
+        engine: Engine whose pool is warmed
+        connections: Number of connections to open
+
+    Returns:
+        Number of connections opened
+    """
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            opened.append(connection)
+            connection.execute(text("SELECT 1"))
+    except Exception:
+        logger.exception(
+            "Connection pool warm-up stopped after %s connections", len(opened)
+        )
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+def get_pool_stats(engine: Engine) -> Dict[str, Any]:
+    """
+    Return the current state of the engine's connection pool.
+
+    Args:
+        engine: Engine to inspect
+
+    Returns:
+        Dictionary with pool size, checked-in, checked-out and overflow
+        connections, plus checkout wait statistics
+    """
+    pool = engine.pool
+    wait = pool_wait_seconds.snapshot()
+    stats: Dict[str, Any] = {
+        "pool_class": type(pool).__name__,
+        "size": None,
+        "checked_in": None,
+        "checked_out": None,
+        "overflow": None,
+        "checkouts": wait["count"],
+        "timeouts": int(pool_timeouts_total.get()),
+        "wait_seconds_sum": wait["sum"],
+        "wait_seconds_buckets": {
+            str(bound): count for bound, count in wait["buckets"].items()
+        },
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+    return stats
+
+
+def record_pool_gauges(engine: Engine, name: str) -> None:
+    """
+    Copy the pool occupancy of an engine into the db_pool_connections gauge.
+
+    Args:
+        engine: Engine to inspect
+        name: Value of the "engine" label, e.g. "primary" or "read"
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    pool_connections.set(pool.size(), engine=name, state="size")
+    pool_connections.set(pool.checkedin(), engine=name, state="checked_in")
+    pool_connections.set(pool.checkedout(), engine=name, state="checked_out")
+    pool_connections.set(max(pool.overflow(), 0), engine=name, state="overflow")
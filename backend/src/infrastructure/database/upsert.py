@@ -0,0 +1,50 @@
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, model):
+    """
+    Build an INSERT statement that supports ON CONFLICT for the bound dialect.
+
+    Args:
+        db: Database session
+        model: SQLAlchemy model to insert into
+
+    Returns:
+        A PostgreSQL or SQLite Insert construct
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"ON CONFLICT is not supported for dialect {dialect}")
+
+
+def upsert(
+    db: Session,
+    model,
+    values: List[Dict[str, Any]],
+    index_elements: Sequence[str],
+    update_columns: Sequence[str],
+) -> None:
+    """
+    Insert rows, replacing the given columns when the conflict target exists.
+
+    Args:
+        db: Database session
+        model: SQLAlchemy model to insert into
+        values: Rows to insert
+        index_elements: Columns of the unique constraint used as conflict target
+        update_columns: Columns overwritten from the new row on conflict
+    """
+    if not values:
+        return
+    stmt = dialect_insert(db, model).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
+    db.execute(stmt)
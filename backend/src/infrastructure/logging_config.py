@@ -1,9 +1,17 @@
+import atexit
+import copy
+import json
 import logging
 import logging.config
+import queue
 import sys
-from typing import Dict, Any
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Mapping, Optional
 from infrastructure.config.settings import get_settings
 
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
 # ANSI color codes
 COLORS = {
     "GREY": "\033[38;21m",
@@ -19,8 +27,8 @@ COLORS = {
 class ColorFormatter(logging.Formatter):
     """Custom formatter that adds colors based on log level"""
 
-    def __init__(self, fmt: str):
-        super().__init__()
+    def __init__(self, fmt: str = LOG_FORMAT):
+        super().__init__(fmt)
         self.fmt = fmt
         self.FORMATS = {
             logging.DEBUG: COLORS["BLUE"] + fmt + COLORS["RESET"],
@@ -29,31 +37,165 @@ class ColorFormatter(logging.Formatter):
             logging.ERROR: COLORS["RED"] + fmt + COLORS["RESET"],
             logging.CRITICAL: COLORS["BOLD_RED"] + fmt + COLORS["RESET"],
         }
+        # Build one formatter per level up front instead of one per record
+        self._formatters = {
+            level: logging.Formatter(level_fmt)
+            for level, level_fmt in self.FORMATS.items()
+        }
 
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
+        formatter = self._formatters.get(record.levelno)
+        if formatter is None:
+            return super().format(record)
         return formatter.format(record)
 
 
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line"""
+
+    def __init__(self, fmt: Optional[str] = None):
+        super().__init__()
+        self._cached_second: Optional[int] = None
+        self._cached_time = ""
+
+    def _timestamp(self, record: logging.LogRecord) -> str:
+        # Rendering the date dominates formatting; reuse it within a second
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_second = second
+            self._cached_time = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        return f"{self._cached_time}.{int(record.msecs):03d}Z"
+
+    def format(self, record):
+        entry = {
+            "time": self._timestamp(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every N records below WARNING for the configured loggers.
+
+    Rates map a logger name, or the name of one of its parents, to the
+    fraction of records to keep (e.g. 0.1 keeps every tenth record).
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rates: Mapping[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self._every: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+
+    def _keep_every(self, name: str) -> int:
+        every = self._every.get(name)
+        if every is None:
+            every = 1
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    every = max(1, round(1 / rate)) if rate > 0 else 0
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._every[name] = every
+        return every
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        every = self._keep_every(record.name)
+        if every == 1:
+            return True
+        if every == 0:
+            return False
+        count = self._counts.get(record.name, 0)
+        self._counts[record.name] = count + 1
+        return count % every == 0
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    Only the %-style message is resolved on the calling thread, since its
+    arguments may change after the call returns.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def get_formatter(log_format: str) -> logging.Formatter:
+    """Returns the formatter for LOG_FORMAT ("color" or "json")"""
+    if log_format == "json":
+        return JsonFormatter()
+    return ColorFormatter(LOG_FORMAT)
+
+
+def build_console_handler() -> logging.Handler:
+    """
+    Builds the handler shared by all application loggers.
+
+    Records are written to stdout by a StreamHandler. With LOG_QUEUE_ENABLED
+    the loggers get a queue handler instead and a background QueueListener
+    does the formatting and writing, so request threads never block on I/O.
+    """
+    global _listener
+    settings = get_settings()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(get_formatter(settings.LOG_FORMAT))
+    handler: logging.Handler = stream_handler
+    if settings.LOG_QUEUE_ENABLED:
+        if _listener is not None:
+            _listener.stop()
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, stream_handler)
+        _listener.start()
+        handler = DeferredQueueHandler(log_queue)
+    if settings.LOG_SAMPLING:
+        handler.addFilter(SamplingFilter(settings.LOG_SAMPLING))
+    return handler
+
+
+def stop_logging() -> None:
+    """Flushes queued records and stops the background listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
 def get_logger_config() -> Dict[str, Any]:
     """Returns the logging configuration dictionary"""
     settings = get_settings()
     return {
         "version": 1,
         "disable_existing_loggers": False,
-        "formatters": {
-            "standard": {
-                "()": ColorFormatter,
-                "fmt": "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-            }
-        },
         "handlers": {
             "console": {
-                "class": "logging.StreamHandler",
+                "()": build_console_handler,
                 "level": settings.LOG_LEVEL,
-                "formatter": "standard",
-                "stream": sys.stdout,
             }
         },
         "loggers": {
@@ -108,12 +250,8 @@ def setup_logging():
     config = get_logger_config()
     logging.config.dictConfig(config)
 
-    # Force SQLAlchemy and Alembic loggers to use our formatter
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(
-        ColorFormatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
-    )
-    console_handler.setLevel(settings.LOG_LEVEL)
+    # Force SQLAlchemy and Alembic loggers to use our handler
+    console_handler = logging.getLogger("domain").handlers[0]
 
     # Update SQLAlchemy loggers
     sqlalchemy_logger = logging.getLogger("sqlalchemy.engine")
@@ -0,0 +1,398 @@
+import bisect
+import json
+import math
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from infrastructure.config.settings import get_settings
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    """Base class for in-process metrics keyed by label values."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(label, "")) for label in self.labelnames)
+
+    def get(self, **labels: str) -> float:
+        """Return the current value for the given labels."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[Dict[str, str], float]]:
+        """Return (labels, value) pairs for every label combination seen."""
+        return [
+            (dict(zip(self.labelnames, key)), value)
+            for key, value in self._values.items()
+        ]
+
+    def dump(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable copy of the metric and its samples."""
+        return {
+            "name": self.name,
+            "type": self.type_name,
+            "description": self.description,
+            "labelnames": list(self.labelnames),
+            # dict() copies atomically, so this is safe while other threads update
+            "samples": [
+                [list(key), value] for key, value in dict(self._values).items()
+            ],
+        }
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values over fixed cumulative buckets.
+
+    get() returns the number of observations; snapshot() returns the bucket
+    counts, sum and count for one label combination.
+    """
+
+    type_name = "histogram"
+
+    DEFAULT_BUCKETS = (
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._bucket_counts.get(key)
+        if counts is None:
+            # One slot per bucket plus the implicit +Inf bucket
+            counts = self._bucket_counts[key] = [0] * (len(self.buckets) + 1)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] = self._sums.get(key, 0.0) + value
+        self._values[key] = self._values.get(key, 0.0) + 1
+
+    def snapshot(self, **labels: str) -> Dict[str, object]:
+        """Return cumulative bucket counts, sum and count for the given labels."""
+        key = self._key(labels)
+        counts = self._bucket_counts.get(key, [0] * (len(self.buckets) + 1))
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative[bound] = running
+        return {
+            "buckets": cumulative,
+            "sum": self._sums.get(key, 0.0),
+            "count": running,
+        }
+
+    def dump(self) -> Dict[str, Any]:
+        sums = dict(self._sums)
+        return {
+            **super().dump(),
+            "buckets": list(self.buckets),
+            "samples": [
+                [list(key), list(counts), sums.get(key, 0.0)]
+                for key, counts in dict(self._bucket_counts).items()
+            ],
+        }
+
+
+class MetricsRegistry:
+    """Process-wide collection of named metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _get_or_create(self, cls, name: str, description: str, labelnames) -> Metric:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = cls(name, description, labelnames)
+            self._metrics[name] = metric
+        return metric
+
+    def counter(
+        self, name: str, description: str, labelnames: Tuple[str, ...] = ()
+    ) -> Counter:
+        return self._get_or_create(Counter, name, description, labelnames)
+
+    def gauge(
+        self, name: str, description: str, labelnames: Tuple[str, ...] = ()
+    ) -> Gauge:
+        return self._get_or_create(Gauge, name, description, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = Histogram(name, description, labelnames, buckets)
+            self._metrics[name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges right before collection."""
+        self._collectors.append(collector)
+
+    def collect(self) -> List[Metric]:
+        """Return all registered metrics."""
+        return list(self._metrics.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Refresh the collector-backed gauges and dump every metric.
+
+        Returns:
+            JSON-serialisable snapshot tagged with this process id
+        """
+        for collector in self._collectors:
+            collector()
+        return {
+            "pid": os.getpid(),
+            "metrics": [metric.dump() for metric in self.collect()],
+        }
+
+
+# Shared registry for the whole worker process
+registry = MetricsRegistry()
+
+
+def write_snapshot(directory: str, snapshot: Dict[str, Any]) -> None:
+    """
+    Write a worker snapshot to <directory>/<pid>.json.
+
+    Each worker only ever writes its own file, and the file is replaced
+    atomically, so readers never see a partial snapshot and no lock is needed.
+
+    Args:
+        directory: Directory shared by all workers
+        snapshot: Snapshot from MetricsRegistry.snapshot()
+    """
+    path = Path(directory) / f"{snapshot['pid']}.json"
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(snapshot))
+    os.replace(temporary, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_snapshots(directory: str, exclude_pid: Optional[int] = None) -> List[Dict]:
+    """
+    Read the snapshots written by the other workers.
+
+    Gauges of workers that are no longer running are dropped, since they
+    describe state that no longer exists; their counters and histograms are
+    kept so totals don't go backwards when a worker is replaced.
+
+    Args:
+        directory: Directory shared by all workers
+        exclude_pid: Process whose snapshot should be skipped, usually the caller
+
+    Returns:
+        List of snapshots
+    """
+    snapshots = []
+    for path in Path(directory).glob("*.json"):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if snapshot.get("pid") == exclude_pid:
+            continue
+        if not _pid_alive(snapshot["pid"]):
+            snapshot["metrics"] = [
+                metric for metric in snapshot["metrics"] if metric["type"] != "gauge"
+            ]
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def merge_snapshots(snapshots: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge worker snapshots by summing values with the same name and labels.
+
+    Counters, histogram buckets and gauges such as in-flight requests or
+    checked-out connections are all per-worker quantities, so the cluster
+    value is their sum.
+
+    Args:
+        snapshots: Snapshots from MetricsRegistry.snapshot() or read_snapshots()
+
+    Returns:
+        Merged metric dumps, in the same format as Metric.dump()
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for metric in snapshot["metrics"]:
+            target = merged.get(metric["name"])
+            if target is None:
+                target = merged[metric["name"]] = {
+                    **metric,
+                    "samples": {},
+                }
+            samples = target["samples"]
+            for sample in metric["samples"]:
+                key = tuple(sample[0])
+                if metric["type"] == "histogram":
+                    current = samples.get(key)
+                    if current is None:
+                        samples[key] = [list(sample[1]), sample[2]]
+                    elif len(current[0]) == len(sample[1]):
+                        current[0] = [a + b for a, b in zip(current[0], sample[1])]
+                        current[1] += sample[2]
+                else:
+                    samples[key] = samples.get(key, 0.0) + sample[1]
+    result = []
+    for metric in merged.values():
+        if metric["type"] == "histogram":
+            samples = [[list(key), *value] for key, value in metric["samples"].items()]
+        else:
+            samples = [[list(key), value] for key, value in metric["samples"].items()]
+        result.append({**metric, "samples": samples})
+    return result
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = (
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def render_prometheus(metrics: Sequence[Dict[str, Any]]) -> str:
+    """
+    Render merged metric dumps in the Prometheus text exposition format.
+
+    Args:
+        metrics: Output of merge_snapshots()
+
+    Returns:
+        Exposition text, one sample per line
+    """
+    lines: List[str] = []
+    for metric in sorted(metrics, key=lambda item: item["name"]):
+        name = metric["name"]
+        labelnames = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['description']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for sample in metric["samples"]:
+            labels = sample[0]
+            if metric["type"] != "histogram":
+                lines.append(
+                    f"{name}{_format_labels(labelnames, labels)} {_format_value(sample[1])}"
+                )
+                continue
+            counts, total = sample[1], sample[2]
+            running = 0
+            for bound, count in zip(metric["buckets"] + [math.inf], counts):
+                running += count
+                bucket_labels = _format_labels(
+                    list(labelnames) + ["le"], list(labels) + [_format_value(bound)]
+                )
+                lines.append(f"{name}_bucket{bucket_labels} {running}")
+            plain = _format_labels(labelnames, labels)
+            lines.append(f"{name}_sum{plain} {_format_value(total)}")
+            lines.append(f"{name}_count{plain} {running}")
+    return "\n".join(lines) + "\n"
+
+
+def write_worker_snapshot() -> None:
+    """Publish this worker's metrics to METRICS_MULTIPROC_DIR, if configured."""
+    directory = get_settings().METRICS_MULTIPROC_DIR
+    if directory:
+        write_snapshot(directory, registry.snapshot())
+
+
+def collect_cluster_metrics() -> str:
+    """
+    Render the metrics of all server workers in the Prometheus text format.
+
+    This worker's metrics are read live; the other workers' come from their
+    last snapshot in METRICS_MULTIPROC_DIR, so they can lag by up to
+    METRICS_SNAPSHOT_INTERVAL_SECONDS. Without the directory only this
+    worker's metrics are returned.
+
+    Returns:
+        Exposition text
+    """
+    snapshots = [registry.snapshot()]
+    directory = get_settings().METRICS_MULTIPROC_DIR
+    if directory:
+        snapshots += read_snapshots(directory, exclude_pid=os.getpid())
+    return render_prometheus(merge_snapshots(snapshots))
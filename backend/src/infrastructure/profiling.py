@@ -0,0 +1,124 @@
+import cProfile
+import io
+import pstats
+import sys
+import sysconfig
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+# Directory containing the application packages, used to shorten frame labels
+SRC_DIR = str(Path(__file__).resolve().parents[1])
+STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+
+
+def _frame_label(code, cache: Dict[object, str]) -> str:
+    label = cache.get(code)
+    if label is None:
+        path = code.co_filename
+        if "site-packages/" in path:
+            path = path.split("site-packages/", 1)[1]
+        elif path.startswith(SRC_DIR):
+            path = path[len(SRC_DIR) + 1 :]
+        elif path.startswith(STDLIB_DIR):
+            path = path[len(STDLIB_DIR) + 1 :]
+        label = cache[code] = f"{path}:{code.co_name}"
+    return label
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of running threads at a fixed interval.
+
+    A background thread reads sys._current_frames(), so the profiled code
+    runs unmodified and the overhead is bounded by the sampling rate. Results
+    are collapsed stacks ("root;caller;callee count" per line, thread name
+    first), the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval_seconds: float, thread_ids: Optional[Set[int]] = None):
+        """
+        Args:
+            interval_seconds: Time between samples
+            thread_ids: Threads to sample; all other threads when None
+        """
+        self.interval_seconds = interval_seconds
+        self.thread_ids = thread_ids
+        self.samples = 0
+        self._counts: Dict[str, int] = {}
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            if self.thread_ids is not None and thread_id not in self.thread_ids:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code, self._labels))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            key = ";".join(reversed(stack))
+            self._counts[key] = self._counts.get(key, 0) + 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in sorted(
+                self._counts.items(), key=lambda item: item[1], reverse=True
+            )
+        )
+
+
+def format_cprofile(profiler: cProfile.Profile, limit: int = 80) -> str:
+    """
+    Render a cProfile run as a text report sorted by cumulative time.
+
+    Args:
+        profiler: Stopped profiler
+        limit: Number of functions to include
+
+    Returns:
+        pstats report
+    """
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
+
+
+class ProfilingSession:
+    """Guards a worker against running overlapping sampling sessions."""
+
+    _lock = threading.Lock()
+
+    @classmethod
+    def try_acquire(cls) -> bool:
+        return cls._lock.acquire(blocking=False)
+
+    @classmethod
+    def release(cls) -> None:
+        cls._lock.release()
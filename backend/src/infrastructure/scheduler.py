@@ -0,0 +1,106 @@
+import asyncio
+from typing import Callable, List, Optional
+
+from infrastructure.database.locks import advisory_lock
+from infrastructure.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs a blocking function in a worker thread at a fixed interval.
+
+    Exclusive tasks run under a database advisory lock named after the task,
+    so with several server workers only one of them does the work per round.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float,
+        func: Callable[[], None],
+        initial_delay_seconds: float = 0,
+        exclusive: bool = False,
+    ):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.initial_delay_seconds = initial_delay_seconds
+        self.exclusive = exclusive
+        self._task: Optional[asyncio.Task] = None
+
+    def _run_once(self) -> None:
+        if not self.exclusive:
+            self.func()
+            return
+        with advisory_lock(self.name) as acquired:
+            if not acquired:
+                logger.debug("Skipping %s, another worker is running it", self.name)
+                return
+            self.func()
+
+    async def _run(self) -> None:
+        await asyncio.sleep(self.initial_delay_seconds)
+        while True:
+            try:
+                await asyncio.to_thread(self._run_once)
+            except Exception:
+                logger.exception("Background task %s failed", self.name)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+class Scheduler:
+    """Owns the background tasks started with the application."""
+
+    def __init__(self):
+        self.tasks: List[PeriodicTask] = []
+
+    def add(
+        self,
+        name: str,
+        interval_seconds: float,
+        func: Callable[[], None],
+        initial_delay_seconds: float = 0,
+        exclusive: bool = False,
+    ) -> None:
+        """
+        Register a blocking function to run periodically.
+
+        Args:
+            name: Task name used in logs
+            interval_seconds: Seconds to wait between the end of one run and the next
+            func: Blocking callable; it runs in a worker thread
+            initial_delay_seconds: Seconds to wait before the first run
+            exclusive: Run in at most one server worker at a time
+        """
+        self.tasks.append(
+            PeriodicTask(name, interval_seconds, func, initial_delay_seconds, exclusive)
+        )
+
+    def start(self) -> None:
+        for task in self.tasks:
+            logger.info(
+                "Starting background task %s every %ss",
+                task.name,
+                task.interval_seconds,
+            )
+            task.start()
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            await task.stop()
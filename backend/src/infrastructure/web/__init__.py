@@ -1,4 +1,15 @@
-from .app import app, create_app
+import importlib
+
 from .server import start_server
 
 __all__ = ["app", "create_app", "start_server"]
+
+
+def __getattr__(name):
+    # Importing the application pulls in every router, service and model;
+    # only do it on first use so the server supervisor process starts fast
+    if name in ("app", "create_app"):
+        module = importlib.import_module(".app", __name__)
+        globals().update(app=module.app, create_app=module.create_app)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
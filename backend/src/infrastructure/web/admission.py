@@ -0,0 +1,265 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from infrastructure.config.settings import Settings, get_settings
+from infrastructure.logging_config import get_logger
+from infrastructure.metrics import registry
+from infrastructure.web.instrumentation import HTTP_LATENCY_BUCKETS
+
+logger = get_logger(__name__)
+
+admission_total = registry.counter(
+    "http_admission_total",
+    "Requests by budget and admission outcome: admitted, admitted_after_wait, "
+    "rejected_queue_full or rejected_timeout",
+    ("budget", "outcome"),
+)
+admission_in_flight = registry.gauge(
+    "http_admission_in_flight",
+    "Requests holding a slot of the budget",
+    ("budget",),
+)
+admission_queued = registry.gauge(
+    "http_admission_queued",
+    "Requests waiting for a slot of the budget",
+    ("budget",),
+)
+admission_wait_seconds = registry.histogram(
+    "http_admission_wait_seconds",
+    "Time admitted requests waited for a slot",
+    ("budget",),
+    buckets=HTTP_LATENCY_BUCKETS,
+)
+admission_drain_rate = registry.gauge(
+    "http_admission_drain_rate",
+    "Requests per second the budget completed recently, as used for Retry-After",
+    ("budget",),
+)
+
+# Completions counted when estimating how fast the backlog drains
+DRAIN_WINDOW_SECONDS = 10.0
+
+
+class AdmissionBudget:
+    """
+    Bounds how many requests of one kind a worker processes at once.
+
+    Up to max_in_flight requests run. Up to max_queued more wait, first come
+    first served, at most queue_timeout_seconds for a slot. Anything beyond
+    that is rejected, and retry_after() estimates when the backlog will have
+    drained at the rate requests completed over the last DRAIN_WINDOW_SECONDS.
+
+    Not thread-safe: it is meant to be used from the event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_queued: int,
+        queue_timeout_seconds: float,
+        max_retry_after_seconds: int,
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.max_retry_after_seconds = max_retry_after_seconds
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._completed_at: Deque[float] = deque()
+
+    def _publish(self) -> None:
+        admission_in_flight.set(self.in_flight, budget=self.name)
+        admission_queued.set(len(self._waiters), budget=self.name)
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for a slot."""
+        return len(self._waiters)
+
+    def drain_rate(self, now: Optional[float] = None) -> float:
+        """
+        Requests completed per second over the last DRAIN_WINDOW_SECONDS.
+
+        Measured over the time since the oldest completion in the window, at
+        least a second, so a worker that just started isn't underestimated.
+        """
+        now = time.monotonic() if now is None else now
+        completed_at = self._completed_at
+        while completed_at and now - completed_at[0] > DRAIN_WINDOW_SECONDS:
+            completed_at.popleft()
+        if not completed_at:
+            return 0.0
+        return len(completed_at) / max(now - completed_at[0], 1.0)
+
+    def retry_after(self) -> int:
+        """Seconds until the requests ahead of a new one should have completed."""
+        rate = self.drain_rate()
+        admission_drain_rate.set(rate, budget=self.name)
+        if not rate:
+            # Nothing completed lately, so the backlog is stuck
+            return self.max_retry_after_seconds
+        backlog = self.in_flight + len(self._waiters) + 1
+        return min(max(math.ceil(backlog / rate), 1), self.max_retry_after_seconds)
+
+    async def acquire(self) -> bool:
+        """
+        Take a slot, waiting in the queue if every slot is busy.
+
+        Returns:
+            True if a slot was taken and release() must be called, False if
+            the queue was full or the wait timed out
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._publish()
+            admission_total.inc(budget=self.name, outcome="admitted")
+            return True
+        if len(self._waiters) >= self.max_queued:
+            admission_total.inc(budget=self.name, outcome="rejected_queue_full")
+            return False
+
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            self._remove_waiter(waiter)
+            admission_total.inc(budget=self.name, outcome="rejected_timeout")
+            return False
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot that was already handed over
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._remove_waiter(waiter)
+            raise
+        admission_wait_seconds.observe(time.perf_counter() - started, budget=self.name)
+        admission_total.inc(budget=self.name, outcome="admitted_after_wait")
+        return True
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        self._publish()
+
+    def release(self) -> None:
+        """Give the slot to the longest waiting request, or free it."""
+        self._completed_at.append(time.monotonic())
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._publish()
+                return
+        self.in_flight -= 1
+        self._publish()
+
+
+def build_budgets(settings: Settings) -> Dict[str, AdmissionBudget]:
+    """Create the ingest and read budgets from the settings."""
+    return {
+        "ingest": AdmissionBudget(
+            "ingest",
+            settings.ADMISSION_INGEST_MAX_IN_FLIGHT,
+            settings.ADMISSION_INGEST_MAX_QUEUED,
+            settings.ADMISSION_INGEST_QUEUE_TIMEOUT_SECONDS,
+            settings.ADMISSION_MAX_RETRY_AFTER_SECONDS,
+        ),
+        "read": AdmissionBudget(
+            "read",
+            settings.ADMISSION_READ_MAX_IN_FLIGHT,
+            settings.ADMISSION_READ_MAX_QUEUED,
+            settings.ADMISSION_READ_QUEUE_TIMEOUT_SECONDS,
+            settings.ADMISSION_MAX_RETRY_AFTER_SECONDS,
+        ),
+    }
+
+
+# Requests that mostly wait, on new notifications, a profiling session or a
+# gateway's next line, and would hold a slot for their whole long life
+LONG_LIVED_PATHS = (
+    "/notifications/feed",
+    "/admin/",
+    "/sensor-activities/stream",
+)
+
+
+def budget_name(method: str, path: str, prefix: str) -> Optional[str]:
+    """
+    Classify a request into the budget it draws from.
+
+    Readings posted under /sensor-activities are ingest work. Every other GET
+    of the API is a read, except the health checks and metrics, which must
+    keep answering while the worker sheds load. Long-lived requests in
+    LONG_LIVED_PATHS spend their time parked rather than working, so they
+    aren't limited either; nor is anything else.
+    """
+    api = f"{prefix}/v1"
+    if path.startswith(tuple(f"{api}{long_lived}" for long_lived in LONG_LIVED_PATHS)):
+        return None
+    if method == "POST" and path.startswith(f"{api}/sensor-activities"):
+        return "ingest"
+    if method == "GET" and path.startswith(f"{api}/"):
+        if path.startswith((f"{api}/health", f"{api}/metrics")):
+            return None
+        return "read"
+    return None
+
+
+def admission_control(settings: Optional[Settings] = None):
+    """
+    Build the middleware that sheds excess ingest and read requests.
+
+    Each worker has its own budgets, so the limits apply per worker. Shed
+    requests get 429 with a Retry-After header instead of piling up behind
+    a slow database until they all time out.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Middleware function for app.middleware("http")
+    """
+    settings = settings or get_settings()
+    prefix = settings.API_PREFIX.strip()
+    budgets = build_budgets(settings)
+
+    async def shed_excess_requests(request: Request, call_next) -> Response:
+        name = budget_name(request.method, request.url.path, prefix)
+        if name is None:
+            return await call_next(request)
+        budget = budgets[name]
+        if not await budget.acquire():
+            retry_after = budget.retry_after()
+            logger.debug(
+                "Shedding %s request %s %s: %s in flight, %s queued, retry in %ss",
+                name,
+                request.method,
+                request.url.path,
+                budget.in_flight,
+                budget.queued,
+                retry_after,
+            )
+            return JSONResponse(
+                status_code=429,
+                content={"detail": f"Too many {name} requests, retry later"},
+                headers={"Retry-After": str(retry_after)},
+            )
+        try:
+            return await call_next(request)
+        finally:
+            budget.release()
+
+    return shed_excess_requests
@@ -1,11 +1,88 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from interface.api import api_router
+from application.services.notification.retention import run_notification_retention
+from application.services.sensor_activity.retention import run_sensor_retention
+from application.services.sensor_activity.rolling_stats import warm_up_rolling_stats
 from infrastructure.config.settings import get_settings
+from infrastructure.database.base import engine
+from infrastructure.database.instrumentation import (
+    start_query_stats,
+    stop_query_stats,
+)
+from infrastructure.database.pool import warm_up_pool
 from infrastructure.logging_config import get_logger
+from infrastructure.metrics import write_worker_snapshot
+from infrastructure.scheduler import Scheduler
+from infrastructure.web.admission import admission_control
+from infrastructure.web.profiling import profile_requests
+from infrastructure.web.instrumentation import (
+    record_query_stats,
+    request_duration_seconds,
+    requests_in_flight,
+    requests_total,
+    route_template,
+    server_timing,
+)
+from interface.udp.listener import UdpListener
 import time
 
 logger = get_logger(__name__)
+# Separate logger so per-request lines can be sampled with LOG_SAMPLING
+access_logger = get_logger("infrastructure.web.access")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop the background tasks enabled in the settings."""
+    started = time.perf_counter()
+    settings = get_settings()
+    scheduler = Scheduler()
+    if settings.NOTIFICATION_RETENTION_ENABLED:
+        scheduler.add(
+            "notification-retention",
+            settings.NOTIFICATION_RETENTION_INTERVAL_SECONDS,
+            run_notification_retention,
+            exclusive=True,
+        )
+    if settings.SENSOR_RETENTION_ENABLED:
+        scheduler.add(
+            "sensor-retention",
+            settings.SENSOR_RETENTION_INTERVAL_SECONDS,
+            run_sensor_retention,
+            exclusive=True,
+        )
+    if settings.METRICS_MULTIPROC_DIR:
+        scheduler.add(
+            "metrics-snapshot",
+            settings.METRICS_SNAPSHOT_INTERVAL_SECONDS,
+            write_worker_snapshot,
+        )
+    scheduler.start()
+    udp_listener = None
+    if settings.UDP_LISTENER_ENABLED:
+        udp_listener = UdpListener(settings=settings)
+        await udp_listener.start()
+    if settings.DB_POOL_WARMUP_CONNECTIONS:
+        opened = await asyncio.to_thread(
+            warm_up_pool, engine, settings.DB_POOL_WARMUP_CONNECTIONS
+        )
+        logger.info("Connection pool warmed up with %s connections", opened)
+    logger.info(
+        "Application startup completed in %.1fms",
+        (time.perf_counter() - started) * 1000,
+    )
+    # Warm the rolling statistics without delaying the first request
+    warm_up = asyncio.create_task(asyncio.to_thread(warm_up_rolling_stats))
+    yield
+    warm_up.cancel()
+    if udp_listener is not None:
+        await udp_listener.stop()
+    await scheduler.stop()
+    # Publish final counters so the totals survive this worker
+    write_worker_snapshot()
 
 
 def create_app() -> FastAPI:
@@ -26,6 +103,7 @@ def create_app() -> FastAPI:
         docs_url=f"{prefix}/docs",  # Include API prefix in Swagger UI path
         redoc_url=f"{prefix}/redoc",  # Include API prefix in ReDoc path
         openapi_url=f"{prefix}/openapi.json",  # Include API prefix in OpenAPI schema path
+        lifespan=lifespan,
     )
 
     # Configure CORS
@@ -37,21 +115,53 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Registered first so shed requests are still logged and counted below
+    if settings.ADMISSION_CONTROL_ENABLED:
+        app.middleware("http")(admission_control(settings))
+
     @app.middleware("http")
     async def log_requests(request: Request, call_next):
-        """Log all requests with their processing time."""
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = (time.time() - start_time) * 1000
-        logger.info(
-            f"Method: {request.method} Path: {request.url.path} "
-            f"Status: {response.status_code} "
-            f"Process Time: {process_time:.2f}ms"
+        """Log all requests with their processing time and record metrics."""
+        start_time = time.perf_counter()
+        method = request.method
+        status = 500
+        requests_in_flight.inc(method=method)
+        query_stats, query_stats_token = start_query_stats()
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            stop_query_stats(query_stats_token)
+            requests_in_flight.dec(method=method)
+            duration = time.perf_counter() - start_time
+            route = route_template(request)
+            request_duration_seconds.observe(duration, method=method, route=route)
+            requests_total.inc(method=method, route=route, status=str(status))
+            if settings.SQL_INSTRUMENTATION_ENABLED:
+                record_query_stats(
+                    method, route, query_stats, settings.SQL_N_PLUS_ONE_THRESHOLD
+                )
+        if (
+            settings.SQL_INSTRUMENTATION_ENABLED
+            and settings.SERVER_TIMING_HEADER_ENABLED
+        ):
+            response.headers["Server-Timing"] = server_timing(query_stats, duration)
+        access_logger.info(
+            "Method: %s Path: %s Status: %s Process Time: %.2fms DB: %s statements %.2fms",
+            method,
+            request.url.path,
+            status,
+            duration * 1000,
+            query_stats.count,
+            query_stats.seconds * 1000,
         )
         return response
 
+    # Registered last so it wraps the logging middleware and sees the full request
+    app.middleware("http")(profile_requests)
+
     # Include API router with the API prefix
-    logger.info(f"Configuring API router with prefix: {prefix}")
+    logger.info("Configuring API router with prefix: %s", prefix)
     app.include_router(api_router, prefix=prefix)
 
     return app
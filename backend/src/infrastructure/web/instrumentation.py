@@ -0,0 +1,105 @@
+from starlette.requests import Request
+
+from infrastructure.database.instrumentation import QueryStats
+from infrastructure.logging_config import get_logger
+from infrastructure.metrics import registry
+
+logger = get_logger(__name__)
+
+# Finer low buckets than the default so p99 of fast ingest calls is visible
+HTTP_LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ("method", "route"),
+    buckets=HTTP_LATENCY_BUCKETS,
+)
+requests_total = registry.counter(
+    "http_requests_total",
+    "Requests by route template and status code",
+    ("method", "route", "status"),
+)
+requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "Requests currently being processed",
+    ("method",),
+)
+request_db_statements = registry.histogram(
+    "http_request_db_statements",
+    "SQL statements run per request by route template",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+request_db_seconds = registry.histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request by route template",
+    ("method", "route"),
+    buckets=HTTP_LATENCY_BUCKETS,
+)
+n_plus_one_total = registry.counter(
+    "http_request_repeated_statements_total",
+    "Requests that repeated one statement more than SQL_N_PLUS_ONE_THRESHOLD times",
+    ("method", "route"),
+)
+
+
+def route_template(request: Request) -> str:
+    """
+    Return the path template of the route that handled the request.
+
+    Paths that matched no route are grouped under "unmatched" so random
+    URLs can't create unbounded label values.
+    """
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def record_query_stats(
+    method: str, route: str, stats: QueryStats, n_plus_one_threshold: int
+) -> None:
+    """
+    Record the SQL statements of a finished request and warn about N+1 patterns.
+
+    Args:
+        method: HTTP method
+        route: Route template
+        stats: Statements collected while handling the request
+        n_plus_one_threshold: Repetitions of one statement that trigger a warning
+    """
+    request_db_statements.observe(stats.count, method=method, route=route)
+    request_db_seconds.observe(stats.seconds, method=method, route=route)
+    repeated = stats.repeated(n_plus_one_threshold)
+    if repeated:
+        n_plus_one_total.inc(method=method, route=route)
+        for statement, count in repeated:
+            logger.warning(
+                "Possible N+1 on %s %s: statement ran %s times: %s",
+                method,
+                route,
+                count,
+                " ".join(statement.split())[:500],
+            )
+
+
+def server_timing(stats: QueryStats, total_seconds: float) -> str:
+    """Build a Server-Timing header value with DB and total time in ms."""
+    return (
+        f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} statements", '
+        f"total;dur={total_seconds * 1000:.2f}"
+    )
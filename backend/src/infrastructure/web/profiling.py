@@ -0,0 +1,88 @@
+import cProfile
+import secrets
+import threading
+import time
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+from infrastructure.config.settings import get_settings
+from infrastructure.logging_config import get_logger
+from infrastructure.profiling import SamplingProfiler, format_cprofile
+
+logger = get_logger(__name__)
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+# "sample" returns collapsed stacks, "cprofile" a pstats report
+PROFILE_HEADER = "X-Profile"
+
+
+def is_valid_admin_token(token: Optional[str]) -> bool:
+    """Check a token against ADMIN_TOKEN; always False when it is unset."""
+    expected = get_settings().ADMIN_TOKEN
+    # Bytes, since compare_digest raises TypeError on non-ASCII strings
+    return bool(expected and token) and secrets.compare_digest(
+        token.encode(), expected.encode()
+    )
+
+
+async def _run_to_completion(request: Request, call_next) -> Response:
+    # Drain the body too, so work done while streaming it is profiled
+    response = await call_next(request)
+    async for _ in response.body_iterator:
+        pass
+    return response
+
+
+async def profile_requests(request: Request, call_next) -> Response:
+    """
+    Profile a single request when an admin asks for it.
+
+    Requests carrying "X-Profile: sample" or "X-Profile: cprofile" and a
+    valid X-Admin-Token run normally, but the response body is replaced by
+    the profile; the original status is returned in X-Profiled-Status.
+    Both profilers watch the event loop thread, so other requests handled
+    concurrently by this worker can show up in the result.
+    """
+    mode = request.headers.get(PROFILE_HEADER)
+    if not mode or not is_valid_admin_token(request.headers.get(ADMIN_TOKEN_HEADER)):
+        return await call_next(request)
+
+    started = time.perf_counter()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = await _run_to_completion(request, call_next)
+        finally:
+            profiler.disable()
+        content = format_cprofile(profiler)
+        filename = "profile.txt"
+    else:
+        settings = get_settings()
+        sampler = SamplingProfiler(
+            settings.PROFILING_SAMPLE_INTERVAL_MS / 1000,
+            thread_ids={threading.get_ident()},
+        )
+        sampler.start()
+        try:
+            response = await _run_to_completion(request, call_next)
+        finally:
+            content = sampler.stop()
+        filename = "profile.collapsed"
+
+    logger.info(
+        "Profiled %s %s with %s in %.1fms",
+        request.method,
+        request.url.path,
+        mode,
+        (time.perf_counter() - started) * 1000,
+    )
+    return PlainTextResponse(
+        content,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Profiled-Status": str(response.status_code),
+        },
+    )
@@ -1,12 +1,79 @@
+import importlib.util
+import os
+import tempfile
+from pathlib import Path
 import uvicorn
-from typing import Any
-from infrastructure.logging_config import get_logger, ColorFormatter
+from typing import Any, Dict
+from infrastructure.config.settings import Settings, get_settings
+from infrastructure.logging_config import get_logger, get_formatter
 
 logger = get_logger(__name__)
 
 
+def available_cpus() -> int:
+    """Number of CPUs this process may run on, honouring affinity limits."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def production_options(settings: Settings) -> Dict[str, Any]:
+    """
+    Build the uvicorn options for production mode.
+
+    uvloop and httptools are used when installed and fall back to the
+    pure-Python asyncio loop and h11 parser otherwise.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Keyword arguments for uvicorn.run
+    """
+    has_uvloop = importlib.util.find_spec("uvloop") is not None
+    has_httptools = importlib.util.find_spec("httptools") is not None
+    return {
+        "workers": settings.SERVER_WORKERS or available_cpus(),
+        "loop": "uvloop" if has_uvloop else "asyncio",
+        "http": "httptools" if has_httptools else "h11",
+        "timeout_keep_alive": settings.SERVER_KEEP_ALIVE_SECONDS,
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        # Requests are already logged by the application middleware
+        "access_log": False,
+    }
+
+
+def prepare_metrics_dir(settings: Settings) -> str:
+    """
+    Create an empty directory for the workers' metrics snapshots.
+
+    The path is exported through the environment so the worker processes
+    pick it up when they load their settings.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Path of the directory
+    """
+    directory = settings.METRICS_MULTIPROC_DIR or tempfile.mkdtemp(
+        prefix="agro-sensor-hub-metrics-"
+    )
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    # Snapshots left by a previous server run would be counted as live totals
+    for stale in Path(directory).glob("*.json"):
+        stale.unlink()
+    os.environ["METRICS_MULTIPROC_DIR"] = directory
+    return directory
+
+
 def start_server(
-    host: str = "0.0.0.0", port: int = 8080, reload: bool = False, **kwargs: Any
+    host: str = "0.0.0.0",
+    port: int = 8080,
+    reload: bool = False,
+    production: bool = False,
+    **kwargs: Any,
 ) -> None:
     """
     Starts the uvicorn server with the FastAPI application.
@@ -14,10 +81,28 @@ def start_server(
     Args:
         host (str): Host to bind to
         port (int): Port to bind to
-        reload (bool): Enable auto-reload
+        reload (bool): Enable auto-reload, ignored in production mode
+        production (bool): Run multiple workers with the SERVER_* settings
         **kwargs: Additional uvicorn server options
     """
-    logger.info(f"Starting server on {host}:{port}")
+    options: Dict[str, Any] = {"reload": reload, "access_log": True}
+    if production:
+        settings = get_settings()
+        options = production_options(settings)
+        if options["workers"] > 1:
+            directory = prepare_metrics_dir(settings)
+            logger.info("Aggregating worker metrics through %s", directory)
+        logger.info(
+            "Starting production server on %s:%s with %s workers (loop=%s, http=%s)",
+            host,
+            port,
+            options["workers"],
+            options["loop"],
+            options["http"],
+        )
+    else:
+        logger.info("Starting server on %s:%s", host, port)
+    options.update(kwargs)
 
     # Configure Uvicorn logging to use our format
     log_config = {
@@ -25,8 +110,8 @@ def start_server(
         "disable_existing_loggers": False,
         "formatters": {
             "standard": {
-                "()": ColorFormatter,
-                "fmt": "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+                "()": get_formatter,
+                "log_format": get_settings().LOG_FORMAT,
             }
         },
         "handlers": {
@@ -55,8 +140,6 @@ def start_server(
         "infrastructure.web.app:app",
         host=host,
         port=port,
-        reload=reload,
         log_config=log_config,
-        access_log=True,
-        **kwargs,
+        **options,
     )
@@ -4,6 +4,8 @@ from .v1 import (
     device_router,
     sensor_activity_router,
     notification_router,
+    metrics_router,
+    admin_router,
 )
 
 # Create main API router
@@ -14,4 +16,6 @@ api_router.include_router(health_router, prefix="/v1")
 api_router.include_router(device_router, prefix="/v1")
 api_router.include_router(sensor_activity_router, prefix="/v1")
 api_router.include_router(notification_router, prefix="/v1")
+api_router.include_router(metrics_router, prefix="/v1")
+api_router.include_router(admin_router, prefix="/v1")
 __all__ = ["api_router"]
@@ -0,0 +1,196 @@
+import asyncio
+import io
+import os
+import tempfile
+from typing import IO, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from application.services.admin.profiling_service import ProfilingService
+from application.services.sensor_activity.csv_import import (
+    SensorActivityImportService,
+)
+from domain.dtos.sensor_activity.dtos import SensorActivityImportReport
+from domain.repositories.device.crud import DeviceRepository
+from domain.repositories.sensor_activity.crud import SensorActivityRepository
+from infrastructure.config.settings import get_settings
+from infrastructure.database.base import get_db
+from infrastructure.web.profiling import is_valid_admin_token
+
+
+def verify_admin_token(
+    x_admin_token: Optional[str] = Header(None, description="Value of ADMIN_TOKEN"),
+) -> None:
+    """
+    Dependency that restricts an endpoint to holders of ADMIN_TOKEN.
+
+    Raises:
+        HTTPException: 404 if ADMIN_TOKEN is not configured
+        HTTPException: 403 if the token is missing or wrong
+    """
+    if not get_settings().ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_valid_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def get_import_service() -> SensorActivityImportService:
+    """
+    Dependency provider for SensorActivityImportService.
+
+    Uploads share the server with live ingestion, so they are parsed by
+    SENSOR_IMPORT_HTTP_WORKERS processes rather than one per CPU.
+
+    Returns:
+        SensorActivityImportService: An instance of the import service
+    """
+    settings = get_settings()
+    settings = settings.model_copy(
+        update={"SENSOR_IMPORT_WORKERS": settings.SENSOR_IMPORT_HTTP_WORKERS}
+    )
+    return SensorActivityImportService(
+        SensorActivityRepository(), DeviceRepository(), settings
+    )
+
+
+# One import at a time per worker process; the route is exempt from admission
+_import_lock = asyncio.Lock()
+
+
+# Uploads larger than this are spooled to a temporary file
+SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+
+async def _spool_body(request: Request, max_bytes: int) -> IO[bytes]:
+    """Copy the request body to a temporary file without multipart parsing."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            spool.close()
+            raise HTTPException(
+                status_code=413,
+                detail=f"Files above {max_bytes // (1024 * 1024)} MB are not accepted",
+            )
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(verify_admin_token)]
+)
+
+
+@router.get(
+    "/profile",
+    response_class=PlainTextResponse,
+    summary="Profile this worker",
+    description=(
+        "Samples the stacks of every thread in the worker that receives the "
+        "request and returns collapsed stacks for flamegraph.pl or speedscope"
+    ),
+    responses={
+        200: {"description": "Collapsed stacks"},
+        400: {"description": "Duration above PROFILING_MAX_SECONDS"},
+        403: {"description": "Invalid admin token"},
+        409: {"description": "A profiling session is already running"},
+    },
+)
+async def profile_worker(
+    seconds: float = Query(30, gt=0, description="Duration of the session"),
+    interval_ms: float = Query(
+        5, ge=1, le=1000, description="Time between samples in milliseconds"
+    ),
+    profiling_service: ProfilingService = Depends(ProfilingService),
+) -> PlainTextResponse:
+    """
+    Runs a time-boxed sampling session on the current worker.
+
+    Args:
+        seconds: Duration of the session
+        interval_ms: Time between samples in milliseconds
+        profiling_service: Service that runs profiling sessions
+
+    Returns:
+        PlainTextResponse: Collapsed stacks as a downloadable file
+
+    Raises:
+        HTTPException: 400 if the duration is too long
+        HTTPException: 409 if a session is already running on this worker
+    """
+    collapsed = await profiling_service.profile_worker(seconds, interval_ms)
+    return PlainTextResponse(
+        collapsed,
+        headers={
+            "Content-Disposition": f"attachment; filename=worker-{os.getpid()}.collapsed"
+        },
+    )
+
+
+@router.post(
+    "/sensor-activities/import",
+    response_model=SensorActivityImportReport,
+    summary="Import sensor history from CSV",
+    description=(
+        "Imports a CSV file sent as the raw request body (Content-Type: text/csv), "
+        "either as produced by the CSV download or with the model's column names "
+        "and ISO 8601 timestamps. Readings already stored for the same device and "
+        "timestamp are skipped and unknown devices are registered"
+    ),
+    responses={
+        200: {"description": "Import report"},
+        400: {"description": "Unsupported layout, encoding or time zone"},
+        403: {"description": "Invalid admin token"},
+        413: {"description": "File above SENSOR_IMPORT_MAX_UPLOAD_MB"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def import_sensor_activities(
+    request: Request,
+    timezone: str = Query(
+        "UTC", description="IANA time zone for timestamps without an offset"
+    ),
+    encoding: str = Query("utf-8-sig", description="Text encoding of the file"),
+    db: Session = Depends(get_db),
+    import_service: SensorActivityImportService = Depends(get_import_service),
+) -> SensorActivityImportReport:
+    """
+    Imports sensor history from a CSV file.
+
+    The body is read as a stream and spooled to a temporary file, then
+    parsed and loaded in a worker thread so the event loop stays free.
+    Concurrent uploads wait for the running import to finish.
+
+    Args:
+        request: Request whose body is the CSV file
+        timezone: IANA time zone for timestamps without an offset
+        encoding: Text encoding of the file
+        db: Database session
+        import_service: Service that imports CSV files
+
+    Returns:
+        SensorActivityImportReport: Counts of imported, duplicate and rejected rows
+
+    Raises:
+        HTTPException: 400 if the layout, encoding or time zone is invalid
+        HTTPException: 413 if the file is too large
+        HTTPException: 500 if there's a server error
+    """
+    try:
+        io.TextIOWrapper(io.BytesIO(), encoding=encoding)
+    except LookupError:
+        raise HTTPException(status_code=400, detail=f"Unknown encoding '{encoding}'")
+    max_bytes = get_settings().SENSOR_IMPORT_MAX_UPLOAD_MB * 1024 * 1024
+    spool = await _spool_body(request, max_bytes)
+    stream = io.TextIOWrapper(spool, encoding=encoding, newline="")
+    try:
+        async with _import_lock:
+            return await asyncio.to_thread(
+                import_service.import_csv, db, stream, timezone
+            )
+    finally:
+        stream.close()
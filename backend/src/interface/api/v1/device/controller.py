@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends
 from typing import List
 from sqlalchemy.orm import Session
 from domain.dtos.device.dtos import DeviceCreate, DeviceResponse
+from domain.dtos.sensor_activity.dtos import DeviceRollingStatsResponse
 from application.services.device.services import DeviceService
+from application.services.sensor_activity.rolling_stats import RollingStatsService
 from domain.repositories.device.crud import DeviceRepository
-from infrastructure.database.base import get_db
+from infrastructure.database.base import get_db, get_read_db
 from infrastructure.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -22,6 +24,16 @@ def get_device_service() -> DeviceService:
     return DeviceService(DeviceRepository())
 
 
+def get_rolling_stats_service() -> RollingStatsService:
+    """
+    Dependency provider for RollingStatsService.
+
+    Returns:
+        RollingStatsService: An instance of the rolling statistics service
+    """
+    return RollingStatsService()
+
+
 @router.post(
     "",
     response_model=DeviceResponse,
@@ -56,9 +68,9 @@ async def create_device(
         HTTPException: 400 if device already exists
         HTTPException: 422 if MAC address format is invalid
     """
-    logger.info(f"Creating new device with MAC address: {device.mac_address}")
+    logger.info("Creating new device with MAC address: %s", device.mac_address)
     response = device_service.create_device(db, device)
-    logger.info(f"Device created successfully: {response}")
+    logger.info("Device created successfully: %s", response.mac_address)
     return response
 
 
@@ -84,12 +96,44 @@ async def update_device(
     Returns:
         DeviceResponse: The updated device data
     """
-    logger.info(f"Updating device with MAC address: {device.mac_address}")
+    logger.info("Updating device with MAC address: %s", device.mac_address)
     response = device_service.update_device(db, device)
-    logger.info(f"Device updated successfully: {response}")
+    logger.info("Device updated successfully: %s", response.mac_address)
     return response
 
 
+@router.get(
+    "/{mac_address}/stats/rolling",
+    response_model=DeviceRollingStatsResponse,
+    summary="Get rolling statistics for device",
+    description="Returns min/max/mean/stddev/EWMA of each metric over the device's last readings",
+    responses={
+        200: {"description": "Rolling statistics per metric"},
+        404: {"description": "No readings for the device"},
+    },
+)
+async def get_device_rolling_stats(
+    mac_address: str,
+    rolling_stats_service: RollingStatsService = Depends(get_rolling_stats_service),
+) -> DeviceRollingStatsResponse:
+    """
+    Returns rolling statistics computed from the in-memory ring buffers.
+
+    Args:
+        mac_address: The MAC address of the device
+        rolling_stats_service: Service that exposes per-device rolling statistics
+
+    Returns:
+        DeviceRollingStatsResponse: Statistics per metric over the last readings
+
+    Raises:
+        HTTPException: 404 if there are no readings for the device
+    """
+    mac_address = mac_address.upper()
+    logger.info("Retrieving rolling statistics for device: %s", mac_address)
+    return rolling_stats_service.get_device_stats(mac_address)
+
+
 @router.get(
     "/{mac_address}",
     response_model=DeviceResponse,
@@ -98,7 +142,7 @@ async def update_device(
 )
 async def get_device_by_mac_address(
     mac_address: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     device_service: DeviceService = Depends(get_device_service),
 ) -> DeviceResponse:
     """
@@ -112,9 +156,10 @@ async def get_device_by_mac_address(
     Returns:
         DeviceResponse: The device data
     """
-    logger.info(f"Retrieving device with MAC address: {mac_address}")
+    mac_address = mac_address.upper()
+    logger.info("Retrieving device with MAC address: %s", mac_address)
     response = device_service.get_device_by_mac_address(db, mac_address)
-    logger.info(f"Device retrieved successfully: {response}")
+    logger.info("Device retrieved successfully: %s", response.mac_address)
     return response
 
 
@@ -125,7 +170,7 @@ async def get_device_by_mac_address(
     description="Retrieves all devices in the system",
 )
 async def get_all_devices(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     device_service: DeviceService = Depends(get_device_service),
 ) -> List[DeviceResponse]:
     """
@@ -140,5 +185,5 @@ async def get_all_devices(
     """
     logger.info("Retrieving all devices")
     response = device_service.get_all_devices(db)
-    logger.info(f"Retrieved {len(response)} devices successfully")
+    logger.info("Retrieved %s devices successfully", len(response))
     return response
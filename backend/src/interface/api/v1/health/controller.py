@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from domain.value_objects.health_check import HealthCheck
+from domain.value_objects.database_pool import DatabasePoolStats
 from application.services.health.health_service import HealthService
 from fastapi import Depends
 from infrastructure.logging_config import get_logger
@@ -27,7 +28,28 @@ async def health_check(
     Returns:
         HealthCheck: A value object containing the health status and timestamp
     """
-    logger.info("Health check endpoint called")
+    logger.debug("Health check endpoint called")
     health_status = health_service.get_health()
-    logger.info(f"Health check response: {health_status}")
+    logger.debug("Health check response: %s", health_status)
     return HealthCheck(status=health_status["status"])
+
+
+@router.get(
+    "/db-pool",
+    response_model=DatabasePoolStats,
+    summary="Database connection pool statistics",
+    description="Returns the occupancy and checkout wait times of this worker's connection pool",
+)
+async def database_pool_stats(
+    health_service: HealthService = Depends(HealthService),
+) -> DatabasePoolStats:
+    """
+    Returns the connection pool statistics of the worker serving the request.
+
+    Args:
+        health_service: Service that handles health check logic
+
+    Returns:
+        DatabasePoolStats: Pool occupancy and checkout wait statistics
+    """
+    return DatabasePoolStats(**health_service.get_database_pool_stats())
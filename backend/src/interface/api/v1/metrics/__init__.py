@@ -0,0 +1,3 @@
+from .controller import router
+
+__all__ = ["router"]
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from infrastructure.metrics import collect_cluster_metrics
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get(
+    "",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description="Returns the metrics of all server workers in the Prometheus text format",
+)
+async def get_metrics() -> PlainTextResponse:
+    """
+    Exposes request latency, status counts, in-flight requests, ingest and
+    export volume and database pool occupancy, summed across server workers.
+
+    Returns:
+        PlainTextResponse: Metrics in the Prometheus text exposition format
+    """
+    return PlainTextResponse(
+        collect_cluster_metrics(), media_type="text/plain; version=0.0.4"
+    )
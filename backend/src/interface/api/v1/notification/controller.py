@@ -1,12 +1,19 @@
+import asyncio
 from fastapi import APIRouter, Depends, Query
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
 
-from domain.dtos.notification.dtos import NotificationCreate, NotificationResponse
+from domain.dtos.notification.dtos import (
+    NotificationCreate,
+    NotificationResponse,
+    NotificationRetentionReport,
+)
 from application.services.notification.services import NotificationService
+from application.services.notification.retention import NotificationRetentionService
 from domain.repositories.notification.crud import NotificationRepository
-from infrastructure.database.base import get_db
+from infrastructure.database.base import get_db, get_read_db
 from infrastructure.logging_config import get_logger
+from interface.api.v1.admin.controller import verify_admin_token
 
 logger = get_logger(__name__)
 
@@ -23,6 +30,18 @@ def get_notification_service() -> NotificationService:
     return NotificationService(notification_repository=NotificationRepository())
 
 
+def get_notification_retention_service() -> NotificationRetentionService:
+    """
+    Dependency provider for NotificationRetentionService.
+
+    Returns:
+        NotificationRetentionService: An instance of the notification retention service
+    """
+    return NotificationRetentionService(
+        notification_repository=NotificationRepository()
+    )
+
+
 @router.post(
     "",
     response_model=NotificationResponse,
@@ -59,9 +78,9 @@ async def create_notification(
         HTTPException: 422 if data format is invalid
         HTTPException: 500 if there's a server error
     """
-    logger.info(f"Creating new notification for device: {notification.device_id}")
+    logger.info("Creating new notification for device: %s", notification.device_id)
     response = notification_service.create(db, notification)
-    logger.info(f"Notification created successfully: {response}")
+    logger.info("Notification created successfully: id=%s", response.id)
     return response
 
 
@@ -75,7 +94,7 @@ async def get_latest_unread_notifications(
     limit: int = Query(
         20, ge=1, le=100, description="Maximum number of notifications to return"
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     notification_service: NotificationService = Depends(get_notification_service),
 ) -> List[NotificationResponse]:
     """
@@ -93,9 +112,58 @@ async def get_latest_unread_notifications(
         HTTPException: 404 if no unread notifications found
         HTTPException: 500 if there's a server error
     """
-    logger.info(f"Retrieving latest {limit} unread notifications")
+    logger.info("Retrieving latest %s unread notifications", limit)
     response = notification_service.get_latest_unread(db, limit)
-    logger.info(f"Retrieved {len(response)} unread notifications successfully")
+    logger.info("Retrieved %s unread notifications successfully", len(response))
+    return response
+
+
+@router.get(
+    "/feed",
+    response_model=List[NotificationResponse],
+    summary="Long-poll notification feed",
+    description="Returns notifications newer than a cursor, waiting until one is created or the timeout expires",
+    responses={
+        200: {"description": "Newer notifications, or an empty list on timeout"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def get_notification_feed(
+    since_id: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Return notifications with an ID greater than this; omit to wait for new ones",
+    ),
+    timeout: float = Query(
+        30, ge=0, le=120, description="Maximum number of seconds to wait"
+    ),
+    limit: int = Query(
+        20, ge=1, le=100, description="Maximum number of notifications to return"
+    ),
+    db: Session = Depends(get_db),
+    notification_service: NotificationService = Depends(get_notification_service),
+) -> List[NotificationResponse]:
+    """
+    Long-polls for notifications newer than since_id.
+
+    Args:
+        since_id: Cursor returned by the previous call (highest ID seen)
+        timeout: Maximum number of seconds to wait for a new notification
+        limit: Maximum number of notifications to return
+        db: Database session
+        notification_service: Service that handles notification operations
+
+    Returns:
+        List[NotificationResponse]: Newer notifications ordered by ID, empty on timeout
+
+    Raises:
+        HTTPException: 500 if there's a server error
+    """
+    logger.info(
+        "Waiting for notifications newer than %s (timeout=%ss)", since_id, timeout
+    )
+    response = await notification_service.wait_for_feed(db, since_id, timeout, limit)
+    logger.info("Notification feed returned %s notifications", len(response))
     return response
 
 
@@ -110,7 +178,7 @@ async def get_notifications(
     limit: int = Query(
         10, ge=1, le=100, description="Maximum number of records to return"
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     notification_service: NotificationService = Depends(get_notification_service),
 ) -> List[NotificationResponse]:
     """
@@ -129,9 +197,11 @@ async def get_notifications(
         HTTPException: 404 if no notifications found
         HTTPException: 500 if there's a server error
     """
-    logger.info(f"Retrieving notifications with pagination: skip={skip}, limit={limit}")
+    logger.info(
+        "Retrieving notifications with pagination: skip=%s, limit=%s", skip, limit
+    )
     response = notification_service.get_paginated(db, skip, limit)
-    logger.info(f"Retrieved {len(response)} notifications successfully")
+    logger.info("Retrieved %s notifications successfully", len(response))
     return response
 
 
@@ -164,10 +234,14 @@ async def update_notification_read_status(
         HTTPException: 500 if there's a server error
     """
     logger.info(
-        f"Updating read status to {is_read} for notification ID: {notification_id}"
+        "Updating read status to %s for notification ID: %s", is_read, notification_id
     )
     response = notification_service.update_read_status(db, notification_id, is_read)
-    logger.info(f"Notification read status updated successfully: {response}")
+    logger.info(
+        "Notification read status updated successfully: id=%s is_read=%s",
+        response.id,
+        response.is_read,
+    )
     return response
 
 
@@ -183,7 +257,7 @@ async def get_device_notifications(
     limit: int = Query(
         10, ge=1, le=100, description="Maximum number of records to return"
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     notification_service: NotificationService = Depends(get_notification_service),
 ) -> List[NotificationResponse]:
     """
@@ -203,11 +277,84 @@ async def get_device_notifications(
         HTTPException: 404 if no notifications found for the device
         HTTPException: 500 if there's a server error
     """
+    mac_address = mac_address.upper()
     logger.info(
-        f"Retrieving notifications for device {mac_address} with pagination: skip={skip}, limit={limit}"
+        "Retrieving notifications for device %s with pagination: skip=%s, limit=%s",
+        mac_address,
+        skip,
+        limit,
     )
     response = notification_service.get_by_mac_address(db, mac_address, skip, limit)
     logger.info(
-        f"Retrieved {len(response)} notifications successfully for device {mac_address}"
+        "Retrieved %s notifications successfully for device %s",
+        len(response),
+        mac_address,
     )
     return response
+
+
+@router.get(
+    "/retention",
+    response_model=NotificationRetentionReport,
+    summary="Get last notification retention run",
+    description="Returns the report of the last retention run executed by this worker",
+)
+async def get_notification_retention_report(
+    retention_service: NotificationRetentionService = Depends(
+        get_notification_retention_service
+    ),
+) -> NotificationRetentionReport:
+    """
+    Returns the report of the last notification retention run.
+
+    Args:
+        retention_service: Service that applies the notification retention policy
+
+    Returns:
+        NotificationRetentionReport: Rows deleted and archived by the last run
+
+    Raises:
+        HTTPException: 404 if retention has not run yet
+    """
+    return retention_service.get_last_report()
+
+
+@router.post(
+    "/retention/run",
+    response_model=NotificationRetentionReport,
+    summary="Run notification retention",
+    description="Applies the notification retention policy now; dry-run only counts eligible rows",
+    dependencies=[Depends(verify_admin_token)],
+    responses={
+        403: {"description": "Missing or wrong X-Admin-Token"},
+        404: {"description": "ADMIN_TOKEN is not configured"},
+    },
+)
+async def run_notification_retention(
+    dry_run: bool = Query(
+        True, description="Only count the rows that would be removed"
+    ),
+    db: Session = Depends(get_db),
+    retention_service: NotificationRetentionService = Depends(
+        get_notification_retention_service
+    ),
+) -> NotificationRetentionReport:
+    """
+    Runs the notification retention policy once.
+
+    Args:
+        dry_run: Only count the rows that would be removed (default: True)
+        db: Database session
+        retention_service: Service that applies the notification retention policy
+
+    Returns:
+        NotificationRetentionReport: Rows deleted and archived (or eligible)
+
+    Raises:
+        HTTPException: 403 if the admin token is missing or wrong
+        HTTPException: 404 if ADMIN_TOKEN is not configured
+        HTTPException: 500 if there's a server error
+    """
+    logger.info("Running notification retention (dry_run=%s)", dry_run)
+    # Batches sleep between commits, so keep them off the event loop
+    return await asyncio.to_thread(retention_service.run, db, dry_run)
@@ -1,25 +1,94 @@
+import asyncio
 from datetime import datetime
 import fastapi
-from fastapi import APIRouter, Depends, Query
-from typing import List, Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from typing import Any, Dict, List, Optional, Union
 from sqlalchemy.orm import Session
 
+from application.services.sensor_activity import binary_format
+from application.services.sensor_activity.streaming import (
+    ReadingStreamIngestor,
+    as_reading,
+)
 from domain.dtos.sensor_activity.dtos import (
+    SensorActivityBatchResponse,
     SensorActivityCreate,
     SensorActivityListResponse,
+    SensorActivityNotStored,
     SensorActivityResponse,
+    SensorActivitySeriesResponse,
+    SensorActivityStreamAck,
+    SensorActivityStreamError,
+    SensorAnomaly,
 )
 from application.services.sensor_activity.services import SensorActivityService
 from domain.repositories.sensor_activity.crud import SensorActivityRepository
 from application.services.device.services import DeviceService
 from domain.repositories.device.crud import DeviceRepository
-from infrastructure.database.base import get_db
+from infrastructure.config.settings import get_settings
+from infrastructure.database.base import get_db, get_read_db
 from infrastructure.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/sensor-activities", tags=["Sensor Activities"])
 
+BINARY_MEDIA_TYPES = (binary_format.MEDIA_TYPE, "application/octet-stream")
+activity_list_adapter = TypeAdapter(List[SensorActivityCreate])
+
+
+def _request_body_docs(json_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenAPI request body for endpoints that read the body themselves."""
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": json_schema},
+                **{media_type: binary for media_type in BINARY_MEDIA_TYPES},
+            },
+        }
+    }
+
+
+def _media_type(request: Request) -> str:
+    """Content type without parameters; JSON when the header is missing."""
+    content_type = request.headers.get("content-type", "application/json")
+    return content_type.split(";")[0].strip().lower()
+
+
+def _validation_error(error: ValidationError) -> RequestValidationError:
+    """Report a body validation error the way FastAPI does for declared bodies."""
+    return RequestValidationError(
+        [
+            {**detail, "loc": ("body", *detail["loc"])}
+            for detail in error.errors(include_url=False)
+        ]
+    )
+
+
+def _stream_ingestor(
+    sensor_activity_service: SensorActivityService, db: Session
+) -> ReadingStreamIngestor:
+    settings = get_settings()
+    return ReadingStreamIngestor(
+        sensor_activity_service,
+        db,
+        batch_size=settings.SENSOR_STREAM_BATCH_SIZE,
+        flush_seconds=settings.SENSOR_STREAM_FLUSH_SECONDS,
+        max_line_bytes=settings.SENSOR_STREAM_MAX_LINE_BYTES,
+    )
+
 
 def get_sensor_activity_service() -> SensorActivityService:
     """
@@ -36,18 +105,33 @@ def get_sensor_activity_service() -> SensorActivityService:
 
 @router.post(
     "",
-    response_model=SensorActivityResponse,
+    response_model=Union[SensorActivityResponse, SensorActivityNotStored],
     summary="Create new sensor activity",
-    description="Records a new sensor activity reading from a device",
+    description=(
+        "Records a new sensor activity reading from a device. A retry carrying a "
+        "seq already stored for the device returns the stored reading with 200. "
+        f"The reading is sent as JSON or, from constrained devices, in the "
+        f"binary format ({binary_format.MEDIA_TYPE})"
+    ),
     status_code=201,
     responses={
+        200: {"description": "Retry of a stored reading; the stored reading is returned"},
         201: {"description": "Sensor activity recorded successfully"},
+        202: {
+            "model": SensorActivityNotStored,
+            "description": "Reading not stored: the device is over its rate limit "
+            "or no metric moved beyond its deadband",
+        },
+        415: {"description": "Content type is neither JSON nor the binary format"},
         422: {"description": "Validation Error - Invalid data format"},
+        429: {"description": "The device is over its rate limit; see Retry-After"},
         500: {"description": "Internal server error"},
     },
+    openapi_extra=_request_body_docs(SensorActivityCreate.model_json_schema()),
 )
 async def create_sensor_activity(
-    activity: SensorActivityCreate,
+    request: Request,
+    response: fastapi.Response,
     db: Session = Depends(get_db),
     sensor_activity_service: SensorActivityService = Depends(
         get_sensor_activity_service
@@ -56,27 +140,323 @@ async def create_sensor_activity(
     """
     Records a new sensor activity reading.
 
+    A binary reading is decoded straight into the service's DTO without
+    running the Pydantic validators again; decode_readings() has already
+    applied the same checks.
+
     Args:
-        activity: Sensor activity data transfer object containing:
+        request: Request whose body is the reading, either JSON with:
             - mac_address: The MAC address of the device (required, format: XX:XX:XX:XX:XX:XX)
             - zone: Optional zone identifier
             - env_humidity: Optional environmental humidity reading
             - env_temperature: Optional environmental temperature reading
             - ground_sensor_1 through ground_sensor_6: Optional ground sensor readings
+            - measured_at: Optional time the device took the reading
+            - seq: Optional per-device sequence number that makes retries safe
+            or one reading in the binary format
+        response: Response whose status is set to 200 for retries and 202
+            for readings not stored
         db: Database session
         sensor_activity_service: Service that handles sensor activity operations
 
     Returns:
         SensorActivityResponse: The recorded sensor activity data including creation timestamp
+        SensorActivityNotStored: Why the reading wasn't stored, with 202
 
     Raises:
+        HTTPException: 415 if the content type isn't supported
         HTTPException: 422 if data format is invalid
+        HTTPException: 429 if the device is over its rate limit
         HTTPException: 500 if there's a server error
     """
-    logger.info(f"Recording new sensor activity for device: {activity.mac_address}")
-    response = sensor_activity_service.create(db, activity)
-    logger.info(f"Sensor activity recorded successfully: {response}")
-    return response
+    media_type = _media_type(request)
+    body = await request.body()
+    if media_type in BINARY_MEDIA_TYPES:
+        try:
+            reading = binary_format.decode_readings(body, max_readings=1)[0]
+        except binary_format.BinaryFormatError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        activity = SensorActivityCreate.model_construct(
+            mac_address=reading.pop("device_id"), **reading
+        )
+    elif media_type == "application/json":
+        try:
+            activity = SensorActivityCreate.model_validate_json(body)
+        except ValidationError as e:
+            raise _validation_error(e)
+    else:
+        raise HTTPException(
+            status_code=415, detail=f"Unsupported content type '{media_type}'"
+        )
+
+    logger.info("Recording new sensor activity for device: %s", activity.mac_address)
+    # In a worker thread, so a slow database doesn't stall the event loop
+    recorded, created = await asyncio.to_thread(
+        sensor_activity_service.create_or_get, db, activity
+    )
+    if isinstance(recorded, SensorActivityNotStored):
+        response.status_code = 202
+        logger.info(
+            "Sensor activity not stored: device=%s reason=%s",
+            activity.mac_address,
+            recorded.reason,
+        )
+        return recorded
+    if not created:
+        response.status_code = 200
+        logger.info(
+            "Duplicate sensor activity: device=%s seq=%s id=%s",
+            activity.mac_address,
+            activity.seq,
+            recorded.id,
+        )
+        return recorded
+    logger.info("Sensor activity recorded successfully: id=%s", recorded.id)
+    return recorded
+
+
+@router.post(
+    "/batch",
+    response_model=SensorActivityBatchResponse,
+    summary="Create many sensor activities",
+    description=(
+        "Records readings buffered by a device or gateway in one transaction: "
+        "a JSON array, or binary readings back to back. Readings whose seq is "
+        "already stored are skipped and counted as duplicates"
+    ),
+    status_code=201,
+    responses={
+        201: {"description": "Readings recorded; the counts are returned"},
+        413: {"description": "More readings than SENSOR_BATCH_MAX_READINGS"},
+        415: {"description": "Content type is neither JSON nor the binary format"},
+        422: {"description": "Validation Error - Invalid data format"},
+        429: {"description": "A device is over its rate limit; nothing was stored"},
+        500: {"description": "Internal server error"},
+    },
+    openapi_extra=_request_body_docs(
+        {"type": "array", "items": SensorActivityCreate.model_json_schema()}
+    ),
+)
+async def create_sensor_activity_batch(
+    request: Request,
+    db: Session = Depends(get_db),
+    sensor_activity_service: SensorActivityService = Depends(
+        get_sensor_activity_service
+    ),
+) -> SensorActivityBatchResponse:
+    """
+    Records a batch of sensor activity readings.
+
+    Args:
+        request: Request whose body is a JSON array of readings, with the
+            same fields as a single reading, or binary readings back to back
+        db: Database session
+        sensor_activity_service: Service that handles sensor activity operations
+
+    Returns:
+        SensorActivityBatchResponse: How many readings were received, inserted,
+        skipped as duplicates and flagged as suspect
+
+    Raises:
+        HTTPException: 413 if the batch holds too many readings
+        HTTPException: 415 if the content type isn't supported
+        HTTPException: 422 if data format is invalid
+        HTTPException: 500 if there's a server error
+    """
+    max_readings = get_settings().SENSOR_BATCH_MAX_READINGS
+    media_type = _media_type(request)
+    body = await request.body()
+    if media_type in BINARY_MEDIA_TYPES:
+        try:
+            readings = binary_format.decode_readings(body, max_readings)
+        except binary_format.TooManyReadingsError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except binary_format.BinaryFormatError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    elif media_type == "application/json":
+        try:
+            activities = activity_list_adapter.validate_json(body)
+        except ValidationError as e:
+            raise _validation_error(e)
+        if len(activities) > max_readings:
+            raise HTTPException(
+                status_code=413, detail=f"More than {max_readings} readings"
+            )
+        readings = [as_reading(activity) for activity in activities]
+    else:
+        raise HTTPException(
+            status_code=415, detail=f"Unsupported content type '{media_type}'"
+        )
+
+    result = await asyncio.to_thread(
+        sensor_activity_service.create_batch, db, readings
+    )
+    logger.info(
+        "Sensor activity batch recorded: received=%s inserted=%s duplicates=%s",
+        result.received,
+        result.inserted,
+        result.duplicates,
+    )
+    return result
+
+
+@router.post(
+    "/stream",
+    summary="Stream sensor activities",
+    description=(
+        "Records newline-delimited JSON readings sent in a chunked request body "
+        "over one long-lived connection. Readings are stored in batches while the "
+        "body arrives; the response has one acknowledgement line per batch. If a "
+        "batch can't be stored, the acknowledgements so far are followed by an "
+        "error line and the stream stops there. Use the WebSocket on the same "
+        "path to receive acknowledgements as batches are stored"
+    ),
+    response_class=fastapi.Response,
+    responses={
+        200: {
+            "description": "One SensorActivityStreamAck per stored batch",
+            "content": {
+                "application/x-ndjson": {
+                    "schema": SensorActivityStreamAck.model_json_schema()
+                }
+            },
+        },
+        500: {
+            "description": (
+                "A batch couldn't be stored; the body has the acknowledgements of "
+                "the earlier batches, which stay stored, and a "
+                "SensorActivityStreamError line"
+            ),
+            "content": {
+                "application/x-ndjson": {
+                    "schema": SensorActivityStreamError.model_json_schema()
+                }
+            },
+        },
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {
+                    "schema": SensorActivityCreate.model_json_schema()
+                }
+            },
+        }
+    },
+)
+async def stream_sensor_activities(
+    request: Request,
+    db: Session = Depends(get_db),
+    sensor_activity_service: SensorActivityService = Depends(
+        get_sensor_activity_service
+    ),
+) -> fastapi.Response:
+    """
+    Records readings streamed in a chunked request body.
+
+    Lines are parsed as the chunks arrive. A batch is stored once
+    SENSOR_STREAM_BATCH_SIZE readings are waiting or the oldest has waited
+    SENSOR_STREAM_FLUSH_SECONDS, checked as chunks arrive, and the rest when
+    the body ends. Invalid lines are skipped and reported in the next
+    acknowledgement. If a batch can't be stored, the stream stops and the
+    response, with the status of the failure, ends with an error line after
+    the acknowledgements of the batches already stored.
+
+    Args:
+        request: Request whose body is one SensorActivityCreate per line
+        db: Database session used for every batch
+        sensor_activity_service: Service that handles sensor activity operations
+
+    Returns:
+        Response: NDJSON with one SensorActivityStreamAck per stored batch,
+        and a SensorActivityStreamError if a batch couldn't be stored
+    """
+    ingestor = _stream_ingestor(sensor_activity_service, db)
+    acks: List[SensorActivityStreamAck] = []
+    status_code = 200
+    error: Optional[SensorActivityStreamError] = None
+    try:
+        async for chunk in request.stream():
+            ingestor.feed(chunk)
+            if ingestor.ready():
+                acks.append(await asyncio.to_thread(ingestor.flush))
+        ingestor.close()
+        ack = await asyncio.to_thread(ingestor.flush)
+        if ack is not None:
+            acks.append(ack)
+    except HTTPException as e:
+        logger.error("Sensor activity stream failed: %s", e.detail)
+        status_code = e.status_code
+        error = SensorActivityStreamError(
+            error=str(e.detail), line=acks[-1].line if acks else 0
+        )
+    logger.info(
+        "Sensor activity stream finished: %s lines in %s batches",
+        ingestor.lines,
+        len(acks),
+    )
+    lines = [ack.model_dump_json() for ack in acks]
+    if error is not None:
+        lines.append(error.model_dump_json())
+    return fastapi.Response(
+        content="".join(f"{line}\n" for line in lines),
+        status_code=status_code,
+        media_type="application/x-ndjson",
+    )
+
+
+@router.websocket("/stream")
+async def stream_sensor_activities_websocket(
+    websocket: WebSocket,
+    sensor_activity_service: SensorActivityService = Depends(
+        get_sensor_activity_service
+    ),
+    db: Session = Depends(get_db),
+) -> None:
+    """
+    Records newline-delimited JSON readings sent over a WebSocket.
+
+    Messages may be text or binary and may split lines anywhere. Batches are
+    stored as in POST /stream and acknowledged with a SensorActivityStreamAck
+    message; a batch is also stored once its oldest reading has waited
+    SENSOR_STREAM_FLUSH_SECONDS even if nothing else arrives. Readings still
+    waiting when the client disconnects are stored without acknowledgement.
+
+    Args:
+        websocket: Connection carrying the stream
+        sensor_activity_service: Service that handles sensor activity operations
+        db: Database session used for the whole connection
+    """
+    await websocket.accept()
+    ingestor = _stream_ingestor(sensor_activity_service, db)
+    logger.info("Sensor activity stream opened by %s", websocket.client)
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    websocket.receive(), timeout=ingestor.seconds_until_ready()
+                )
+            except asyncio.TimeoutError:
+                message = None
+            if message is not None:
+                if message["type"] == "websocket.disconnect":
+                    break
+                data = message.get("bytes") or message.get("text", "").encode()
+                ingestor.feed(data)
+            if ingestor.ready():
+                ack = await asyncio.to_thread(ingestor.flush)
+                await websocket.send_text(ack.model_dump_json())
+        ingestor.close()
+        await asyncio.to_thread(ingestor.flush)
+    except WebSocketDisconnect:
+        # Gone while an acknowledgement was being sent; the client resends
+        pass
+    except HTTPException as e:
+        logger.error("Sensor activity stream failed: %s", e.detail)
+        await websocket.close(code=1011, reason="Failed to store readings")
+        return
+    logger.info("Sensor activity stream closed after %s lines", ingestor.lines)
 
 
 @router.get(
@@ -96,7 +476,7 @@ async def get_sensor_activities(
     end_date: Optional[datetime] = Query(
         None, description="Filter activities until this date"
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     sensor_activity_service: SensorActivityService = Depends(
         get_sensor_activity_service
     ),
@@ -120,12 +500,12 @@ async def get_sensor_activities(
         HTTPException: 500 if there's a server error
     """
     logger.info(
-        f"Retrieving sensor activities with filters: skip={skip}, limit={limit}, start_date={start_date}, end_date={end_date}"
+        "Retrieving sensor activities with filters: skip=%s, limit=%s, start_date=%s, end_date=%s", skip, limit, start_date, end_date
     )
     response = sensor_activity_service.get_filtered_list(
         db, skip, limit, start_date, end_date
     )
-    logger.info(f"Retrieved {len(response)} sensor activities successfully")
+    logger.info("Retrieved %s sensor activities successfully", len(response))
     return response
 
 
@@ -137,7 +517,7 @@ async def get_sensor_activities(
 )
 async def get_sensor_activity_by_id(
     activity_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     sensor_activity_service: SensorActivityService = Depends(
         get_sensor_activity_service
     ),
@@ -157,9 +537,9 @@ async def get_sensor_activity_by_id(
         HTTPException: 404 if activity not found
         HTTPException: 500 if there's a server error
     """
-    logger.info(f"Retrieving sensor activity with ID: {activity_id}")
+    logger.info("Retrieving sensor activity with ID: %s", activity_id)
     response = sensor_activity_service.get_by_id(db, activity_id)
-    logger.info(f"Sensor activity retrieved successfully: {response}")
+    logger.info("Sensor activity retrieved successfully: id=%s", response.id)
     return response
 
 
@@ -171,7 +551,7 @@ async def get_sensor_activity_by_id(
 )
 async def get_latest_sensor_activity(
     mac_address: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     sensor_activity_service: SensorActivityService = Depends(
         get_sensor_activity_service
     ),
@@ -191,19 +571,124 @@ async def get_latest_sensor_activity(
         HTTPException: 404 if no activity found for the device
         HTTPException: 500 if there's a server error
     """
-    logger.info(f"Retrieving latest sensor activity for device: {mac_address}")
+    mac_address = mac_address.upper()
+    logger.info("Retrieving latest sensor activity for device: %s", mac_address)
     response = sensor_activity_service.get_latest_by_mac_address(db, mac_address)
-    logger.info(f"Latest sensor activity retrieved successfully: {response}")
+    logger.info("Latest sensor activity retrieved successfully: id=%s", response.id)
     return response
 
 
+@router.get(
+    "/device/{mac_address}/anomalies",
+    response_model=List[SensorAnomaly],
+    summary="Scan device history for anomalies",
+    description="Runs stuck, spike and out-of-range detection over the most recent readings of a device",
+    responses={
+        200: {"description": "Anomalies found, oldest first"},
+        404: {"description": "No sensor activity found for the device"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def get_sensor_activity_anomalies(
+    mac_address: str,
+    limit: int = Query(
+        1000, ge=1, le=50000, description="Number of most recent readings to scan"
+    ),
+    db: Session = Depends(get_read_db),
+    sensor_activity_service: SensorActivityService = Depends(
+        get_sensor_activity_service
+    ),
+) -> List[SensorAnomaly]:
+    """
+    Scans the recent history of a device for anomalies.
+
+    Args:
+        mac_address: The MAC address of the device
+        limit: Number of most recent readings to scan
+        db: Database session
+        sensor_activity_service: Service that handles sensor activity operations
+
+    Returns:
+        List[SensorAnomaly]: Anomalies found in the scanned readings
+
+    Raises:
+        HTTPException: 404 if no activity found for the device
+        HTTPException: 500 if there's a server error
+    """
+    mac_address = mac_address.upper()
+    logger.info(
+        "Scanning last %s readings of device %s for anomalies", limit, mac_address
+    )
+    response = sensor_activity_service.get_anomalies(db, mac_address, limit)
+    logger.info("Found %s anomalies for device %s", len(response), mac_address)
+    return response
+
+
+@router.get(
+    "/device/{mac_address}/series",
+    response_model=SensorActivitySeriesResponse,
+    summary="Get a device's readings as a step-wise series",
+    description=(
+        "Resamples the stored readings of a device with one point per step, each "
+        "holding the last reading stored at or before it. Rebuilds the full series "
+        "when deadband compression only stores readings that changed"
+    ),
+    responses={
+        200: {"description": "One point per step, oldest first"},
+        400: {"description": "Empty range or too many points"},
+        404: {"description": "No sensor activity found for the device"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def get_sensor_activity_series(
+    mac_address: str,
+    start_date: datetime = Query(..., description="First point of the series"),
+    end_date: datetime = Query(..., description="Last possible point of the series"),
+    step_seconds: int = Query(60, ge=1, le=86400, description="Seconds between points"),
+    db: Session = Depends(get_read_db),
+    sensor_activity_service: SensorActivityService = Depends(
+        get_sensor_activity_service
+    ),
+) -> SensorActivitySeriesResponse:
+    """
+    Rebuilds the readings of a device as a step-wise series.
+
+    Args:
+        mac_address: The MAC address of the device
+        start_date: First point of the series
+        end_date: Last possible point of the series
+        step_seconds: Seconds between points
+        db: Database session
+        sensor_activity_service: Service that handles sensor activity operations
+
+    Returns:
+        SensorActivitySeriesResponse: The points of the series
+
+    Raises:
+        HTTPException: 400 if the range is empty or needs too many points
+        HTTPException: 404 if no activity found for the device
+        HTTPException: 500 if there's a server error
+    """
+    mac_address = mac_address.upper()
+    logger.info(
+        "Rebuilding series of device %s from %s to %s every %ss",
+        mac_address,
+        start_date,
+        end_date,
+        step_seconds,
+    )
+    return sensor_activity_service.get_step_series(
+        db, mac_address, start_date, end_date, step_seconds
+    )
+
+
 @router.get(
     "/all/latest",
     response_model=List[SensorActivityListResponse],
     summary="Get latest sensor activity for all devices",
 )
 async def get_latest_sensor_activity_for_all_devices(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     sensor_activity_service: SensorActivityService = Depends(
         get_sensor_activity_service
     ),
@@ -213,7 +698,7 @@ async def get_latest_sensor_activity_for_all_devices(
     """
     logger.info("Retrieving latest sensor activity for all devices")
     response = sensor_activity_service.get_latest_for_all_devices(db)
-    logger.info(f"Latest sensor activity retrieved successfully: {response}")
+    logger.info("Latest sensor activity retrieved for %s devices", len(response))
     return response
 
 
@@ -229,7 +714,7 @@ async def get_latest_sensor_activity_for_all_devices(
     },
 )
 async def download_last_three_months_csv(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     sensor_activity_service: SensorActivityService = Depends(
         get_sensor_activity_service
     ),
@@ -261,5 +746,5 @@ async def download_last_three_months_csv(
     filename = f"sensor_activity_data_{datetime.now().strftime('%Y%m%d')}.csv"
     response.headers["Content-Disposition"] = f"attachment; filename={filename}"
     
-    logger.info(f"CSV download generated successfully: {filename}")
+    logger.info("CSV download generated successfully: %s", filename)
     return response
@@ -0,0 +1,139 @@
+"""
+Generate synthetic sensor history and bulk-load it.
+
+Creates the devices, then loads readings and anomaly notifications one time
+window at a time, committing after each window. On PostgreSQL rows are
+streamed with COPY; other databases fall back to batched INSERTs, which is
+fine for small SQLite datasets only.
+
+Readings older than the retention window are compacted into hourly rollups
+by the retention job when SENSOR_RETENTION_ENABLED is set; raise
+SENSOR_RAW_RETENTION_DAYS or leave the job off when the raw history must stay.
+
+Usage (from backend/src):
+    python -m interface.cli.generate_history --devices 100 --years 5
+    python -m interface.cli.generate_history --devices 10 --days 30 \\
+        --database-url sqlite:////tmp/history.db
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, select, text
+
+from application.services.sensor_activity.history_generator import HistoryGenerator
+from domain.models.device import Device
+from infrastructure.config.settings import get_settings
+from infrastructure.database.bulk import copy_columns
+from infrastructure.database.migrations import upgrade_to_head
+from infrastructure.logging_config import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=100)
+    length = parser.add_mutually_exclusive_group()
+    length.add_argument("--years", type=float)
+    length.add_argument("--days", type=float)
+    parser.add_argument(
+        "--end",
+        type=datetime.fromisoformat,
+        help="End of the history as an ISO date; defaults to now",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=300, help="Seconds between readings"
+    )
+    parser.add_argument("--zones", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--mac-prefix",
+        default="02:5D:00",
+        help="First three MAC bytes; the default is locally administered",
+    )
+    parser.add_argument("--spike-probability", type=float, default=2e-5)
+    parser.add_argument(
+        "--window-days", type=float, default=7, help="Days loaded per transaction"
+    )
+    parser.add_argument(
+        "--database-url", help="Target database; defaults to DATABASE_URL"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    setup_logging()
+    args = parse_args()
+    end = args.end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    days = args.days if args.days is not None else (args.years or 1) * 365
+    start = end - timedelta(days=days)
+
+    engine = create_engine(args.database_url or get_settings().DATABASE_URL)
+    upgrade_to_head(engine)
+
+    generator = HistoryGenerator(
+        devices=args.devices,
+        start=start,
+        end=end,
+        interval_seconds=args.interval,
+        zones=args.zones,
+        seed=args.seed,
+        mac_prefix=args.mac_prefix,
+        spike_probability=args.spike_probability,
+    )
+    devices = generator.device_columns()
+    with engine.begin() as connection:
+        existing = connection.execute(
+            select(Device.mac_address).where(
+                Device.mac_address.in_(devices["mac_address"])
+            )
+        ).first()
+        if existing:
+            raise SystemExit(
+                f"Device {existing[0]} already exists; pick another --mac-prefix"
+            )
+        copy_columns(connection, "devices", devices)
+
+    logger.info(
+        "Generating about %s readings for %s devices from %s to %s",
+        generator.expected_readings,
+        args.devices,
+        start.isoformat(timespec="seconds"),
+        end.isoformat(timespec="seconds"),
+    )
+    started = time.perf_counter()
+    readings_total = notifications_total = 0
+    for readings, notifications in generator.windows(args.window_days):
+        with engine.begin() as connection:
+            readings_total += copy_columns(connection, "sensor_activities", readings)
+            notifications_total += copy_columns(
+                connection, "notifications", notifications
+            )
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Loaded %s readings (%.0f/s) and %s notifications",
+            readings_total,
+            readings_total / elapsed,
+            notifications_total,
+        )
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            connection.execution_options(isolation_level="AUTOCOMMIT")
+            connection.execute(
+                text("ANALYZE devices, sensor_activities, notifications")
+            )
+    logger.info(
+        "Generated %s readings and %s notifications in %.1fs",
+        readings_total,
+        notifications_total,
+        time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    main()
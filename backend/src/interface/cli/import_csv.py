@@ -0,0 +1,80 @@
+"""
+Import sensor history from CSV files.
+
+Accepts the files produced by the CSV download (Spanish headers, 12-hour
+timestamps) and files with the model's column names and ISO 8601
+timestamps. Readings already stored for the same device and timestamp are
+skipped, so a file can be imported again after an interruption.
+
+Usage (from backend/src):
+    python -m interface.cli.import_csv export-2024.csv export-2025.csv \\
+        --timezone Europe/Madrid --workers 8
+"""
+
+import argparse
+import sys
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="+", help="CSV files to import")
+    parser.add_argument(
+        "--timezone",
+        default="UTC",
+        help="IANA time zone for timestamps without an offset",
+    )
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Parser processes; defaults to SENSOR_IMPORT_WORKERS",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    # Imported here so the spawned parser processes, which import this
+    # module, don't build database engines
+    from fastapi import HTTPException
+
+    from application.services.sensor_activity.csv_import import (
+        SensorActivityImportService,
+    )
+    from domain.repositories.device.crud import DeviceRepository
+    from domain.repositories.sensor_activity.crud import SensorActivityRepository
+    from infrastructure.config.settings import get_settings
+    from infrastructure.database.base import SessionLocal
+    from infrastructure.logging_config import get_logger, setup_logging
+
+    import infrastructure.database.models  # noqa: F401
+
+    setup_logging()
+    logger = get_logger(__name__)
+    args = parse_args()
+    settings = get_settings()
+    if args.workers is not None:
+        settings = settings.model_copy(update={"SENSOR_IMPORT_WORKERS": args.workers})
+    service = SensorActivityImportService(
+        SensorActivityRepository(), DeviceRepository(), settings
+    )
+
+    failed = False
+    for path in args.files:
+        db = SessionLocal()
+        try:
+            with open(path, encoding=args.encoding, newline="") as stream:
+                report = service.import_csv(db, stream, args.timezone)
+        except HTTPException as e:
+            logger.error("Import of %s failed: %s", path, e.detail)
+            failed = True
+            continue
+        finally:
+            db.close()
+        logger.info("Imported %s: %s", path, report.model_dump_json())
+        for error in report.errors:
+            logger.warning("%s: %s", path, error)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+UDP ingestion for battery-powered nodes.
+
+A datagram holds one or more readings from a single device in the binary
+format (see application.services.sensor_activity.binary_format). Nothing is
+sent back, so a node saves the TCP and HTTP handshakes and can turn its
+radio off right after sending; readings that must not be lost carry a seq
+and are resent, since retries are deduplicated like on the HTTP path.
+
+Datagrams are checked on the event loop and queued. A single writer task
+stores whatever is queued in batches through SensorActivityService, in a
+worker thread, so a slow database fills the queue and drops datagrams
+instead of blocking the loop.
+"""
+
+import asyncio
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from application.services.device.services import DeviceService
+from application.services.sensor_activity.binary_format import (
+    BinaryFormatError,
+    decode_readings,
+)
+from application.services.sensor_activity.rate_limit import (
+    DeviceRateLimiter,
+    device_rate_limiter,
+    is_backfill,
+)
+from application.services.sensor_activity.services import SensorActivityService
+from domain.repositories.device.crud import DeviceRepository
+from domain.repositories.sensor_activity.crud import SensorActivityRepository
+from infrastructure.config.settings import Settings, get_settings
+from infrastructure.database.base import SessionLocal
+from infrastructure.logging_config import get_logger
+from infrastructure.metrics import registry
+
+logger = get_logger(__name__)
+
+udp_packets_total = registry.counter(
+    "sensor_udp_packets_total",
+    "UDP datagrams by outcome (accepted, rejected or dropped) and reason",
+    ("outcome", "reason"),
+)
+
+Readings = List[Dict[str, Any]]
+
+
+def is_device_mac(mac_address: str) -> bool:
+    """A device sends from a unicast MAC address that isn't all zeros."""
+    return mac_address != "00:00:00:00:00:00" and not int(mac_address[:2], 16) & 1
+
+
+class SensorDatagramProtocol(asyncio.DatagramProtocol):
+    """Validates datagrams and queues their readings for the writer."""
+
+    def __init__(
+        self,
+        queue: "asyncio.Queue[Readings]",
+        rate_limiter: Optional[DeviceRateLimiter],
+        max_readings: int,
+        backfill_age: timedelta,
+    ):
+        self.queue = queue
+        self.rate_limiter = rate_limiter
+        self.max_readings = max_readings
+        self.backfill_age = backfill_age
+
+    def _within_rate_limit(self, mac_address: str, readings: Readings) -> bool:
+        if self.rate_limiter is None:
+            return True
+        now = datetime.now(timezone.utc)
+        backfill = sum(
+            1
+            for reading in readings
+            if is_backfill(reading["measured_at"], self.backfill_age, now)
+        )
+        return self.rate_limiter.allow(mac_address, len(readings) - backfill, backfill)
+
+    def _reject(self, reason: str, addr: Tuple[str, int], detail: Any) -> None:
+        udp_packets_total.inc(outcome="rejected", reason=reason)
+        logger.debug("Rejected UDP datagram from %s:%s: %s", addr[0], addr[1], detail)
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        try:
+            readings = decode_readings(data, self.max_readings)
+        except BinaryFormatError as e:
+            self._reject("malformed", addr, e)
+            return
+        mac_address = readings[0]["device_id"]
+        if not is_device_mac(mac_address):
+            self._reject("invalid_mac", addr, mac_address)
+            return
+        if any(reading["device_id"] != mac_address for reading in readings):
+            self._reject("invalid_mac", addr, "readings from several devices")
+            return
+        if not self._within_rate_limit(mac_address, readings):
+            self._reject("rate_limited", addr, mac_address)
+            return
+        try:
+            self.queue.put_nowait(readings)
+        except asyncio.QueueFull:
+            udp_packets_total.inc(outcome="dropped", reason="queue_full")
+
+    def error_received(self, exc: Exception) -> None:
+        logger.warning("UDP listener error: %s", exc)
+
+
+class UdpListener:
+    """Receives readings over UDP and stores them until stopped."""
+
+    def __init__(
+        self,
+        sensor_activity_service: Optional[SensorActivityService] = None,
+        rate_limiter: Optional[DeviceRateLimiter] = None,
+        settings: Optional[Settings] = None,
+    ):
+        self.settings = settings or get_settings()
+        self.service = sensor_activity_service or SensorActivityService(
+            sensor_activity_repository=SensorActivityRepository(),
+            device_service=DeviceService(DeviceRepository()),
+        )
+        self.queue: "asyncio.Queue[Readings]" = asyncio.Queue(
+            self.settings.UDP_QUEUE_SIZE
+        )
+        # Shares the buckets of the HTTP path, so a device can't double its rate
+        # by sending over both
+        self.rate_limiter = None
+        if self.settings.SENSOR_RATE_LIMIT_ENABLED:
+            self.rate_limiter = rate_limiter or device_rate_limiter
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Bind the socket and start the writer task."""
+        host = self.settings.UDP_LISTENER_HOST
+        port = self.settings.UDP_LISTENER_PORT
+        loop = asyncio.get_running_loop()
+        # Every server worker binds the port and the kernel spreads datagrams
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: SensorDatagramProtocol(
+                self.queue,
+                self.rate_limiter,
+                self.settings.SENSOR_BATCH_MAX_READINGS,
+                timedelta(seconds=self.settings.SENSOR_RATE_LIMIT_BACKFILL_SECONDS),
+            ),
+            local_addr=(host, port),
+            reuse_port=hasattr(socket, "SO_REUSEPORT"),
+        )
+        self._writer = asyncio.create_task(self._write_queued(), name="udp-writer")
+        logger.info("UDP listener receiving readings on %s:%s", host, port)
+
+    async def stop(self) -> None:
+        """Stop receiving and store the readings still queued."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        while not self.queue.empty():
+            await self._write(self._take_queued([]))
+
+    def _take_queued(self, packets: List[Readings]) -> List[Readings]:
+        """Add queued datagrams to packets up to one batch of readings."""
+        count = sum(len(readings) for readings in packets)
+        while (
+            count < self.settings.SENSOR_BATCH_MAX_READINGS and not self.queue.empty()
+        ):
+            readings = self.queue.get_nowait()
+            packets.append(readings)
+            count += len(readings)
+        return packets
+
+    async def _write_queued(self) -> None:
+        while True:
+            packets = self._take_queued([await self.queue.get()])
+            await self._write(packets)
+
+    async def _write(self, packets: List[Readings]) -> None:
+        readings = [reading for packet in packets for reading in packet]
+        try:
+            await asyncio.to_thread(self._store, readings)
+        except Exception:
+            logger.exception(
+                "Failed to store %s readings received over UDP", len(readings)
+            )
+            udp_packets_total.inc(
+                len(packets), outcome="dropped", reason="write_failed"
+            )
+            return
+        udp_packets_total.inc(len(packets), outcome="accepted", reason="stored")
+
+    def _store(self, readings: Readings) -> None:
+        db = SessionLocal()
+        try:
+            # Datagrams were already taken from the rate limiter on arrival
+            self.service.create_batch(db, readings, check_rate_limit=False)
+        finally:
+            db.close()
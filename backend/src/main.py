@@ -1,4 +1,7 @@
-import subprocess
+import time
+
+BOOT_STARTED = time.perf_counter()
+
 import sys
 import os
 from pathlib import Path
@@ -6,6 +9,8 @@ from infrastructure.web import start_server
 from infrastructure.logging_config import setup_logging, get_logger
 from infrastructure.config.settings import get_settings
 
+IMPORTS_DONE = time.perf_counter()
+
 # Change to the project root directory
 os.chdir(Path(__file__).parent.parent)
 
@@ -13,66 +18,53 @@ os.chdir(Path(__file__).parent.parent)
 setup_logging()
 logger = get_logger(__name__)
 
-# Test loggers for each namespace
-domain_logger = get_logger("domain")
-app_logger = get_logger("application")
-infra_logger = get_logger("infrastructure")
-interface_logger = get_logger("interface")
-
 
 def run_migrations():
     """
-    Run database migrations using Alembic.
+    Bring the database schema up to date using Alembic in this process.
+    Does nothing beyond one query when the schema is already at head.
     """
     try:
-        logger.info("Starting database migrations")
-        # Set environment variables for Alembic logging
-        env = os.environ.copy()
-        env["PYTHONPATH"] = str(
-            Path(__file__).parent.parent
-        )  # Set PYTHONPATH to include our src directory
-        env["ALEMBIC_LOG_FORMAT"] = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-        env["ALEMBIC_LOG_LEVEL"] = "INFO"
-
-        # Ensure settings are loaded before migrations
-        settings = get_settings()
-        env.update(
-            {
-                "POSTGRES_USER": settings.POSTGRES_USER,
-                "POSTGRES_PASSWORD": settings.POSTGRES_PASSWORD,
-                "POSTGRES_HOST": settings.POSTGRES_HOST,
-                "POSTGRES_PORT": str(settings.POSTGRES_PORT),
-                "POSTGRES_DB": settings.POSTGRES_DB,
-                "DATABASE_URL": settings.DATABASE_URL,
-            }
+        from infrastructure.database.migrations import (
+            create_migration_engine,
+            upgrade_to_head,
         )
 
-        subprocess.run(
-            ["alembic", "upgrade", "head"],
-            check=True,
-            cwd=Path(__file__).parent,
-            env=env,
-        )
-        logger.info("Database migrations completed successfully")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Error running database migrations: {str(e)}", exc_info=True)
+        engine = create_migration_engine()
+        try:
+            result = upgrade_to_head(engine)
+        finally:
+            # Nothing of it must be inherited by the server workers
+            engine.dispose()
+        if result != "current":
+            logger.info("Database migrations completed successfully")
+    except Exception as e:
+        logger.error("Error running database migrations: %s", e, exc_info=True)
         sys.exit(1)
 
 
 if __name__ == "__main__":
     logger.info("Starting application")
-    # Test all logger namespaces
-    domain_logger.debug("Testing domain debug log")
-    domain_logger.info("Testing domain info log")
-    app_logger.debug("Testing application debug log")
-    app_logger.info("Testing application info log")
-    infra_logger.debug("Testing infrastructure debug log")
-    infra_logger.info("Testing infrastructure info log")
-    interface_logger.debug("Testing interface debug log")
-    interface_logger.info("Testing interface info log")
+    timings = {"imports": IMPORTS_DONE - BOOT_STARTED}
+
+    step_started = time.perf_counter()
+    settings = get_settings()
+    timings["settings"] = time.perf_counter() - step_started
 
     # Run database migrations
+    step_started = time.perf_counter()
     run_migrations()
+    timings["migrations"] = time.perf_counter() - step_started
+
+    timings["total"] = time.perf_counter() - BOOT_STARTED
+    logger.info(
+        "Startup timings before server start: %s",
+        " ".join(f"{step}={seconds * 1000:.1f}ms" for step, seconds in timings.items()),
+    )
+
     # Start the server
     logger.info("Initializing web server")
-    start_server(reload=True)  # Enable reload for development
+    if settings.SERVER_MODE == "production":
+        start_server(port=settings.PORT, production=True)
+    else:
+        start_server(reload=True)  # Enable reload for development
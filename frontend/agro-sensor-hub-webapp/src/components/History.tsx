@@ -217,7 +217,7 @@ export function History() {
               </thead>
               <tbody className="bg-white dark:bg-gray-700 divide-y divide-gray-200 dark:divide-gray-600">
                 {activities.map((activity) => (
-                  <tr key={activity.id}>
+                  <tr key={activity.id ?? `${activity.device_id}-${activity.created_at}`}>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900 dark:text-gray-100">{activity.id}</td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900 dark:text-gray-100">{activity.zone}</td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900 dark:text-gray-100">{activity.device_id}</td>
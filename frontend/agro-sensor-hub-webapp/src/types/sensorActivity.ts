@@ -1,5 +1,5 @@
 export interface SensorActivity {
-    id: number;
+    id: number | null;  // null for hourly averages
     device_id: string;
     zone: string;
     env_humidity: number;